@@ -0,0 +1,129 @@
+"""Load benchmark for the JSON metrics API.
+
+Starts ``recruitment_api.py`` in a subprocess and drives it with concurrent
+keep-alive clients, each cycling through a mix of endpoints and filters.
+Two passes per concurrency level: plain GETs (served from the response
+cache after the first hit) and revalidations with ``If-None-Match`` (304s).
+Reports throughput and p50/p99 latency.
+
+    python benchmarks/bench_api.py --clients 1 16 64 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = [
+    "/api/key-metrics",
+    "/api/funnel",
+    "/api/funnel?year=2021,2022",
+    "/api/sources",
+    "/api/sources?source=Website",
+    "/api/positions?role_type=Tech-Roles",
+    "/api/stage-durations",
+    "/api/candidate-types",
+    "/api/seasonality?year=2022",
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _request(reader, writer, path, etag=None):
+    extra = f"If-None-Match: {etag}\r\n" if etag else ""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("etag")
+
+
+async def _client(port, paths, count, revalidate, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    try:
+        for i in range(count):
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            status, etag = await _request(reader, writer, path, etags.get(path) if revalidate else None)
+            latencies.append(time.perf_counter() - start)
+            if status not in (200, 304):
+                raise RuntimeError(f"{path} returned {status}")
+            etags[path] = etag
+    finally:
+        writer.close()
+
+
+async def _run(port, clients, total, revalidate):
+    latencies = []
+    per_client = max(1, total // clients)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        # Stagger start points so clients don't all hit the same path at once
+        _client(port, PATHS[i % len(PATHS):] + PATHS[:i % len(PATHS)], per_client, revalidate, latencies)
+        for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def _wait_ready(port, process, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("API server exited before it was ready")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("API server did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per pass")
+    args = parser.parse_args()
+
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "recruitment_api.py"), "--port", str(port)],
+                               cwd=REPO_DIR, stdout=subprocess.DEVNULL)
+    try:
+        _wait_ready(port, process)
+        for clients in args.clients:
+            for revalidate in (False, True):
+                result = asyncio.run(_run(port, clients, args.requests, revalidate))
+                mode = "If-None-Match" if revalidate else "GET"
+                print(f"{clients:>4} clients {mode:>13}: {result['requests']:>6,} requests, "
+                      f"{result['throughput']:>8,.0f} req/s, p50 {result['p50_ms']:6.2f} ms, "
+                      f"p99 {result['p99_ms']:6.2f} ms")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
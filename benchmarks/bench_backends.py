@@ -0,0 +1,68 @@
+"""pandas vs Polars backend for the full aggregate build.
+
+Times ``build_aggregates`` on each backend over synthetic scaled tables and
+checks that every table comes out the same. Polars uses all cores unless
+``POLARS_MAX_THREADS`` says otherwise.
+
+    python benchmarks/bench_backends.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import recruitment_polars  # noqa: E402
+from recruitment_metrics import build_aggregates  # noqa: E402
+from synthetic import load_workbooks, scale_for_rows, scaled_dataset  # noqa: E402
+
+
+def mismatches(expected, actual):
+    """Names of the sections whose tables differ between the two builds."""
+    differing = []
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            try:
+                pd.testing.assert_frame_equal(value, actual[name], check_dtype=False, check_index_type=False)
+            except AssertionError:
+                differing.append(name)
+        elif name == "seasonality":
+            for year, sections in value.items():
+                for section, table in sections.items():
+                    try:
+                        pd.testing.assert_frame_equal(table, actual[name][year][section], check_dtype=False,
+                                                      check_index_type=False)
+                    except (AssertionError, KeyError):
+                        differing.append(f"{name}[{year}].{section}")
+        elif name == "key_metrics" and value != actual[name]:
+            differing.append(name)
+    return differing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+    if not recruitment_polars.available():
+        sys.exit("Polars is not installed (pip install polars)")
+
+    candidates_df, activity_df = load_workbooks()
+    for rows in args.rows:
+        scale = scale_for_rows(rows, activity_df)
+        candidates, activity = scaled_dataset(scale, candidates_df, activity_df)
+        timings, results = {}, {}
+        for backend in ("pandas", "polars"):
+            start = time.perf_counter()
+            results[backend] = build_aggregates(candidates, activity, low_memory=False, backend=backend)
+            timings[backend] = time.perf_counter() - start
+        differing = mismatches(results["pandas"], results["polars"])
+        print(f"{len(activity):>11,} activity rows: pandas {timings['pandas']:6.2f} s | "
+              f"polars {timings['polars']:6.2f} s ({timings['pandas'] / timings['polars']:.1f}x) | "
+              + ("identical" if not differing else "differs: " + ", ".join(differing)))
+
+
+if __name__ == "__main__":
+    main()
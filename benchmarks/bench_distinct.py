@@ -0,0 +1,78 @@
+"""Exact vs HyperLogLog distinct counts for the funnel and year-wise table.
+
+Builds both tables each way on synthetic scaled activity tables and reports
+time, peak traced memory, the size of the sketches kept afterwards and the
+largest relative error of the estimates.
+
+    python benchmarks/bench_distinct.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_metrics import (compute_application_dates, compute_stage_counts,  # noqa: E402
+                                 compute_yearly_table, compute_yearly_table_from_sketches)
+from recruitment_sketch import HLL_PRECISION, FunnelSketches, relative_error  # noqa: E402
+from recruitment_stats import CONFIDENCE  # noqa: E402
+from synthetic import load_workbooks, scale_for_rows, scaled_dataset  # noqa: E402
+
+
+def exact_tables(candidates, activity):
+    stage_counts = compute_stage_counts(candidates, activity)
+    yearly_df, _ = compute_yearly_table(candidates, activity, stage_counts, compute_application_dates(activity))
+    return stage_counts, yearly_df
+
+
+def sketch_tables(candidates, activity):
+    sketches = FunnelSketches(candidates, activity)
+    stage_counts = sketches.stage_counts()
+    yearly_df, _ = compute_yearly_table_from_sketches(sketches, stage_counts)
+    return stage_counts, yearly_df, sketches.nbytes
+
+
+def measure(build, candidates, activity):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(candidates, activity)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    candidates_df, activity_df = load_workbooks()
+    print(f"HyperLogLog precision {HLL_PRECISION}: error bound ±{relative_error():.1%} per count "
+          f"at {CONFIDENCE:.0%} confidence")
+    for rows in args.rows:
+        scale = scale_for_rows(rows, activity_df)
+        candidates, activity = scaled_dataset(scale, candidates_df, activity_df)
+        (exact_counts, exact_yearly), exact_seconds, exact_peak = measure(exact_tables, candidates, activity)
+        (hll_counts, hll_yearly, sketch_bytes), hll_seconds, hll_peak = measure(sketch_tables, candidates, activity)
+
+        years = [column for column in exact_yearly.columns if column not in ("Total", "Conversion %")]
+        exact_cells = np.concatenate([exact_counts.to_numpy(), exact_yearly[years].to_numpy().ravel()])
+        hll_cells = np.concatenate([hll_counts.reindex(exact_counts.index).to_numpy(),
+                                    hll_yearly.reindex(exact_yearly.index)[years].to_numpy().ravel()])
+        # Relative errors of cells with a handful of candidates say little
+        large = exact_cells >= 1000
+        errors = np.abs(hll_cells[large] - exact_cells[large]) / exact_cells[large]
+        within = np.count_nonzero(errors <= relative_error())
+        print(f"{len(activity):>11,} activity rows: exact {exact_seconds:6.2f} s, {exact_peak / 2**20:7.0f} MB | "
+              f"hll {hll_seconds:6.2f} s, {hll_peak / 2**20:7.0f} MB, sketches {sketch_bytes / 2**20:4.1f} MB | "
+              f"max error {errors.max(initial=0):.2%}, {within}/{len(errors)} within bound "
+              f"(about {CONFIDENCE:.0%} expected)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Figure construction: inline vs on the figure thread pool.
+
+Builds every aggregate-only dashboard figure (the ones the script submits
+before the first tab) with 0 workers (inline, one after another) and with
+each pool size given. Each figure is then serialized with ``to_dict`` and
+``plotly.io.to_json`` on the calling thread, as ``st.plotly_chart`` does.
+Reports the wall time per rerun plus the inline per-figure times.
+
+    python benchmarks/bench_figures.py --workers 2 4 8 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.io
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_figures import (FigureStage, bottleneck_figure, candidate_type_figure,  # noqa: E402
+                                 funnel_figure, hire_rate_figure, offer_figure, offer_rates_long, paths_figure,
+                                 position_figure, role_type_heatmap, time_to_offer_figure)
+from recruitment_metrics import build_aggregates  # noqa: E402
+from recruitment_paths import build_transitions  # noqa: E402
+from synthetic import load_workbooks  # noqa: E402
+
+
+def figure_specs(aggregates, paths):
+    return [
+        ("funnel", funnel_figure, aggregates["funnel"]),
+        ("paths", paths_figure, paths),
+        ("hire_rate", hire_rate_figure, aggregates["hire_conversion_by_source"]),
+        ("offer_rates", offer_figure, offer_rates_long(aggregates["offer_analysis_by_source"])),
+        ("time_to_offer", time_to_offer_figure, aggregates["time_to_offer_by_source"]),
+        ("positions", position_figure, aggregates["position_analysis"]),
+        ("bottlenecks", bottleneck_figure, aggregates["bottlenecks_by_position"]),
+        ("candidate_types", candidate_type_figure, aggregates["candidate_type_responses"]),
+        ("role_types", role_type_heatmap, aggregates["role_type_durations"]),
+    ]
+
+
+def render(specs, workers, pool=None):
+    stage = FigureStage(workers, pool)
+    start = time.perf_counter()
+    for name, builder, data in specs:
+        stage.submit(name, builder, data)
+    for name, _, _ in specs:
+        fig = stage.result(name)
+        render_start = time.perf_counter()
+        plotly.io.to_json(fig.to_dict(), validate=False)
+        stage.timings[-1][3] = time.perf_counter() - render_start
+    return time.perf_counter() - start, stage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    candidates_df, activity_df = load_workbooks()
+    specs = figure_specs(build_aggregates(candidates_df, activity_df), build_transitions(candidates_df, activity_df))
+    # Warm plotly's lazily built validators before timing anything
+    render(specs, 0)
+
+    print(f"{os.cpu_count()} CPUs, {len(specs)} figures, median of {args.repeat} runs")
+    runs = [render(specs, 0) for _ in range(args.repeat)]
+    print(f" 0 workers: {statistics.median(seconds for seconds, _ in runs) * 1000:7.1f} ms")
+    inline_stage = runs[-1][1]
+    for workers in args.workers:
+        if workers <= 0:
+            continue
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            runs = [render(specs, workers, pool) for _ in range(args.repeat)]
+        print(f"{workers:>2} workers: {statistics.median(seconds for seconds, _ in runs) * 1000:7.1f} ms")
+    print(inline_stage.timing_table().drop(columns="Wait ms").to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
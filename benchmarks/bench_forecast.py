@@ -0,0 +1,46 @@
+"""Forecast benchmark: fit time for many synthetic monthly series.
+
+    python benchmarks/bench_forecast.py --series 100 1000 10000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_forecast import HORIZON, forecast_values  # noqa: E402
+
+
+def synthetic_series(series, months, seed=0):
+    # Poisson counts around a per-series level with a shared yearly cycle
+    rng = np.random.default_rng(seed)
+    month = np.arange(months)
+    seasonal = 1 + 0.6 * np.sin(2 * np.pi * (month - 7) / 12)
+    levels = rng.gamma(2.0, 10.0, size=(series, 1))
+    return rng.poisson(levels * seasonal[None, :])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--months", type=int, default=48)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for series in args.series:
+        values = synthetic_series(series, args.months)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            forecast_values(values, HORIZON, workers=args.workers)
+            timings.append(time.perf_counter() - start)
+        print(f"{series:>7} series x {args.months} months, workers={args.workers}: "
+              f"best {min(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Path-analysis benchmark on synthetic scaled activity tables.
+
+    python benchmarks/bench_paths.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_paths import build_transitions  # noqa: E402
+from synthetic import load_workbooks, scale_for_rows, scaled_dataset  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    candidates_df, activity_df = load_workbooks()
+    for rows in args.rows:
+        scale = scale_for_rows(rows, activity_df)
+        candidates, activity = scaled_dataset(scale, candidates_df, activity_df)
+        start = time.perf_counter()
+        transitions = build_transitions(candidates, activity)
+        elapsed = time.perf_counter() - start
+        hops = int(transitions["counts"].to_numpy().sum())
+        print(f"{len(activity):>11,} activity rows, {len(candidates):>10,} candidates: "
+              f"{elapsed:6.2f} s ({hops:,} hops)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Offer-decline risk: full build vs incremental update.
+
+Builds the feature store, model and open-candidate scores over synthetic
+scaled tables. It then moves 1% of the open candidates on to their next
+stage on the cut-off day and times a full rebuild against ``update`` from
+the previous build. The two must give the same scores.
+
+    python benchmarks/bench_risk.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_paths import STAGE_ORDER  # noqa: E402
+from recruitment_risk import build_offer_risk  # noqa: E402
+from synthetic import load_workbooks, scale_for_rows, scaled_dataset  # noqa: E402
+
+
+def new_activity(model, activity_df, share=0.01, seed=0):
+    """Activity with ``share`` of the open, still-waiting candidates moved on a stage on the cut-off day."""
+    store = model.store
+    waiting = np.flatnonzero(store.open & (store.last_stage < len(STAGE_ORDER) - 1))
+    rng = np.random.default_rng(seed)
+    moved = rng.choice(waiting, size=max(1, int(len(waiting) * share)), replace=False)
+    rows = pd.DataFrame({
+        "Candidate ID Number": store.ids[moved],
+        "Stage Name": np.array(STAGE_ORDER)[store.last_stage[moved] + 1],
+        "Date When Reached the Stage": store.cutoff,
+    })
+    return pd.concat([activity_df, rows], ignore_index=True), len(moved)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    candidates_df, activity_df = load_workbooks()
+    for rows in args.rows:
+        candidates, activity = scaled_dataset(scale_for_rows(rows, activity_df), candidates_df, activity_df)
+        start = time.perf_counter()
+        model = build_offer_risk(candidates, activity)
+        build_seconds = time.perf_counter() - start
+
+        activity, moved = new_activity(model, activity)
+        start = time.perf_counter()
+        rebuilt = build_offer_risk(candidates, activity)
+        rebuild_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        updated = build_offer_risk(candidates, activity, model)
+        update_seconds = time.perf_counter() - start
+
+        same = np.allclose(rebuilt.scores, updated.scores, equal_nan=True)
+        print(f"{len(activity):>11,} activity rows, {int(model.store.scored.sum()):,} scored: "
+              f"build {build_seconds:6.2f} s | {moved:,} moved on: rebuild {rebuild_seconds:6.2f} s, "
+              f"update {update_seconds:6.2f} s ({updated.rescored:,} rescored) | "
+              + ("same scores" if same else "scores differ"))
+
+
+if __name__ == "__main__":
+    main()
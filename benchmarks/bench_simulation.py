@@ -0,0 +1,42 @@
+"""Pipeline simulation throughput by cohort count and worker count.
+
+Fits the pipeline model once, then times a baseline run for every cohort
+count with each worker count given (0 runs in-process) and checks that every
+worker count projects the same funnel.
+
+    python benchmarks/bench_simulation.py --cohorts 20000 100000 --workers 0 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recruitment_simulation import PipelineModel  # noqa: E402
+from synthetic import load_workbooks  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cohorts", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    candidates_df, activity_df = load_workbooks()
+    start = time.perf_counter()
+    model = PipelineModel(candidates_df, activity_df)
+    print(f"{os.cpu_count()} CPUs, model fitted in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for cohorts in args.cohorts:
+        funnels = []
+        for workers in args.workers:
+            result = model.simulate(cohorts=cohorts, workers=workers)
+            funnels.append(result["funnel"])
+            print(f"{cohorts:>9,} cohorts x {result['cohort_size']} applicants, {workers} workers: "
+                  f"{result['seconds']:6.2f} s")
+        same = all(funnel.equals(funnels[0]) for funnel in funnels)
+        print(f"{'':>9} funnels {'identical' if same else 'differ'} across worker counts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Startup benchmark: import times and first render of the dashboard.
+
+Every measurement runs in a fresh interpreter so module caches don't hide
+import cost. First render is timed twice, once against an empty snapshot
+directory (cold: parse workbooks and build aggregates) and once after
+``prewarm`` (the path a freshly started server takes).
+
+    python benchmarks/bench_startup.py --repeat 5 --output startup.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "recruitment_analytics_case_study.py")
+
+IMPORTED_MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "requests",
+    "plotly.express",
+    "plotly.graph_objects",
+    "plotly.subplots",
+    "recruitment_cache",
+    "recruitment_data",
+    "recruitment_memory",
+    "recruitment_stats",
+    "recruitment_export",
+    "recruitment_partitions",
+    "recruitment_metrics",
+    "recruitment_figures",
+]
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(time.perf_counter() - start)
+"""
+
+
+def _run_timed(snippet, env):
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=REPO_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _env(snapshot_dir):
+    env = dict(os.environ)
+    env.setdefault("RECRUITMENT_CANDIDATES_SOURCE", os.path.join(REPO_DIR, "CandidateDetails.xlsx"))
+    env.setdefault("RECRUITMENT_ACTIVITY_SOURCE", os.path.join(REPO_DIR, "RecruitingActivity.xlsx"))
+    env["RECRUITMENT_SNAPSHOT_DIR"] = snapshot_dir
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def bench_imports(repeat):
+    env = _env(tempfile.mkdtemp())
+    return {
+        module: statistics.median(_run_timed(IMPORT_SNIPPET.format(module=module), env) for _ in range(repeat))
+        for module in IMPORTED_MODULES
+    }
+
+
+def bench_first_render(repeat):
+    results = {"cold": [], "prewarmed": []}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            env = _env(snapshot_dir)
+            results["cold"].append(_run_timed(RENDER_SNIPPET.format(app=APP_PATH), env))
+            subprocess.run([sys.executable, os.path.join(REPO_DIR, "recruitment_data.py"), "prewarm"],
+                           cwd=REPO_DIR, env=env, check=True, capture_output=True)
+            results["prewarmed"].append(_run_timed(RENDER_SNIPPET.format(app=APP_PATH), env))
+    return {name: statistics.median(times) for name, times in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    imports = bench_imports(args.repeat)
+    first_render = bench_first_render(args.repeat)
+
+    print("Import time (median, fresh interpreter)")
+    for module, seconds in imports.items():
+        print(f"  {module:<24} {seconds * 1000:8.1f} ms")
+    print("First render (median, fresh interpreter)")
+    for name, seconds in first_render.items():
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+
+    if args.output:
+        record = {"timestamp": time.time(), "imports": imports, "first_render": first_render}
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
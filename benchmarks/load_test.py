@@ -0,0 +1,222 @@
+"""Concurrent-session load test for the dashboard.
+
+Each session count runs in a fresh interpreter that plays N headless
+sessions (``streamlit.testing.v1.AppTest``) at once, one thread per session,
+all sharing that process's ``st.cache_resource`` state the way sessions
+share a real server process. After its first page load every session
+performs random interactions: changing the year, trend, time-to-stage and
+seasonality selectboxes, or searching a candidate ID. Every interaction
+is one timed rerun. Tabs are switched in the browser without a rerun, and
+every rerun executes all tab bodies, so a rerun covers every tab.
+
+For every session count it reports p50/p95/p99 rerun latency, CPU use
+(process CPU seconds per wall second) and peak RSS growth per session,
+against a prewarmed snapshot of the workbooks in this repo.
+
+    python benchmarks/load_test.py --sessions 1 5 10 --steps 10 --save-baseline
+    python benchmarks/load_test.py --sessions 1 5 10 --steps 10
+
+Without ``--save-baseline`` the run is a regression gate against the stored
+baseline (``--baseline``, default ``benchmarks/load_baseline.json``). It
+exits non-zero if there is no baseline, if a session count is missing from
+it, or if any session count's p95 latency is more than ``--tolerance``
+above the baseline's.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "recruitment_analytics_case_study.py")
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmarks", "load_baseline.json")
+
+SELECTBOXES = [
+    "Select Year to Compare:",
+    "Trend metric",
+    "Rolling window",
+    "Split trend by",
+    "Time from application to",
+    "Split curves by",
+    "Select Year for Seasonality Analysis",
+]
+SEARCH_BOX = "Find candidate by ID"
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _interact(at, rng, candidate_ids, selectbox_values):
+    # One random interaction, then the rerun it triggers
+    if rng.random() < 0.15:
+        prefix = str(rng.choice(candidate_ids))[:rng.randint(2, 4)]
+        [box for box in at.text_input if box.label == SEARCH_BOX][0].input(prefix)
+    else:
+        boxes = [box for box in at.selectbox if box.label in SELECTBOXES]
+        box = rng.choice(boxes)
+        if box.label in selectbox_values:
+            box.select(rng.choice(selectbox_values[box.label]))
+        else:
+            box.select_index(rng.randrange(len(box.options)))
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def run_sessions(sessions, steps, seed):
+    """Worker side: play ``sessions`` concurrent sessions and return the measurements."""
+    sys.path.insert(0, REPO_DIR)
+    import pandas as pd
+    from streamlit.testing.v1 import AppTest
+
+    from recruitment_memory import PeakRssSampler, current_rss_bytes
+    from recruitment_trends import METRICS
+
+    # Selectboxes with a format_func have to be set by value, not by displayed label
+    selectbox_values = {"Trend metric": list(METRICS)}
+
+    candidate_ids = pd.read_excel(os.path.join(REPO_DIR, "CandidateDetails.xlsx"),
+                                  usecols=["Candidate ID Number"])["Candidate ID Number"].tolist()
+
+    # Load the dataset once so the per-session numbers exclude the shared snapshot
+    warmup = AppTest.from_file(APP_PATH, default_timeout=600)
+    warmup.run()
+    base_rss = current_rss_bytes()
+
+    latencies, first_loads, errors = [], [], []
+    lock = threading.Lock()
+
+    def session(index):
+        rng = random.Random(seed + index)
+        try:
+            at = AppTest.from_file(APP_PATH, default_timeout=600)
+            start = time.perf_counter()
+            at.run()
+            first = time.perf_counter() - start
+            times = [_interact(at, rng, candidate_ids, selectbox_values) for _ in range(steps)]
+        except Exception:
+            with lock:
+                errors.append(traceback.format_exc())
+            return
+        with lock:
+            first_loads.append(first)
+            latencies.extend(times)
+
+    sampler = PeakRssSampler().start()
+    cpu_start, wall_start = os.times(), time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu_end = os.times()
+    peak_rss = sampler.stop()
+
+    if errors:
+        raise SystemExit(f"{len(errors)} session(s) failed: {errors[0]}")
+    latencies.sort()
+    cpu_seconds = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "first_load_p95_ms": _percentile(sorted(first_loads), 0.95) * 1000,
+        "cpu_utilization": cpu_seconds / wall,
+        "rss_mb": peak_rss / 2 ** 20 if peak_rss else None,
+        "rss_per_session_mb": (peak_rss - base_rss) / 2 ** 20 / sessions if peak_rss and base_rss else None,
+    }
+
+
+def _env(snapshot_dir):
+    env = dict(os.environ)
+    env.setdefault("RECRUITMENT_CANDIDATES_SOURCE", os.path.join(REPO_DIR, "CandidateDetails.xlsx"))
+    env.setdefault("RECRUITMENT_ACTIVITY_SOURCE", os.path.join(REPO_DIR, "RecruitingActivity.xlsx"))
+    env["RECRUITMENT_SNAPSHOT_DIR"] = snapshot_dir
+    # Magic parses the script with ast.parse, which is not thread-safe on every
+    # CPython version; the app doesn't use magic, so leave it off for the sessions
+    env["STREAMLIT_RUNNER_MAGIC_ENABLED"] = "false"
+    return env
+
+
+def check_baseline(results, baseline, tolerance):
+    """Regression messages for session counts whose p95 exceeds the baseline."""
+    previous = {entry["sessions"]: entry for entry in baseline["results"]}
+    failures = []
+    for result in results:
+        reference = previous.get(result["sessions"])
+        if reference is None:
+            failures.append(f"{result['sessions']} sessions: not in the baseline")
+        elif result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            failures.append(f"{result['sessions']} sessions: p95 {result['p95_ms']:.0f} ms vs "
+                            f"baseline {reference['p95_ms']:.0f} ms (+{tolerance:.0%} allowed)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--steps", type=int, default=10, help="interactions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_sessions(args.worker, args.steps, args.seed)))
+        return
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        # A gate without a baseline would pass everything
+        sys.exit(f"No baseline at {args.baseline}; run with --save-baseline on this machine to create one")
+
+    results = []
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = _env(snapshot_dir)
+        subprocess.run([sys.executable, os.path.join(REPO_DIR, "recruitment_data.py"), "prewarm"],
+                       cwd=REPO_DIR, env=env, check=True, capture_output=True)
+        for sessions in args.sessions:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", str(sessions),
+                 "--steps", str(args.steps), "--seed", str(args.seed)],
+                cwd=REPO_DIR, env=env, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            rss_per_session = result["rss_per_session_mb"]
+            print(f"{sessions:>4} sessions: {result['reruns']:>5} reruns, p50 {result['p50_ms']:7.0f} ms, "
+                  f"p95 {result['p95_ms']:7.0f} ms, p99 {result['p99_ms']:7.0f} ms, "
+                  f"CPU {result['cpu_utilization']:4.2f}, RSS {result['rss_mb']:6.0f} MB "
+                  f"({'n/a' if rss_per_session is None else f'{rss_per_session:.1f}'} MB/session)")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"timestamp": time.time(), "steps": args.steps, "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        failures = check_baseline(results, json.load(f), args.tolerance)
+    if failures:
+        print("Latency regressed past the baseline:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Within baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Synthetic scaled copies of the recruitment workbooks for benchmarks.
+
+The real candidate and activity tables are tiled ``scale`` times. Each copy
+gets fresh candidate IDs and shifts all of its dates by one random offset,
+so every candidate's stage order and durations stay realistic while the
+calendar spread widens. Activity rows are shuffled so nothing downstream
+can rely on the input already being sorted.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_workbooks():
+    candidates_df = pd.read_excel(os.path.join(REPO_DIR, "CandidateDetails.xlsx"))
+    activity_df = pd.read_excel(os.path.join(REPO_DIR, "RecruitingActivity.xlsx"))
+    return candidates_df, activity_df
+
+
+def scaled_dataset(scale, candidates_df=None, activity_df=None, max_shift_days=180, seed=0):
+    if candidates_df is None or activity_df is None:
+        candidates_df, activity_df = load_workbooks()
+    rng = np.random.default_rng(seed)
+    id_stride = int(candidates_df['Candidate ID Number'].max()) + 1
+    copy_shifts = rng.integers(-max_shift_days, max_shift_days + 1, size=scale)
+
+    candidate_copy = np.repeat(np.arange(scale), len(candidates_df))
+    candidates = candidates_df.iloc[np.tile(np.arange(len(candidates_df)), scale)].reset_index(drop=True)
+    candidates['Candidate ID Number'] = candidates['Candidate ID Number'].to_numpy() + candidate_copy * id_stride
+
+    activity_copy = np.repeat(np.arange(scale), len(activity_df))
+    activity = activity_df.iloc[np.tile(np.arange(len(activity_df)), scale)].reset_index(drop=True)
+    activity['Candidate ID Number'] = activity['Candidate ID Number'].to_numpy() + activity_copy * id_stride
+    activity['Date When Reached the Stage'] = (
+        activity['Date When Reached the Stage'] + pd.to_timedelta(copy_shifts[activity_copy], unit="D")
+    )
+    activity = activity.iloc[rng.permutation(len(activity))].reset_index(drop=True)
+    return candidates, activity
+
+
+def scale_for_rows(activity_rows, activity_df=None):
+    """Scale factor that yields roughly ``activity_rows`` activity rows."""
+    if activity_df is None:
+        _, activity_df = load_workbooks()
+    return max(1, round(activity_rows / len(activity_df)))
@@ -1,13 +1,15 @@
 
+import gc
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-import requests
-import io
-from datetime import datetime
+
+# Plotly is imported with the figure stage, after the key metrics, so the
+# header and key metrics paint before the charting libraries finish loading.
+# Modules that pull in pandas or numpy (exports, partitions, statistics) are
+# imported where their section runs; these top-level ones load neither.
+from recruitment_cache import SharedCache, share
+from recruitment_data import DataRefresher
+from recruitment_memory import RSS_CEILING_MB, PeakRssSampler, over_ceiling
 
 # Page configuration
 st.set_page_config(
@@ -17,6 +19,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Turn new reruns away while this process is over its memory budget
+if over_ceiling():
+    gc.collect()
+    if over_ceiling():
+        st.error("The dashboard is at its memory limit right now. Please try again in a moment.")
+        st.stop()
+
 # Custom CSS for professional styling
 st.markdown("""
 <style>
@@ -52,36 +61,83 @@ st.markdown("""
 
 
 
-# Load data function with caching
-@st.cache_data
-def load_data():
-    # Option 1: Load dat from the GitHub
-    candidates_details_excel_url = "https://raw.githubusercontent.com/Harshithareddy9/Recruitment-Analytics-Dashboard/e2264cda7fe0ca60379d768104792777972f54c2/CandidateDetails.xlsx"
+# One background refresher per server process, shared by every session
+@st.cache_resource
+def get_refresher():
+    return DataRefresher().start()
 
-    recruitment_activity_excel_url = "https://raw.githubusercontent.com/Harshithareddy9/Recruitment-Analytics-Dashboard/e2264cda7fe0ca60379d768104792777972f54c2/RecruitingActivity.xlsx"
+# Derived results shared by every session, keyed on dataset version and filter state
+@st.cache_resource
+def get_shared_cache():
+    return SharedCache()
 
-    
-    # Download the file
-    response1 = requests.get(candidates_details_excel_url)
-    candidates_details_excel_file = io.BytesIO(response1.content)
-    response2 = requests.get(recruitment_activity_excel_url)
-    recruitment_activity_excel_file = io.BytesIO(response2.content)
+# Download buttons for one table; the file is only written when a button is clicked
+def export_buttons(make_chunks, file_stem):
+    from recruitment_export import EXPORT_FORMATS, export_file
 
-    # Read the Excel file
-    candidates_df = pd.read_excel(candidates_details_excel_file)
-    activity_df = pd.read_excel(recruitment_activity_excel_file)
+    columns = st.columns(len(EXPORT_FORMATS))
+    for column, (fmt, (mime, label)) in zip(columns, EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                f"Download {label}",
+                data=lambda fmt=fmt: export_file(make_chunks(), fmt, sheet_name=file_stem),
+                file_name=f"{file_stem}.{fmt}",
+                mime=mime,
+                key=f"export-{file_stem}-{fmt}",
+                on_click="ignore",
+            )
+
+def export_table_buttons(name, year=None):
+    from recruitment_export import export_table, frame_chunks
 
-    return candidates_df, activity_df
+    file_stem = name if year is None else f"{name}-{year}"
+    export_buttons(lambda: frame_chunks(export_table(aggregates, name, year)), file_stem)
 
 # Load data
 try:
-    candidates_df, activity_df = load_data()
-    
+    refresher = get_refresher()
+    dataset = refresher.current()
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.info("Please make sure your Excel file is available at the specified URL")
     st.stop()
 
+rerun_memory = PeakRssSampler().start()
+
+# Sessions keep rendering this version even if a newer one is swapped in mid-run
+candidates_df = dataset.candidates_df
+activity_df = dataset.activity_df
+# Shallow copy-on-write shares, so no session can modify what the others read
+aggregates = share(dataset.aggregates)
+shared_cache = get_shared_cache()
+
+with st.sidebar:
+    st.caption(f"Data as of {dataset.loaded_at:%Y-%m-%d %H:%M:%S} (version {dataset.version})")
+    st.caption(f"Last refresh took {dataset.refresh_seconds:.1f}s")
+    if refresher.last_error is not None:
+        st.warning(f"Background refresh problem, serving the data above: {refresher.last_error}")
+    if st.button("Refresh data"):
+        refresher.request_refresh()
+        st.toast("Refreshing in the background; the current data stays available meanwhile.")
+
+    # Candidate lookup resolves through the prebuilt index, never a table scan
+    candidate_index = aggregates["candidate_index"]
+    candidate_query = st.text_input("Find candidate by ID", placeholder="ID or ID prefix")
+    selected_candidate = None
+    if candidate_query.strip():
+        candidate_matches = candidate_index.search(candidate_query)
+        if not candidate_matches:
+            st.info(f"No candidate ID starts with {candidate_query.strip()}")
+        elif len(candidate_matches) == 1:
+            selected_candidate = candidate_matches[0]
+        else:
+            match_count = candidate_index.count(candidate_query)
+            if match_count > len(candidate_matches):
+                st.caption(f"Showing {len(candidate_matches)} of {match_count:,} matches")
+            exact = [cid for cid in candidate_matches if str(cid) == candidate_query.strip()]
+            selected_candidate = st.selectbox("Matching candidates", candidate_matches,
+                                              index=candidate_matches.index(exact[0]) if exact else 0)
+
 # Main header
 st.markdown('<h1 class="main-header">Recruitment Analytics Dashboard</h1>', unsafe_allow_html=True)
 st.markdown("---")
@@ -89,31 +145,94 @@ st.markdown("---")
 # Overview metrics
 st.markdown('<h2 class="section-header">Key Metrics</h2>', unsafe_allow_html=True)
 #Adding Key Metrics to Dashboard
+key_metrics = aggregates["key_metrics"]
 col1, col2, col3, col4, col5, col6 = st.columns(6)
 with col1:
-    total_candidates = candidates_df['Candidate ID Number'].nunique()
-    st.metric("Total Candidates", f"{total_candidates:,}")
+    st.metric("Total Candidates", f"{key_metrics['total_candidates']:,}")
 with col2:
-    offer_sent_count = (candidates_df['Furthest Recruiting Stage Reached'].isin(['Offer Sent','Offer Accepted','Offer Declined'])).sum()
-    st.metric("Offers Sent", f"{offer_sent_count}")
+    st.metric("Offers Sent", f"{key_metrics['offer_sent_count']}")
 with col3:
-    hired_count = (candidates_df['Furthest Recruiting Stage Reached'] == 'Offer Accepted').sum()
-    st.metric("Hired", f"{hired_count}")
+    st.metric("Hired", f"{key_metrics['hired_count']}")
 with col4:
-    offer_declined = (candidates_df['Furthest Recruiting Stage Reached'] == 'Offer Declined').sum()
-    st.metric("Declined", f"{offer_declined}")
+    st.metric("Declined", f"{key_metrics['offer_declined']}")
 with col5:
-    No_response_from_candidate = (candidates_df['Furthest Recruiting Stage Reached'] == 'Offer Sent').sum()
-    st.metric("No response from Candidate", f"{No_response_from_candidate}")
+    st.metric("No response from Candidate", f"{key_metrics['no_response']}")
 with col6:
-    # Calculate conversion rate from offer sent to offer accepted
-    total_offers = offer_sent_count
-    if total_offers > 0:
-        conversion_rate = (hired_count / total_offers) * 100
-        st.metric("Offer Acceptance", f"{conversion_rate:.1f}%")
+    # Conversion rate from offer sent to offer accepted
+    if key_metrics['conversion_rate'] is not None:
+        st.metric("Offer Acceptance", f"{key_metrics['conversion_rate']:.1f}%")
     else:
         st.metric("Offer Acceptance", "N/A")
 
+# Charts that only need the aggregates start building on the figure pool now,
+# while the rest of the page is laid out; each tab takes its figures in order
+from recruitment_figures import (FigureStage, bottleneck_figure, candidate_type_figure,
+                                 candidate_type_monthly_figure, funnel_figure, hire_rate_figure,
+                                 monthly_acceptance_figure, monthly_volume_figure, offer_figure,
+                                 offer_rates_long, paths_figure, position_averages, position_figure,
+                                 role_type_heatmap, simulation_figure, split_path_links, survival_figure,
+                                 time_to_offer_figure,
+                                 timeline_figure, trend_figure)
+from recruitment_stats import CONFIDENCE, describe_method
+
+figures = FigureStage()
+figures.submit("funnel", funnel_figure, aggregates["funnel"])
+figures.submit("paths", paths_figure, aggregates["paths"])
+figures.submit("hire_rate", hire_rate_figure, aggregates["hire_conversion_by_source"])
+offer_plot_df = shared_cache.get((dataset.version, "offer_rates_long"),
+                                 lambda: offer_rates_long(aggregates["offer_analysis_by_source"]))
+figures.submit("offer_rates", offer_figure, offer_plot_df)
+figures.submit("time_to_offer", time_to_offer_figure, aggregates["time_to_offer_by_source"])
+figures.submit("positions", position_figure, aggregates["position_analysis"])
+figures.submit("bottlenecks", bottleneck_figure, aggregates["bottlenecks_by_position"])
+figures.submit("candidate_types", candidate_type_figure, aggregates["candidate_type_responses"])
+figures.submit("role_types", role_type_heatmap, aggregates["role_type_durations"])
+
+# Single-candidate view for the sidebar search
+if selected_candidate is not None:
+    candidate_view = shared_cache.get((dataset.version, "candidate", selected_candidate),
+                                      lambda: candidate_index.timeline(selected_candidate))
+    details = candidate_view["details"]
+    timeline_df = candidate_view["timeline"]
+
+    st.markdown(f'<h2 class="section-header">Candidate {selected_candidate}</h2>', unsafe_allow_html=True)
+    cand_col1, cand_col2, cand_col3, cand_col4 = st.columns(4)
+    with cand_col1:
+        st.metric("Position", details["Position Title"])
+    with cand_col2:
+        st.metric("Source", details["Application Source"])
+    with cand_col3:
+        st.metric("Outcome", candidate_view["outcome"])
+    with cand_col4:
+        last_day = timeline_df["Days Since Application"].max()
+        st.metric("Days in Process", "N/A" if timeline_df.empty or last_day != last_day else f"{last_day:.0f}")
+
+    if timeline_df.empty:
+        st.info("No recorded activity for this candidate.")
+    else:
+        figures.submit("timeline", timeline_figure, timeline_df)
+        figures.chart("timeline", use_container_width=True)
+        st.dataframe(timeline_df, use_container_width=True, hide_index=True)
+    st.caption(f"{details['Candidate Type']} candidate, {details['Department']} department")
+    st.markdown("---")
+
+# Filtered candidate drill-down with stage dates, exported in chunks
+with st.expander("Export candidate drill-down"):
+    from recruitment_export import DRILLDOWN_FILTERS, drilldown_chunks, drilldown_positions
+
+    drilldown_columns = st.columns(len(DRILLDOWN_FILTERS) + 1)
+    drilldown_filters = {}
+    for column, name in zip(drilldown_columns, DRILLDOWN_FILTERS.values()):
+        with column:
+            drilldown_filters[name] = st.multiselect(name, sorted(candidates_df[name].dropna().unique()),
+                                                     key=f"drilldown-{name}")
+    with drilldown_columns[-1]:
+        drilldown_years = st.multiselect("Application Year", aggregates["all_years"], key="drilldown-years")
+    drilldown_count = len(drilldown_positions(candidates_df, candidate_index, drilldown_filters, drilldown_years))
+    st.caption(f"{drilldown_count:,} candidates match")
+    export_buttons(lambda: drilldown_chunks(candidates_df, candidate_index, drilldown_filters, drilldown_years),
+                   "candidate-drilldown")
+
 # Create tabs for better organization
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "Recruitment Funnel", 
@@ -124,94 +243,42 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 ])
 
 with tab1:
+    from recruitment_trends import METRICS, WINDOWS
+
     # Funnel chart
     st.markdown('<h2 class="section-header">Recruitment Funnel Across All These Years</h2>', unsafe_allow_html=True)
 
-    stage_counts = (
-        activity_df.groupby("Stage Name")["Candidate ID Number"]
-        .nunique()
-        .sort_values(ascending=False)
-    )
-
-    # Trim "Date" from stage names for better representation and understanding
-    stage_counts.index = stage_counts.index.str.replace(' Date', '', regex=False)
+    figures.chart("funnel", use_container_width=True)
+    distinct_note = None
+    if aggregates["distinct_sketches"] is not None:
+        from recruitment_sketch import relative_error
+        distinct_note = (f"Approximate distinct counts (HyperLogLog): each count is within "
+                         f"±{relative_error():.1%} at {CONFIDENCE:.0%} confidence.")
+        st.caption(distinct_note)
 
-    offer_accepted_count = (candidates_df["Furthest Recruiting Stage Reached"] == "Offer Accepted").sum()
-    stage_counts["Offer Accepted"] = offer_accepted_count
+    # Stage-to-stage paths, including where each candidate's journey ended
+    st.markdown('<h3 class="section-header">Candidate Paths</h3>', unsafe_allow_html=True)
 
-    funnel_df = stage_counts.reset_index()
-    funnel_df.columns = ["Stage", "Candidates"]
+    paths = aggregates["paths"]
+    figures.chart("paths", use_container_width=True)
 
-    fig_funnel = go.Figure(go.Funnel(
-        y=funnel_df["Stage"],
-        x=funnel_df["Candidates"],
-        textinfo="value+percent previous"
-    ))
-
-    fig_funnel.update_layout(
-        title="Recruitment Funnel",
-        height=500
-    )
+    _, _, forward = split_path_links(paths)
+    backward_hops = int(paths["links"].loc[~forward, "Candidates"].sum())
+    if backward_hops:
+        st.caption(f"{backward_hops:,} transitions go back to an earlier stage (dates recorded out of order) "
+                   "and are left out of the chart.")
 
-    st.plotly_chart(fig_funnel, use_container_width=True)
+    with st.expander("Transition matrices"):
+        st.markdown("**Candidates moving from each stage (rows) to the next (columns)**")
+        st.dataframe(paths["counts"], use_container_width=True)
+        st.markdown("**Average days between the two stages**")
+        st.dataframe(paths["mean_days"], use_container_width=True)
 
     # Add detailed year-wise breakdown table
     st.markdown('<h3 class="section-header">Year-wise Stage Counts</h3>', unsafe_allow_html=True)
 
-    # First, get application dates for each candidate
-    application_dates = activity_df[activity_df['Stage Name'] == 'New Application Date'][['Candidate ID Number', 'Date When Reached the Stage']]
-    application_dates = application_dates.rename(columns={'Date When Reached the Stage': 'Application Date'})
-
-    # Merge application dates with activity data
-    activity_with_app_year = activity_df.merge(application_dates, on='Candidate ID Number', how='left')
-
-    # Extract year from application date (not stage date)
-    activity_with_app_year['Application_Year'] = activity_with_app_year['Application Date'].dt.year
-
-    # Get all unique application years and stages
-    all_years = sorted(activity_with_app_year['Application_Year'].dropna().unique())
-    all_stages = stage_counts.index.tolist() 
-
-    # Create pivot table with application year as columns and stages as rows
-    yearly_data = []
-
-    for stage in all_stages:
-        if stage == "Offer Accepted":
-            # Handle offer accepted separately because offer_accepted data is not present in activity_df, so we get data from candidates_df
-            row_data = {"Stage": stage}
-            for year in all_years:
-                # Get candidates who applied in this year
-                yearly_candidates = activity_with_app_year[activity_with_app_year['Application_Year'] == year]['Candidate ID Number'].unique()
-                offer_count = candidates_df[
-                    (candidates_df['Candidate ID Number'].isin(yearly_candidates)) &
-                    (candidates_df['Furthest Recruiting Stage Reached'] == "Offer Accepted")
-                ].shape[0]
-                row_data[str(year)] = offer_count
-        else:
-            # Handle regular stages - filter by application year, not stage year
-            stage_with_year = activity_with_app_year[
-                (activity_with_app_year['Stage Name'].str.contains(stage, na=False)) &
-                (activity_with_app_year['Application_Year'].notna())
-            ]
-            stage_year_counts = stage_with_year.groupby('Application_Year')['Candidate ID Number'].nunique()
-            row_data = {"Stage": stage}
-            for year in all_years:
-                row_data[str(year)] = stage_year_counts.get(year, 0)
-        
-        yearly_data.append(row_data)
-
-    # Create DataFrame and calculate totals
-    yearly_df = pd.DataFrame(yearly_data)
-    yearly_df = yearly_df.set_index('Stage')
-
-    # Add total column
-    yearly_df['Total'] = yearly_df.sum(axis=1)
-
-    # Add percentage column for the funnel conversion
-    if 'New Application' in yearly_df.index:
-        new_apps_total = yearly_df.loc['New Application', 'Total']
-        yearly_df['Conversion %'] = (yearly_df['Total'] / new_apps_total * 100).round(1)
-        yearly_df['Conversion %'] = yearly_df['Conversion %'].astype(str) + '%'
+    yearly_df = aggregates["yearly_table"]
+    all_years = aggregates["all_years"]
 
     # Display the table
     st.dataframe(
@@ -222,6 +289,9 @@ with tab1:
             "Conversion %": st.column_config.TextColumn("Conversion Rate")
         }
     )
+    if distinct_note:
+        st.caption(distinct_note)
+    export_table_buttons("yearly-stage-counts")
 
     # Add some insights
     st.markdown("**Key Insights:**")
@@ -244,12 +314,17 @@ with tab1:
                 prev_year = all_years[year_index - 1]
                 
                 if 'New Application' in yearly_df.index and 'Offer Accepted' in yearly_df.index:
-                    recent_apps = yearly_df.loc['New Application', str(selected_year)]
-                    recent_offers = yearly_df.loc['Offer Accepted', str(selected_year)]
+                    # Only the two years' partitions are read
+                    from recruitment_partitions import year_stage_counts
+
+                    recent_counts = year_stage_counts(aggregates, selected_year)
+                    prev_counts = year_stage_counts(aggregates, prev_year)
+                    recent_apps = recent_counts.get('New Application', 0)
+                    recent_offers = recent_counts.get('Offer Accepted', 0)
                     recent_conversion = (recent_offers / recent_apps * 100) if recent_apps > 0 else 0
                     
-                    prev_apps = yearly_df.loc['New Application', str(prev_year)]
-                    prev_offers = yearly_df.loc['Offer Accepted', str(prev_year)]
+                    prev_apps = prev_counts.get('New Application', 0)
+                    prev_offers = prev_counts.get('Offer Accepted', 0)
                     prev_conversion = (prev_offers / prev_apps * 100) if prev_apps > 0 else 0
                     
                     # Calculate PERCENTAGE CHANGE (not percentage point difference)
@@ -285,124 +360,46 @@ with tab1:
     However, when the company makes an offer, it's **very effective—77% of people accepted**. This shows that while the **initial screening is very strict**, the company is **successful at closing** the candidates it wants.
     """)
 
+    # Rolling trends over the whole history, from the prefix-sum engines
+    st.markdown('<h3 class="section-header">Rolling Trends</h3>', unsafe_allow_html=True)
+
+    trend_col1, trend_col2, trend_col3 = st.columns(3)
+    with trend_col1:
+        trend_metric = st.selectbox("Trend metric", list(METRICS), format_func=METRICS.get)
+    with trend_col2:
+        trend_window = st.selectbox("Rolling window", list(WINDOWS), index=1)
+    with trend_col3:
+        trend_dimension = st.selectbox("Split trend by", ["None", "Application Source", "Position Title"])
+
+    rolling_engine = aggregates["rolling"][None if trend_dimension == "None" else trend_dimension]
+    trend_groups = None
+    if trend_dimension != "None":
+        trend_groups = st.multiselect(f"{trend_dimension} to show", rolling_engine.groups,
+                                      default=rolling_engine.groups[:5])
+
+    trend_df = shared_cache.get(
+        (dataset.version, "rolling", trend_dimension, trend_metric, trend_window,
+         None if trend_groups is None else tuple(trend_groups)),
+        lambda: rolling_engine.window(trend_metric, WINDOWS[trend_window], step_days=7, groups=trend_groups)
+    )
+    figures.submit("trend", trend_figure, trend_df, trend_window, METRICS[trend_metric], trend_dimension)
+    figures.chart("trend", use_container_width=True)
+    st.caption("Candidates are counted on the day they applied, so the most recent windows are still maturing.")
+
 with tab2:
     # Application Source Analysis
     st.markdown('<h2 class="section-header">Performance by Application Source</h2>', unsafe_allow_html=True)
 
     # Hire conversion rate by source
-    hire_conversion_rate = (
-        candidates_df.groupby("Application Source")["Furthest Recruiting Stage Reached"]
-        .apply(lambda x: (x == "Offer Accepted").mean())
-        .reset_index()
-    )
-    hire_conversion_rate.columns = ["Application Source", "Hired Percent"]
-    hire_conversion_rate['Hired Percent'] = round(hire_conversion_rate['Hired Percent'] * 100, 2)
-    hire_conversion_rate = hire_conversion_rate.sort_values('Hired Percent', ascending=False)
-
-    fig_hire_rate = px.bar(
-        hire_conversion_rate,
-        x="Application Source",
-        y="Hired Percent",
-        text=hire_conversion_rate["Hired Percent"].astype(str) + '%',
-        title="Hire Conversion Rate by Application Source",
-        color="Hired Percent",
-        color_continuous_scale="greens",
-        height=500
-    )
-    fig_hire_rate.update_traces(textposition="outside")
-    fig_hire_rate.update_layout(
-        xaxis_title="Application Source",
-        yaxis_title="Hired Percent (%)",
-        title_x=0.5
-    )
+    figures.chart("hire_rate", use_container_width=True)
 
-    st.plotly_chart(fig_hire_rate, use_container_width=True)
-    
     # Offer acceptance vs declined rates by source
-    offer_extended_candidates = candidates_df[
-        candidates_df['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)
-    ]['Candidate ID Number'].unique()
-
-    offers_df = candidates_df[candidates_df['Candidate ID Number'].isin(offer_extended_candidates)].copy()
-
-    offer_analysis = (
-        offers_df.groupby('Application Source')['Furthest Recruiting Stage Reached']
-        .agg(
-            Offers_Extended='count',
-            Accepted=lambda x: (x == 'Offer Accepted').sum(),
-            Declined=lambda x: (x == 'Offer Declined').sum()
-        )
-        .reset_index()
-    )
-
-    offer_analysis['Acceptance Rate'] = round((offer_analysis['Accepted'] / offer_analysis['Offers_Extended']) * 100, 1)
-    offer_analysis['Declined Rate'] = round((offer_analysis['Declined'] / offer_analysis['Offers_Extended']) * 100, 1)
-    offer_analysis = offer_analysis.sort_values('Acceptance Rate', ascending=False)
-
-    plot_df = offer_analysis.melt(
-        id_vars=['Application Source'],
-        value_vars=['Acceptance Rate', 'Declined Rate'],
-        var_name='Metric',
-        value_name='Rate (%)'
-    )
-
-    fig_offer = px.bar(
-        plot_df,
-        x="Application Source",
-        y="Rate (%)",
-        color="Metric",
-        barmode='group',
-        text=plot_df["Rate (%)"].astype(str) + '%',
-        title="Offer Acceptance vs. Declined Rates by Application Source",
-        color_discrete_map={
-            "Acceptance Rate": "#2E8B57",
-            "Declined Rate": "#DC143C"
-        },
-        height=500
-    )
-
-    fig_offer.update_traces(textposition='outside')
-    fig_offer.update_layout(
-        title_x=0.5,
-        xaxis_title="Application Source",
-        yaxis_title="Rate (%)",
-        legend_title="Outcome"
-    )
-
-    st.plotly_chart(fig_offer, use_container_width=True)
+    figures.chart("offer_rates", use_container_width=True)
+    export_table_buttons("offer-analysis-by-source")
+    st.caption(f"Error bars show {describe_method()}; sources with only a handful of offers have wide intervals.")
 
     # Time to offer by source
-    pivot = activity_df.pivot(index="Candidate ID Number", 
-                           columns="Stage Name", 
-                           values="Date When Reached the Stage")
-
-    pivot["time_to_offer"] = (pivot["Offer Sent Date"] - pivot["New Application Date"]).dt.days
-    pivot = pivot.merge(candidates_df[["Candidate ID Number", "Application Source", "Furthest Recruiting Stage Reached"]], 
-                        on="Candidate ID Number", how="left")
-
-    pivot_offers = pivot[pivot['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)]
-    time_to_offer_by_source = pivot_offers.groupby("Application Source")["time_to_offer"].mean().reset_index()
-    time_to_offer_by_source['time_to_offer'] = time_to_offer_by_source['time_to_offer'].round(1)
-    time_to_offer_by_source = time_to_offer_by_source.sort_values('time_to_offer', ascending=True)
-
-    fig_tto_source = px.bar(
-        time_to_offer_by_source,
-        x="Application Source",
-        y="time_to_offer",
-        text=time_to_offer_by_source["time_to_offer"].round(1),
-        title="Average Time from Application-to-Offer by Application Source (Days)",
-        color="time_to_offer",
-        color_continuous_scale="Viridis", 
-        height=500
-    )
-    fig_tto_source.update_traces(textposition="outside", texttemplate='%{text} days')
-    fig_tto_source.update_layout(
-        xaxis_title="Application Source",
-        yaxis_title="Average Time (Days)",
-        title_x=0.5
-    )
-
-    st.plotly_chart(fig_tto_source, use_container_width=True)
+    figures.chart("time_to_offer", use_container_width=True)
     st.subheader('Summary:')
     st.write("""
 
@@ -429,149 +426,13 @@ with tab3:
     # Position Level Analysis
     st.markdown('<h2 class="section-header">Performance by Position</h2>', unsafe_allow_html=True)
 
-    # Calculate time to hire by position
-    pivot = activity_df.pivot(index="Candidate ID Number", 
-                           columns="Stage Name", 
-                           values="Date When Reached the Stage")
-
-    pivot["time_to_offer"] = (pivot["Offer Sent Date"] - pivot["New Application Date"]).dt.days
-    pivot = pivot.merge(candidates_df[["Candidate ID Number", "Position Title"]], on="Candidate ID Number", how="left")
-    time_to_hire = pivot.groupby("Position Title")["time_to_offer"].mean().reset_index()
-    time_to_hire['time_to_offer'] = time_to_hire['time_to_offer'].round(1)
-
-    # Calculate offer outcomes by position
-    offer_extended_candidates = candidates_df[
-        candidates_df['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)
-    ]['Candidate ID Number'].unique()
-
-    offers_df = candidates_df[candidates_df['Candidate ID Number'].isin(offer_extended_candidates)].copy()
-
-    offer_rates = (
-        offers_df.groupby("Position Title")["Furthest Recruiting Stage Reached"]
-        .agg(
-            Total_Offers='count',
-            Accepted=lambda x: (x == "Offer Accepted").sum(),
-            Declined=lambda x: (x == "Offer Declined").sum(),
-            No_Response=lambda x: (x == "Offer Sent").sum()
-        )
-        .reset_index()
-    )
-
-    offer_rates['Acceptance Rate'] = round((offer_rates['Accepted'] / offer_rates['Total_Offers']) * 100, 1)
-    offer_rates['Rejection Rate'] = round((offer_rates['Declined'] / offer_rates['Total_Offers']) * 100, 1)
-    offer_rates['No Response Rate'] = round((offer_rates['No_Response'] / offer_rates['Total_Offers']) * 100, 1)
-    offer_rates = offer_rates[['Position Title', 'Acceptance Rate', 'Rejection Rate', 'No Response Rate', 'Total_Offers']]
-
-    # Merge data
-    position_analysis_df = time_to_hire.merge(offer_rates, on="Position Title")
-    position_analysis_df = position_analysis_df.sort_values('Position Title')
-
-    # Create subplots
-    fig = make_subplots(
-        rows=4, cols=1,
-        subplot_titles=('Time-to-Offer by Position (Days)', 
-                        'Offer Acceptance Rate by Position (%)',
-                        'Offer Rejection Rate by Position (%)',
-                        'No Response Rate by Position (%)'),
-        vertical_spacing=0.10,
-        shared_xaxes=True
-    )
-
-    # Add Time-to-Offer chart
-    fig.add_trace(
-        go.Bar(
-            x=position_analysis_df['Position Title'],
-            y=position_analysis_df['time_to_offer'],
-            name='Time-to-Offer',
-            marker_color='#FF7F0E',
-            text=position_analysis_df['time_to_offer'],
-            texttemplate='%{text} days',
-            textposition='auto'
-        ),
-        row=1, col=1
-    )
+    # Time to hire and offer outcomes by position, with company average lines
+    company_avg_time, company_avg_acceptance, company_avg_rejection, company_avg_no_response = \
+        position_averages(aggregates["position_analysis"])
 
-    # Add Acceptance Rate chart
-    fig.add_trace(
-        go.Bar(
-            x=position_analysis_df['Position Title'],
-            y=position_analysis_df['Acceptance Rate'],
-            name='Acceptance Rate',
-            marker_color='#2E8B57',
-            text=position_analysis_df['Acceptance Rate'],
-            texttemplate='%{text}%',
-            textposition='auto'
-        ),
-        row=2, col=1
-    )
-
-    # Add Rejection Rate chart
-    fig.add_trace(
-        go.Bar(
-            x=position_analysis_df['Position Title'],
-            y=position_analysis_df['Rejection Rate'],
-            name='Rejection Rate',
-            marker_color='#DC143C',
-            text=position_analysis_df['Rejection Rate'],
-            texttemplate='%{text}%',
-            textposition='auto'
-        ),
-        row=3, col=1
-    )
-
-    # Add No Response Rate chart
-    fig.add_trace(
-        go.Bar(
-            x=position_analysis_df['Position Title'],
-            y=position_analysis_df['No Response Rate'],
-            name='No Response Rate',
-            marker_color='#6A5ACD',
-            text=position_analysis_df['No Response Rate'],
-            texttemplate='%{text}%',
-            textposition='auto'
-        ),
-        row=4, col=1
-    )
-
-    # Add company average lines
-    company_avg_time = position_analysis_df['time_to_offer'].mean()
-    company_avg_acceptance = position_analysis_df['Acceptance Rate'].mean()
-    company_avg_rejection = position_analysis_df['Rejection Rate'].mean()
-    company_avg_no_response = position_analysis_df['No Response Rate'].mean()
-
-    fig.add_hline(y=company_avg_time, line_dash="dash", line_color="blue", 
-                  annotation_text=f"Avg: {company_avg_time:.1f} days", 
-                  row=1, col=1)
-
-    fig.add_hline(y=company_avg_acceptance, line_dash="dash", line_color="blue",
-                  annotation_text=f"Avg: {company_avg_acceptance:.1f}%",
-                  row=2, col=1)
-
-    fig.add_hline(y=company_avg_rejection, line_dash="dash", line_color="blue",
-                  annotation_text=f"Avg: {company_avg_rejection:.1f}%",
-                  row=3, col=1)
-
-    fig.add_hline(y=company_avg_no_response, line_dash="dash", line_color="blue",
-                  annotation_text=f"Avg: {company_avg_no_response:.1f}%",
-                  row=4, col=1)
-
-    # Update layout
-    fig.update_layout(
-        title='Complete Hiring Performance Dashboard by Position',
-        height=1000,
-        width=1000,
-        template='plotly_white',
-        showlegend=False
-    )
-
-    # Update axes
-    fig.update_xaxes(tickangle=45, row=4, col=1)
-    fig.update_yaxes(title_text="Days", row=1, col=1)
-    fig.update_yaxes(title_text="Percentage", row=2, col=1, range=[0, 100])
-    fig.update_yaxes(title_text="Percentage", row=3, col=1, range=[0, 100])
-    fig.update_yaxes(title_text="Percentage", row=4, col=1, range=[0, 100])
-
-    st.plotly_chart(fig, use_container_width=True)
+    figures.chart("positions", use_container_width=True)
+    export_table_buttons("position-analysis")
+    st.caption(f"Error bars on the rate charts show {describe_method()}.")
 
     # Display company averages
     st.success("Averages Across All Positions:")
@@ -633,262 +494,122 @@ with tab3:
 
 
 with tab4:
+    from recruitment_survival import DIMENSIONS, EVENTS
+
     # Hiring Process Analysis
     st.markdown('<h2 class="section-header">Hiring Process Analysis</h2>', unsafe_allow_html=True)
     
-    # Calculate stage durations
-    pivot["App_to_Phone"] = (pivot["Phone Screen Date"] - pivot["New Application Date"]).dt.days
-    pivot["Phone_to_Interview"] = (pivot["In-House Interview Date"] - pivot["Phone Screen Date"]).dt.days
-    pivot["Interview_to_Offer"] = (pivot["Offer Sent Date"] - pivot["In-House Interview Date"]).dt.days
-    
-    # Calculate average duration per stage transition
-    bottlenecks_by_position = pivot.groupby("Position Title")[["App_to_Phone", "Phone_to_Interview", "Interview_to_Offer"]].mean().reset_index()
-    bottlenecks_by_position = bottlenecks_by_position.melt(id_vars=["Position Title"], 
-                                                          var_name="Stage Transition", 
-                                                          value_name="Avg Days")
-    
-    # Map stage transitions to readable names
-    stage_mapping = {
-        "App_to_Phone": "Application → Phone Screen",
-        "Phone_to_Interview": "Phone Screen → Interview", 
-        "Interview_to_Offer": "Interview → Offer"
-    }
-    bottlenecks_by_position["Stage Transition"] = bottlenecks_by_position["Stage Transition"].map(stage_mapping)
-    
-    # Define the correct order of stages
-    stage_order = ["Application → Phone Screen", "Phone Screen → Interview", "Interview → Offer"]
-    bottlenecks_by_position['Stage Transition'] = pd.Categorical(
-        bottlenecks_by_position['Stage Transition'], 
-        categories=stage_order, 
-        ordered=True
-    )
-    
-    # Sort the dataframe by Position Title and Stage Transition
-    bottlenecks_by_position = bottlenecks_by_position.sort_values(['Position Title', 'Stage Transition'])
-    
-    # Create a modern, sleek color palette with transparency
-    modern_colors = [
-        'rgba(100, 181, 246, 0.8)',  # Light blue with transparency
-        'rgba(77, 208, 225, 0.8)',   # Aqua/cyan with transparency  
-        'rgba(129, 199, 132, 0.8)'   # Soft green with transparency
-    ]
-    
-    # Create the grouped bar chart
-    fig_grid = px.bar(
-        bottlenecks_by_position,
-        x="Position Title",
-        y="Avg Days",
-        color="Stage Transition",
-        barmode='group',
-        text=bottlenecks_by_position["Avg Days"].round(1),
-        title="<b>Hiring Process Analysis</b><br>Average Stage Duration by Position",
-        color_discrete_sequence=modern_colors,
-        height=500
-    )
-    
-    # Update traces for a modern, shining appearance
-    fig_grid.update_traces(
-        textposition='outside',
-        textfont=dict(size=10),
-        marker=dict(
-            line=dict(
-                color='rgba(255,255,255,0.9)',  # Very subtle white border for shine effect
-                width=1.5
-            ),
-            opacity=0.85  # Slight transparency for modern look
-        )
-    )
-    
-    # Update layout for a sleek, professional appearance
-    fig_grid.update_layout(
-        xaxis_tickangle=-45,
-        xaxis_title="Position Title",
-        yaxis_title="Average Duration (Days)",
-        legend_title="Process Stage",
-        font=dict(family="Segoe UI, Arial, sans-serif", size=12),
-        title_font_size=20,
-        title_x=0.5,  # Center the title
-        hovermode='x unified'
-    )
-    
-    fig_grid.update_layout(legend=dict(
-        yanchor="top",
-        y=0.99,
-        xanchor="right",
-        x=0.99,
-        bgcolor='rgba(255,255,255,0.7)',
-        bordercolor='rgba(200,200,200,0.4)',
-        borderwidth=1,
-        font=dict(size=11)
-    ))
-    
-    # Add some final styling touches
-    fig_grid.update_xaxes(
-        showgrid=True,
-        gridcolor='rgba(0,0,0,0.05)',
-        gridwidth=1
-    )
-    
-    fig_grid.update_yaxes(
-        showgrid=True,
-        gridcolor='rgba(0,0,0,0.05)',
-        gridwidth=1
-    )
-    
-    st.plotly_chart(fig_grid, use_container_width=True)
+    # Average duration per stage transition
+    figures.chart("bottlenecks", use_container_width=True)
+    export_table_buttons("stage-bottlenecks")
     
     # Campus vs Experienced Analysis
     st.markdown('<h3 class="section-header">Candidate Type Analysis</h3>', unsafe_allow_html=True)
     
-    # Create a pivot for candidate type analysis
-    pivot_ce = pivot.merge(candidates_df[["Candidate ID Number", "Candidate Type", "Furthest Recruiting Stage Reached"]], 
-                          on="Candidate ID Number", how="left")
-    
-    # Filter for candidates who received offers
-    pivot_ce_offers = pivot_ce[pivot_ce['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)]
-    
-    # Calculate response counts
-    response_counts = pivot_ce_offers.groupby(["Candidate Type", "Furthest Recruiting Stage Reached"]).size().unstack(fill_value=0)
-    
-    # Define the expected columns and handle missing ones
-    expected_columns = ['Offer Accepted', 'Offer Declined', 'Offer Sent']
-    for col in expected_columns:
-        if col not in response_counts.columns:
-            response_counts[col] = 0
-    
-    # Rename columns for clarity
-    response_counts = response_counts.rename(columns={
-        'Offer Accepted': 'Accepted',
-        'Offer Declined': 'Declined', 
-        'Offer Sent': 'No Response'
-    })
-    
-    # Calculate totals and percentages
-    response_counts['Total'] = response_counts[['Accepted', 'Declined', 'No Response']].sum(axis=1)
-    response_counts = response_counts.reset_index()
-    
-    # Create donut charts
-    colors = ['rgba(76, 175, 80, 0.85)',   # Green for Accepted
-              'rgba(244, 67, 54, 0.85)',   # Red for Declined
-              'rgba(158, 158, 158, 0.85)'] # Grey for No Response
-    
-    # Get the candidate types
-    candidate_types = response_counts["Candidate Type"].tolist()
-    
-    # Create the enhanced donut chart
-    fig_donut_enhanced = make_subplots(
-        rows=1, cols=len(candidate_types),
-        specs=[[{"type": "domain"}] * len(candidate_types)],
-        subplot_titles=[f"<b>{ctype}</b>" for ctype in candidate_types]
-    )
-    
-    # Add donut charts with percentage labels in each section
-    for i, candidate_type in enumerate(candidate_types):
-        # Get the row for this candidate type
-        row_data = response_counts[response_counts["Candidate Type"] == candidate_type].iloc[0]
-        
-        values = [row_data["Accepted"], row_data["Declined"], row_data["No Response"]]
-        total = row_data["Total"]
-        
-        # Calculate percentages for each section
-        percentages = [(val / total) * 100 for val in values]
-        
-        # Create custom text for each section (percentage + label)
-        section_text = [f"{pct:.1f}%<br>{label}" for pct, label in zip(percentages, ["Accepted", "Declined", "No Response"])]
-        
-        fig_donut_enhanced.add_trace(go.Pie(
-            values=values,
-            labels=section_text,
-            hole=0.6,
-            name=candidate_type,
-            marker_colors=colors,
-            textinfo='label',
-            textposition='inside',
-            textfont=dict(size=12, color='white', family="Arial", weight="bold"),
-            showlegend=False
-        ), 1, i+1)
-        
-    
-    # Update layout for a professional appearance
-    fig_donut_enhanced.update_layout(
-        title_text="<b>Candidate Response Distribution by Candidate Type</b>",
-        title_x=0.5,
-        title_font_size=20,
-        height=500
-    )
-    
-    # Add total candidate counts as annotations
-    for i, candidate_type in enumerate(candidate_types):
-        total = response_counts[response_counts["Candidate Type"] == candidate_type]["Total"].iloc[0]
-        fig_donut_enhanced.add_annotation(
-            x=i/len(candidate_types) + 0.5/len(candidate_types),
-            y=-0.15,
-            text=f"Total Candidates: {total}",
-            showarrow=False,
-            font=dict(size=12, color="gray", family="Arial"),
-            xref="paper",
-            yref="paper"
-        )
-    
-    st.plotly_chart(fig_donut_enhanced, use_container_width=True)
+    # Donut per candidate type
+    figures.chart("candidate_types", use_container_width=True)
+    st.caption(f"Hover a section for its {describe_method()}.")
     
     # Role Type Analysis (Tech vs Non-Tech)
     st.markdown('<h3 class="section-header">Role Type Analysis (Tech vs Non-Tech)</h3>', unsafe_allow_html=True)
     
-    # Define role types
-    tech_roles = [
-        'Associate Software Developer', 'Sr. Software Engineer', 'IT Analyst', 
-        'UX Designer', 'Associate Product Manager', 'Sr. Product Manager'
-    ]
-    
-    non_tech_roles = [
-        'Finance Manager', 'Financial Analyst', 'Operations Coordinator', 
-        'Business Operations Manager', 'Sr. Customer Service Operations Associate', 
-        'Operations Generalist', 'Associate Relationship Manager', 'Account Executive'
-    ]
-    
-    hybrid_role = ['Sr. Business Analyst']
-    
-    # Define Tech vs Non-Tech based on Position Title
-    def role_type(title):
-        if title in tech_roles:
-            return "Tech-Roles"
-        elif title in non_tech_roles:
-            return "Non-Tech-Roles"
-        elif title in hybrid_role:
-            return "Hybrid-Roles"
-        else:
-            return "Other"
-    
-    pivot["Role Type"] = pivot["Position Title"].apply(role_type)
-    
-    # Average duration per stage by role type
-    stage_durations = pivot.groupby("Role Type")[["App_to_Phone","Phone_to_Interview","Interview_to_Offer"]].mean().reset_index()
-    
-    # Heatmap - perfect for executive presentations
-    pivot_heatmap = stage_durations.set_index("Role Type")
-    
-    fig_heatmap = px.imshow(
-        pivot_heatmap,
-        labels=dict(x="Stage Transition", y="Role Type", color="Days"),
-        aspect="auto",
-        title="<b>Hiring Process Heatmap: Stage Duration by Role Type</b>",
-        color_continuous_scale="Viridis",
-        height=400
+    figures.chart("role_types", use_container_width=True)
+    export_table_buttons("role-type-durations")
+
+    # Time from application to each stage, counting candidates who are still open
+    st.markdown('<h3 class="section-header">Time to Stage (Kaplan–Meier)</h3>', unsafe_allow_html=True)
+
+    survival = aggregates["survival"]
+    km_col1, km_col2, km_col3 = st.columns(3)
+    with km_col1:
+        km_event = st.selectbox("Time from application to", list(EVENTS), index=len(EVENTS) - 1)
+    with km_col2:
+        km_dimension = st.selectbox("Split curves by", ["None"] + DIMENSIONS)
+    with km_col3:
+        km_days = st.slider("Days since application", min_value=14, max_value=365, value=90, step=7)
+
+    km_key = None if km_dimension == "None" else km_dimension
+    km_groups = None
+    if km_key is not None:
+        km_groups = st.multiselect(f"{km_dimension} to compare", survival.groups[km_key],
+                                   default=survival.groups[km_key][:5])
+
+    km_filters = (km_event, km_key, None if km_groups is None else tuple(km_groups))
+    km_df = shared_cache.get((dataset.version, "survival_curves", km_days) + km_filters,
+                             lambda: survival.curves(km_event, km_key, groups=km_groups, max_days=km_days))
+    km_summary = shared_cache.get((dataset.version, "survival_summary") + km_filters,
+                                  lambda: survival.summary(km_event, km_key, groups=km_groups))
+    figures.submit("survival", survival_figure, km_df, km_event, km_dimension if km_key is not None else "")
+    figures.chart("survival", use_container_width=True)
+    st.dataframe(km_summary, use_container_width=True, hide_index=True)
+    st.caption(f"Candidates who have not reached the stage are censored at the data cut-off "
+               f"({survival.cutoff:%Y-%m-%d}), so still-open applicants only count for the days observed. "
+               f"Shaded bands are {CONFIDENCE:.0%} Greenwood intervals.")
+
+    # Monte Carlo projection of the pipeline under a capacity or speed change
+    st.markdown('<h3 class="section-header">Pipeline Simulator</h3>', unsafe_allow_html=True)
+
+    from recruitment_simulation import DIMENSIONS as SIMULATION_DIMENSIONS
+    from recruitment_simulation import ALL_CANDIDATES, compare
+
+    pipeline_model = aggregates["pipeline_model"]
+    sim_col1, sim_col2, sim_col3 = st.columns(3)
+    with sim_col1:
+        sim_dimension = st.selectbox("Simulate", [ALL_CANDIDATES] + SIMULATION_DIMENSIONS)
+    sim_key = None if sim_dimension == ALL_CANDIDATES else sim_dimension
+    with sim_col2:
+        sim_segment = st.selectbox(f"{sim_dimension} to simulate", pipeline_model.groups[sim_key],
+                                   disabled=sim_key is None)
+    with sim_col3:
+        sim_cohorts = st.selectbox("Simulated cohorts", [5000, 20000, 50000], index=1)
+    sim_col4, sim_col5 = st.columns(2)
+    with sim_col4:
+        sim_capacity = st.slider("Interview capacity (% of today)", min_value=50, max_value=200, value=125, step=5)
+    with sim_col5:
+        sim_cut = st.slider("Days cut from interview → offer", min_value=0, max_value=30, value=5)
+
+    sim_segment = None if sim_key is None else sim_segment
+    sim_filters = (sim_key, sim_segment, sim_cohorts)
+    sim_baseline = shared_cache.get((dataset.version, "simulation") + sim_filters + (100, 0),
+                                    lambda: pipeline_model.simulate(sim_key, sim_segment, cohorts=sim_cohorts))
+    sim_scenario = shared_cache.get(
+        (dataset.version, "simulation") + sim_filters + (sim_capacity, sim_cut),
+        lambda: pipeline_model.simulate(sim_key, sim_segment, cohorts=sim_cohorts,
+                                        interview_capacity=sim_capacity / 100, interview_to_offer_cut=sim_cut)
     )
-    
-    # Add annotations
-    for i, row in enumerate(pivot_heatmap.values):
-        for j, value in enumerate(row):
-            fig_heatmap.add_annotation(
-                x=j,
-                y=i,
-                text=f"{value:.1f}",
-                showarrow=False,
-                font=dict(color="white" if value > pivot_heatmap.values.mean() else "black", size=12)
-            )
-    
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    figures.submit("simulation", simulation_figure, sim_baseline["time_to_offer_share"],
+                   sim_scenario["time_to_offer_share"])
+    st.dataframe(compare(sim_baseline, sim_scenario), use_container_width=True, hide_index=True)
+    figures.chart("simulation", use_container_width=True)
+    st.caption(f"{sim_scenario['cohorts']:,} simulated monthly cohorts of {sim_scenario['cohort_size']:,} "
+               f"applicants each, resampled from history ({sim_scenario['seconds']:.2f} s). Stage pass-through "
+               f"and gaps are fitted per segment; extra interview capacity shortens the wait for an interview "
+               f"slot, and offer acceptance follows a logistic fit on time to offer and candidate type. "
+               f"Baseline and scenario share random draws, so the change column is the scenario's effect.")
+
+    # Decline risk for every candidate still in the pipeline, scored once per dataset version
+    st.markdown('<h3 class="section-header">Offer-Decline Risk</h3>', unsafe_allow_html=True)
+
+    from recruitment_risk import OPEN_WINDOW_DAYS
+
+    offer_risk = aggregates["offer_risk"]
+    open_risk = shared_cache.get((dataset.version, "offer_risk_open"),
+                                 lambda: offer_risk.open_candidates(candidates_df))
+    risk_threshold = st.slider("Show open candidates with decline risk of at least (%)",
+                               min_value=0, max_value=100, value=0, step=5)
+    # Unscored candidates only show with no threshold
+    shown = open_risk["Decline Risk %"] >= risk_threshold if risk_threshold else slice(None)
+    st.dataframe(open_risk[shown], use_container_width=True, hide_index=True)
+    with st.expander("What drives the score"):
+        st.dataframe(shared_cache.get((dataset.version, "offer_risk_drivers"), offer_risk.drivers),
+                     use_container_width=True, hide_index=True)
+    st.caption(f"Logistic model of offer declines trained on {offer_risk.trained_on} past offers "
+               f"({offer_risk.declines} declined). Open candidates are pending offers plus anyone with "
+               f"activity in the last {OPEN_WINDOW_DAYS} days. Those who reached the in-house interview are "
+               f"scored as if the offer went out on {offer_risk.store.cutoff:%Y-%m-%d}; earlier ones have no "
+               f"score yet. {offer_risk.rescored:,} of {len(offer_risk.store):,} candidates were rescored for this "
+               f"data version. With this few declines, treat scores as a ranking rather than exact probabilities.")
+
     st.subheader('Summary:')
     st.markdown("""
     ### 🛑 **Bottlenecks Are Role-Specific**
@@ -928,152 +649,43 @@ with tab4:
 with tab5:
     # Seasonality Analysis
     st.markdown('<h2 class="section-header">Seasonality Trends Analysis</h2>', unsafe_allow_html=True)
-    
-    # First, let's merge the application dates from activity_df
-    # Get the earliest date for each candidate (application date)
-    application_dates = activity_df[activity_df['Stage Name'] == 'New Application Date'][['Candidate ID Number', 'Date When Reached the Stage']]
-    application_dates = application_dates.rename(columns={'Date When Reached the Stage': 'Application Date'})
-    
-    # Merge application dates with candidate data
-    candidates_with_dates = candidates_df.merge(application_dates, on='Candidate ID Number', how='left') #candidates_with_dates is nothing but candidates_df_with_application_dates_info
-    
-    # Filter out candidates without application dates
-    candidates_with_dates = candidates_with_dates.dropna(subset=['Application Date'])
-    
-    # Extract year and month from application date
-    candidates_with_dates['Application_Year'] = candidates_with_dates['Application Date'].dt.year
-    candidates_with_dates['Application_Month'] = candidates_with_dates['Application Date'].dt.month
-    candidates_with_dates['Application_Month_Name'] = candidates_with_dates['Application Date'].dt.strftime('%B')
+
+    # Forecast for the quarter after the data ends; it doesn't depend on the year picked below
+    forecast_df = aggregates["forecast"]
+    forecast_months = forecast_df.columns[2:-2].tolist()
+    st.subheader(f"🔮 Forecast Applications: {forecast_months[0]} – {forecast_months[-1]}")
+    st.dataframe(forecast_df, hide_index=True, height=420)
+    st.caption(f"Next three months after the latest data. Seasonal Holt-Winters fitted jointly across all "
+               f"{len(forecast_df)} source × position series on complete months of history.")
 
     # Let the user select the year to analyze
-    available_years = sorted(candidates_with_dates['Application_Year'].dropna().unique())
+    available_years = aggregates["seasonality_years"]
     selected_year = st.selectbox("Select Year for Seasonality Analysis", available_years, index=available_years.index(2022))
     
-    # Filter for the latest year only
-    # Filter the data based on the selected year
-    latest_year_df = candidates_with_dates[candidates_with_dates['Application_Year'] == selected_year]
-    
-    def run_seasonality_analysis(year, candidates_with_dates):
-        year_df = candidates_with_dates[candidates_with_dates['Application_Year'] == year]
-
-        if year_df.empty:
+    def run_seasonality_analysis(year, seasonality):
+        if seasonality is None:
             st.warning(f"No application data found for year {year}")
             return
 
+        # The year's three charts build together
+        monthly_volume = seasonality["monthly_volume"]
+        monthly_acceptance = seasonality["monthly_acceptance"]
+        figures.submit("monthly_volume", monthly_volume_figure, monthly_volume, year)
+        figures.submit("monthly_acceptance", monthly_acceptance_figure, monthly_acceptance, year)
+        figures.submit("candidate_type_monthly", candidate_type_monthly_figure,
+                       seasonality["candidate_type_monthly"], year)
+
         st.subheader(f"📊 Seasonality Analysis for {year}")
         
         # ---- Monthly Volume Chart ----
-        monthly_volume = (
-            year_df.groupby(['Application_Month', 'Application_Month_Name'])
-            .size()
-            .reset_index(name='Application_Count')
-            .sort_values('Application_Month')
-        )
-        
-        fig_monthly_volume = px.bar(
-            monthly_volume,
-            x='Application_Month_Name',
-            y='Application_Count',
-            title=f"<b>Application Volume by Month - {year}</b>",
-            color='Application_Count',
-            color_continuous_scale='tealrose',
-            text='Application_Count',
-            width=1000,
-            height=500
-        )
-        fig_monthly_volume.update_traces(textposition='outside')
-        fig_monthly_volume.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Number of Applications",
-            xaxis={'categoryorder': 'array', 'categoryarray': [
-                'January', 'February', 'March', 'April', 'May', 'June', 
-                'July', 'August', 'September', 'October', 'November', 'December'
-            ]},
-            title_x=0.5
-        )
-        st.plotly_chart(fig_monthly_volume)
+        figures.chart("monthly_volume")
 
         # ---- Acceptance Rate Chart ----
-        monthly_acceptance = (
-            year_df.groupby(['Application_Month', 'Application_Month_Name'])
-            ['Furthest Recruiting Stage Reached']
-            .apply(lambda x: (x == "Offer Accepted").mean() * 100)
-            .reset_index(name='Acceptance_Rate')
-            .sort_values('Application_Month')
-        )
-        
-        fig_acceptance_monthly = px.line(
-            monthly_acceptance,
-            x='Application_Month_Name',
-            y='Acceptance_Rate',
-            title=f"<b>Offer Acceptance Rate by Application Month - {year}</b>",
-            markers=True,
-            line_shape='spline',
-            width=1000,
-            height=500
-        )
-        fig_acceptance_monthly.add_trace(
-            go.Scatter(
-                x=monthly_acceptance['Application_Month_Name'],
-                y=monthly_acceptance['Acceptance_Rate'],
-                mode='markers+text',
-                text=monthly_acceptance['Acceptance_Rate'].round(1),
-                textposition='top center',
-                marker=dict(size=10, color='red'),
-                showlegend=False
-            )
-        )
-        fig_acceptance_monthly.update_layout(
-            xaxis_title="Application Month",
-            yaxis_title="Acceptance Rate (%)",
-            xaxis={'categoryorder': 'array', 'categoryarray': [
-                'January', 'February', 'March', 'April', 'May', 'June', 
-                'July', 'August', 'September', 'October', 'November', 'December'
-            ]},
-            yaxis=dict(range=[0, max(monthly_acceptance['Acceptance_Rate']) * 1.2]),
-            title_x=0.5
-        )
-        st.plotly_chart(fig_acceptance_monthly)
+        figures.chart("monthly_acceptance")
+        st.caption(f"Error bars show {describe_method()} for each month's acceptance rate.")
 
         # ---- Candidate Type by Month ----
-        candidate_type_monthly = (
-            year_df.groupby(['Application_Month_Name', 'Candidate Type'])
-            .size()
-            .reset_index(name='Count')
-        )
-
-        fig_candidate_type = px.bar(
-            candidate_type_monthly,
-            x='Application_Month_Name',
-            y='Count',
-            color='Candidate Type',
-            title=f"<b>Candidate Type Distribution by Month - {year}</b>",
-            barmode='stack',
-            text='Count',  # This adds the count values to the bars
-            width=1000,
-            height=500
-        )
-
-        # Customize the text appearance - this is the key part
-        fig_candidate_type.update_traces(
-            texttemplate='%{text}', 
-            textposition='outside',  # Changed from 'inside' to 'outside'
-            textfont=dict(size=10, color='black')
-        )
-
-        fig_candidate_type.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Number of Applications",
-            xaxis={'categoryorder': 'array', 'categoryarray': [
-                'January', 'February', 'March', 'April', 'May', 'June', 
-                'July', 'August', 'September', 'October', 'November', 'December'
-            ]},
-            title_x=0.5,
-            uniformtext_minsize=8,
-            uniformtext_mode='hide'
-        )
-
-        st.plotly_chart(fig_candidate_type)
+        figures.chart("candidate_type_monthly")
 
         # ---- Insights ----
         st.markdown("### 📈 Seasonality Insights & Recommendations")
@@ -1089,19 +701,7 @@ with tab5:
             st.write(f"• {row['Application_Month_Name']}: {row['Acceptance_Rate']:.1f}% acceptance")
 
         st.markdown("🌐 **Top 5 Sources with Seasonality:**")
-        top_sources_analysis = year_df.groupby('Application Source').agg({
-            'Candidate ID Number': 'count',
-            'Furthest Recruiting Stage Reached': [
-                lambda x: (x == "Offer Accepted").mean() * 100,  # Offer acceptance rate
-                lambda x: (x.isin(["Offer Sent", "Offer Accepted", "Offer Declined"]).mean() * 100 )      # Offer sent rate
-            ]
-        }).round(1)
-
-        # Flatten the multi-level column names
-        top_sources_analysis.columns = ['Application_Count', 'Offer_Acceptance_Rate', 'Offer_Sent_Rate']
-
-        # Get top 5 sources by application count
-        top_sources_analysis = top_sources_analysis.nlargest(5, 'Application_Count')
+        top_sources_analysis = seasonality["top_sources"]
 
         for source, row in top_sources_analysis.iterrows():
             st.write(f"• **{source}**: {row['Application_Count']} applications, "
@@ -1115,10 +715,30 @@ with tab5:
         **🎯 Recommendation:** Focus mass recruitment efforts in **September-November** using **Campus Events** or **Career Fairs**
         for optimal results. Audit the **Campus Job Board** process to improve conversion rates.
         """)
-    # ---- Call the function after Streamlit filter ----
-    run_seasonality_analysis(selected_year, candidates_with_dates)
-
-
-
-
 
+        with st.expander(f"Export {year} seasonality tables"):
+            for name, label in [("seasonality-monthly-volume", "Monthly volume"),
+                                ("seasonality-monthly-acceptance", "Monthly acceptance"),
+                                ("seasonality-candidate-types", "Candidate types by month"),
+                                ("seasonality-top-sources", "Top sources")]:
+                st.markdown(f"**{label}**")
+                export_table_buttons(name, year)
+    # ---- Call the function after Streamlit filter ----
+    from recruitment_partitions import year_seasonality
+
+    run_seasonality_analysis(selected_year, year_seasonality(aggregates, selected_year))
+
+# Per-rerun memory footprint
+peak_rss = rerun_memory.stop()
+if peak_rss is not None:
+    with st.sidebar:
+        ceiling_note = f" (ceiling {RSS_CEILING_MB:,.0f} MB)" if RSS_CEILING_MB else ""
+        st.caption(f"Peak RSS this rerun: {peak_rss / 2**20:,.0f} MB{ceiling_note}")
+
+# Which charts dominate this rerun's render time
+with st.sidebar.expander("Figure timings"):
+    figure_timings = figures.timing_table()
+    st.dataframe(figure_timings, use_container_width=True, hide_index=True)
+    st.caption(f"{len(figure_timings)} figures built on {figures.workers or 'no'} worker threads; "
+               f"the script waited {figure_timings['Wait ms'].sum():,.0f} ms for them and spent "
+               f"{figure_timings['Render ms'].sum():,.0f} ms serializing them in st.plotly_chart.")
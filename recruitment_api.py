@@ -0,0 +1,397 @@
+"""JSON metrics API over the same dataset and aggregates as the dashboard.
+
+A small asyncio HTTP/1.1 server (standard library only, keep-alive, GET
+only) that exposes each dashboard section's aggregates as JSON::
+
+    python recruitment_api.py --port 8600
+
+    GET /api/version
+    GET /api/key-metrics
+    GET /api/funnel?year=2021&year=2022
+    GET /api/funnel?source=Website,Agency    (or position=...)
+    GET /api/sources?source=Website,Agency
+    GET /api/positions?position=...&role_type=Tech-Roles
+    GET /api/stage-durations?position=...&role_type=...
+    GET /api/candidate-types?candidate_type=Campus
+    GET /api/seasonality?year=2022&source=...
+    GET /api/export/<table>?format=csv|parquet|xlsx
+    GET /api/export/candidates?format=parquet&source=...&position=...
+        &candidate_type=...&stage=...&year=...
+
+Exports stream with chunked transfer encoding; see ``recruitment_export``
+for the table names. Repeated parameters and comma-separated values both select several values.
+One ``DataRefresher`` owns the dataset for the whole process, exactly as in
+the Streamlit app, so every request reads the current version without
+reloading anything.
+
+Responses are cached per (dataset version, path, normalized parameters) and
+carry an ETag derived from the same key, so a client revalidating with
+``If-None-Match`` gets a 304 without the payload being looked up or built.
+Concurrent misses for the same key share one build, which runs in the
+default executor to keep the event loop free.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+API_HOST = os.environ.get("RECRUITMENT_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("RECRUITMENT_API_PORT", "8600"))
+# Distinct (version, path, parameters) responses kept in memory
+API_CACHE_SIZE = int(os.environ.get("RECRUITMENT_API_CACHE_SIZE", "1024"))
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    # NumPy scalars and timestamps that survive to_dict
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def records(df):
+    """DataFrame rows as JSON-ready dicts, with NaN as null."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _filtered(df, column, values):
+    return df if not values else df[df[column].isin(values)]
+
+
+def _years(params, available):
+    try:
+        years = [int(year) for year in params.get("year", [])]
+    except ValueError:
+        raise ApiError(400, "year must be an integer")
+    unknown = sorted(set(years) - {int(year) for year in available})
+    if unknown:
+        raise ApiError(404, f"No data for year(s): {', '.join(map(str, unknown))}")
+    return years
+
+
+def key_metrics(dataset, params):
+    return dataset.aggregates["key_metrics"]
+
+
+def funnel(dataset, params):
+    from recruitment_metrics import compute_funnel, compute_stage_counts
+
+    aggregates = dataset.aggregates
+    years = _years(params, aggregates["all_years"])
+    sources, positions = params.get("source"), params.get("position")
+    if sources or positions:
+        if years:
+            raise ApiError(400, "Filter the funnel by year or by source/position, not both")
+        sketches = aggregates["distinct_sketches"]
+        if sketches is not None:
+            try:
+                return records(compute_funnel(sketches.stage_counts(sources, positions)))
+            except ValueError as e:
+                raise ApiError(400, str(e))
+        candidates = _filtered(_filtered(dataset.candidates_df, "Application Source", sources),
+                               "Position Title", positions)
+        activity = dataset.activity_df
+        activity = activity[activity["Candidate ID Number"].isin(candidates["Candidate ID Number"])]
+        return records(compute_funnel(compute_stage_counts(candidates, activity)))
+    if not years:
+        return records(aggregates["funnel"])
+    yearly = aggregates["yearly_table"][[str(year) for year in years]]
+    return records(yearly.reset_index())
+
+
+def sources(dataset, params):
+    aggregates = dataset.aggregates
+    table = aggregates["hire_conversion_by_source"].merge(
+        aggregates["offer_analysis_by_source"], on="Application Source", how="outer"
+    ).merge(aggregates["time_to_offer_by_source"], on="Application Source", how="left")
+    return records(_filtered(table, "Application Source", params.get("source")))
+
+
+def _with_role_type(df):
+    from recruitment_metrics import role_type
+
+    return df.assign(**{"Role Type": df["Position Title"].map(role_type)})
+
+
+def positions(dataset, params):
+    table = _with_role_type(dataset.aggregates["position_analysis"])
+    table = _filtered(table, "Position Title", params.get("position"))
+    return records(_filtered(table, "Role Type", params.get("role_type")))
+
+
+def stage_durations(dataset, params):
+    aggregates = dataset.aggregates
+    by_position = _with_role_type(aggregates["bottlenecks_by_position"])
+    by_position = _filtered(by_position, "Position Title", params.get("position"))
+    by_position = _filtered(by_position, "Role Type", params.get("role_type"))
+    by_role_type = _filtered(aggregates["role_type_durations"].reset_index(), "Role Type", params.get("role_type"))
+    return {"by_position": records(by_position), "by_role_type": records(by_role_type)}
+
+
+def candidate_types(dataset, params):
+    table = dataset.aggregates["candidate_type_responses"]
+    return records(_filtered(table, "Candidate Type", params.get("candidate_type")))
+
+
+def seasonality(dataset, params):
+    from recruitment_partitions import year_seasonality
+
+    aggregates = dataset.aggregates
+    years = _years(params, aggregates["seasonality_years"]) or [int(max(aggregates["seasonality_years"]))]
+    result = {}
+    for year in years:
+        sections = year_seasonality(aggregates, year)
+        top_sources = _filtered(sections["top_sources"].reset_index(), "Application Source", params.get("source"))
+        result[str(year)] = {
+            "monthly_volume": records(sections["monthly_volume"]),
+            "monthly_acceptance": records(sections["monthly_acceptance"]),
+            "candidate_type_monthly": records(sections["candidate_type_monthly"]),
+            "top_sources": records(top_sources),
+        }
+    return result
+
+
+def version(dataset, params):
+    return {
+        "version": dataset.version,
+        "loaded_at": dataset.loaded_at,
+        "refresh_seconds": round(dataset.refresh_seconds, 3),
+        "candidates": len(dataset.candidates_df),
+        "activity_rows": len(dataset.activity_df),
+    }
+
+
+def export_parameters(name):
+    from recruitment_export import DRILLDOWN_FILTERS, EXPORT_TABLES, SEASONALITY_TABLES
+
+    if name == "candidates":
+        return {"format", "year"} | set(DRILLDOWN_FILTERS)
+    if name in SEASONALITY_TABLES:
+        return {"format", "year"}
+    if name in EXPORT_TABLES:
+        return {"format"}
+    raise ApiError(404, f"Unknown export: {name}")
+
+
+def export(dataset, name, params):
+    """(content type, file name, byte-chunk generator) for one export."""
+    from recruitment_export import (DRILLDOWN_FILTERS, EXPORT_FORMATS, SEASONALITY_TABLES, drilldown_chunks,
+                                    export_table, frame_chunks, stream_export)
+
+    formats = params.get("format", ["csv"])
+    if len(formats) != 1 or formats[0] not in EXPORT_FORMATS:
+        raise ApiError(400, f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    fmt = formats[0]
+    aggregates = dataset.aggregates
+    if name == "candidates":
+        filters = {column: params.get(param) for param, column in DRILLDOWN_FILTERS.items()}
+        years = _years(params, aggregates["all_years"])
+        chunks = drilldown_chunks(dataset.candidates_df, aggregates["candidate_index"], filters, years)
+    elif name in SEASONALITY_TABLES:
+        years = _years(params, aggregates["seasonality_years"])
+        if len(years) > 1:
+            raise ApiError(400, "Seasonality exports take a single year")
+        chunks = frame_chunks(export_table(aggregates, name, years[0] if years else None))
+    else:
+        chunks = frame_chunks(export_table(aggregates, name))
+    return EXPORT_FORMATS[fmt][0], f"{name}.{fmt}", stream_export(chunks, fmt, sheet_name=name)
+
+
+EXPORT_PREFIX = "/api/export/"
+
+# Path -> (payload builder, accepted query parameters)
+ROUTES = {
+    "/api/version": (version, set()),
+    "/api/key-metrics": (key_metrics, set()),
+    "/api/funnel": (funnel, {"year", "source", "position"}),
+    "/api/sources": (sources, {"source"}),
+    "/api/positions": (positions, {"position", "role_type"}),
+    "/api/stage-durations": (stage_durations, {"position", "role_type"}),
+    "/api/candidate-types": (candidate_types, {"candidate_type"}),
+    "/api/seasonality": (seasonality, {"year", "source"}),
+}
+
+
+def parse_params(query, accepted):
+    params = {}
+    for name, value in parse_qsl(query, keep_blank_values=False):
+        if name not in accepted:
+            raise ApiError(400, f"Unknown parameter: {name}")
+        params.setdefault(name, set()).update(part.strip() for part in value.split(",") if part.strip())
+    # Sorted so equivalent queries share one cache entry
+    return {name: sorted(values) for name, values in sorted(params.items())}
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches ``etag`` (weak comparison, ``*`` matches any)."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class MetricsApi:
+    def __init__(self, refresher, cache_size=API_CACHE_SIZE):
+        self.refresher = refresher
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def etag(self, version, path, params):
+        digest = hashlib.sha1(json.dumps([version, path, params]).encode()).hexdigest()[:16]
+        return f'"{version}-{digest}"'
+
+    async def respond(self, method, target, headers):
+        """(status, headers, body) for one request."""
+        try:
+            if method not in ("GET", "HEAD"):
+                raise ApiError(405, "Only GET is supported")
+            url = urlsplit(target)
+            exporting = url.path.startswith(EXPORT_PREFIX)
+            if exporting:
+                export_name = url.path[len(EXPORT_PREFIX):]
+                accepted = export_parameters(export_name)
+            elif url.path in ROUTES:
+                builder, accepted = ROUTES[url.path]
+            else:
+                raise ApiError(404, f"Unknown endpoint: {url.path}")
+            params = parse_params(url.query, accepted)
+            try:
+                dataset = self.refresher.current(timeout=0)
+            except (TimeoutError, RuntimeError) as e:
+                raise ApiError(503, str(e))
+
+            etag = self.etag(dataset.version, url.path, params)
+            response_headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Dataset-Version": dataset.version}
+            if etag_matches(headers.get("if-none-match", ""), etag):
+                return 304, response_headers, b""
+            if exporting:
+                # Streamed, not cached: the body is a generator of byte chunks
+                content_type, file_name, body = export(dataset, export_name, params)
+                response_headers["Content-Type"] = content_type
+                response_headers["Content-Disposition"] = f'attachment; filename="{file_name}"'
+            else:
+                body = await self._body(etag, builder, dataset, params)
+        except ApiError as e:
+            return e.status, {}, json.dumps({"error": str(e)}).encode()
+        except Exception as e:
+            return 500, {}, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+        return 200, response_headers, body
+
+    async def _body(self, key, builder, dataset, params):
+        task = self._cache.get(key)
+        if task is None:
+            # Concurrent misses for the same key await this one build
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(
+                None, lambda: json.dumps(builder(dataset, params), default=_json_default).encode()
+            )
+            self._cache[key] = task
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        try:
+            return await task
+        except Exception:
+            self._cache.pop(key, None)
+            raise
+
+    async def _stream(self, writer, chunks, chunked):
+        # Each chunk is produced in the executor; only one is held at a time
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                data = await loop.run_in_executor(None, next, chunks, None)
+            except Exception as e:
+                # Headers are already out; dropping the connection without the
+                # terminating chunk tells the client the download is incomplete
+                raise ConnectionAbortedError(f"Export failed: {e}") from e
+            if data is None:
+                break
+            if not data:
+                continue
+            writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n" if chunked else data)
+            await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, http_version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                streaming = not isinstance(body, bytes)
+                chunked = streaming and http_version == "HTTP/1.1"
+                # HTTP/1.0 streams are delimited by closing the connection
+                keep_alive = (http_version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                              and (chunked or not streaming))
+                response_headers.setdefault("Content-Type", "application/json")
+                head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+                if chunked:
+                    head.append("Transfer-Encoding: chunked")
+                elif not streaming:
+                    head.append(f"Content-Length: {len(body)}")
+                head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    if streaming:
+                        await self._stream(writer, body, chunked)
+                    else:
+                        writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=API_HOST, port=API_PORT, refresher=None):
+    from recruitment_data import DataRefresher
+
+    refresher = refresher or DataRefresher().start()
+    # Don't accept connections until the first dataset (snapshot or fresh build) is in
+    await asyncio.get_running_loop().run_in_executor(None, refresher.current)
+    api = MetricsApi(refresher)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    print(f"Serving recruitment metrics on http://{host}:{port}/api/ "
+          f"(dataset {refresher.current().version})", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recruitment metrics JSON API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,111 @@
+"""Process-wide cache of derived results shared by every dashboard session.
+
+Keys are tuples that start with the dataset version followed by whatever
+filter state the result depends on (metric, window, groups, ...), so a new
+dataset version simply stops hitting the old entries and they age out of
+the LRU.
+
+Values are stored frozen and handed out as shares:
+
+* NumPy arrays are stored with ``writeable=False`` and shared as is.
+* DataFrames and Series are shared as shallow copies. Under pandas
+  copy-on-write any write to a shallow copy (even adding a column) copies
+  first, so one session can never change what another session reads, and
+  no data is duplicated unless someone writes. Copy-on-write is only the
+  default from pandas 3, hence the ``pandas>=3`` requirement.
+* dicts, lists and tuples are walked recursively; other objects (engines,
+  indexes) are shared by reference and must be read-only by convention.
+
+Misses are single-flight: the first caller for a key computes it while any
+concurrent callers for the same key wait for that result instead of
+computing it again.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+SHARED_CACHE_SIZE = int(os.environ.get("RECRUITMENT_SHARED_CACHE_SIZE", "256"))
+
+
+def freeze(value):
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze(item)
+    return value
+
+
+def share(value):
+    """A view of a frozen value that is safe to hand to one session."""
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: share(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [share(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(share(item) for item in value)
+    return value
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    def __init__(self, max_entries=SHARED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute):
+        """Shared result for ``key``, calling ``compute()`` at most once per miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return share(self._entries[key])
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return share(flight.value)
+
+        try:
+            flight.value = freeze(compute())
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = flight.value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+        return share(flight.value)
@@ -0,0 +1,295 @@
+"""Dataset loading and stale-while-revalidate refresh for the dashboard.
+
+A single ``DataRefresher`` per process owns the current ``Dataset``. Sessions
+read whatever version is current; the refresher thread revalidates the
+sources in the background and swaps a fully rebuilt version in when the data
+changed, so no viewer ever waits on the download and Excel parse after the
+first load.
+
+Heavy modules (pandas, requests, the metrics module) are imported on first
+use, and a prewarmed snapshot lets a fresh server serve its first viewer
+without touching the network::
+
+    python recruitment_data.py prewarm
+"""
+import glob
+import hashlib
+import io
+import os
+import pickle
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Sources can be URLs or local paths, e.g. the workbooks checked into this repo
+CANDIDATES_SOURCE = os.environ.get(
+    "RECRUITMENT_CANDIDATES_SOURCE",
+    "https://raw.githubusercontent.com/Harshithareddy9/Recruitment-Analytics-Dashboard/e2264cda7fe0ca60379d768104792777972f54c2/CandidateDetails.xlsx"
+)
+ACTIVITY_SOURCE = os.environ.get(
+    "RECRUITMENT_ACTIVITY_SOURCE",
+    "https://raw.githubusercontent.com/Harshithareddy9/Recruitment-Analytics-Dashboard/e2264cda7fe0ca60379d768104792777972f54c2/RecruitingActivity.xlsx"
+)
+
+# How often the background thread revalidates the sources
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("RECRUITMENT_REFRESH_INTERVAL", "900"))
+# Until a first load succeeds, retry after this many seconds, doubling up to the interval
+RETRY_SECONDS = 5.0
+
+# Where ``prewarm`` and the refresher persist the last good dataset
+SNAPSHOT_DIR = os.environ.get(
+    "RECRUITMENT_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".recruitment_cache")
+)
+SNAPSHOT_FILE = "dataset.pkl"
+
+
+def _code_fingerprint():
+    # Snapshots only stay valid for the code that built them
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "recruitment_*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    # ... and for the settings that change the numbers themselves
+    for name in ("RECRUITMENT_DISTINCT_COUNTS", "RECRUITMENT_HLL_PRECISION"):
+        digest.update(f"{name}={os.environ.get(name, '')}".encode())
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class Dataset:
+    candidates_df: "pd.DataFrame"
+    activity_df: "pd.DataFrame"
+    aggregates: dict
+    version: str
+    loaded_at: datetime
+    refresh_seconds: float
+    validators: dict = field(default_factory=dict)
+
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+
+def fetch_source(source, validator=None):
+    """Return ``(content, validator)``; content is None when unchanged."""
+    validator = validator or {}
+    if _is_url(source):
+        import requests
+
+        # Conditional GET so an unchanged workbook costs a 304, not a download
+        headers = {}
+        if validator.get("etag"):
+            headers["If-None-Match"] = validator["etag"]
+        if validator.get("last_modified"):
+            headers["If-Modified-Since"] = validator["last_modified"]
+        response = requests.get(source, headers=headers, timeout=60)
+        if response.status_code == 304:
+            return None, validator
+        response.raise_for_status()
+        return response.content, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    stat = os.stat(source)
+    new_validator = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+    if validator == new_validator:
+        return None, validator
+    with open(source, "rb") as f:
+        return f.read(), new_validator
+
+
+def build_dataset(previous=None, directory=None):
+    """Revalidate both sources and rebuild; returns ``previous`` if unchanged.
+
+    The year partitions are written under ``directory`` (the snapshot directory).
+    """
+    started = time.perf_counter()
+    validators = previous.validators if previous is not None else {}
+
+    candidates_content, candidates_validator = fetch_source(CANDIDATES_SOURCE, validators.get("candidates"))
+    activity_content, activity_validator = fetch_source(ACTIVITY_SOURCE, validators.get("activity"))
+    new_validators = {"candidates": candidates_validator, "activity": activity_validator}
+
+    if previous is not None and candidates_content is None and activity_content is None:
+        return previous
+
+    # A source that answered 304 still has to be re-read if the other changed
+    if candidates_content is None:
+        candidates_content, new_validators["candidates"] = fetch_source(CANDIDATES_SOURCE)
+    if activity_content is None:
+        activity_content, new_validators["activity"] = fetch_source(ACTIVITY_SOURCE)
+
+    digest = hashlib.sha1()
+    digest.update(candidates_content)
+    digest.update(activity_content)
+    version = digest.hexdigest()[:12]
+    if previous is not None and previous.version == version:
+        return previous
+
+    import pandas as pd
+    from recruitment_cache import freeze
+    from recruitment_forecast import build_forecast
+    from recruitment_index import CandidateIndex
+    from recruitment_metrics import build_aggregates
+    from recruitment_partitions import write_errors, write_partitions
+    from recruitment_paths import build_transitions
+    from recruitment_risk import build_offer_risk
+    from recruitment_simulation import PipelineModel
+    from recruitment_survival import SurvivalTable
+    from recruitment_trends import build_rolling_engines
+
+    # Read the Excel files
+    candidates_df = pd.read_excel(io.BytesIO(candidates_content))
+    activity_df = pd.read_excel(io.BytesIO(activity_content))
+
+    aggregates = build_aggregates(candidates_df, activity_df)
+    # Rolling engines carry over the previous version's prefix sums
+    previous_rolling = previous.aggregates.get("rolling") if previous is not None else None
+    aggregates["rolling"] = build_rolling_engines(candidates_df, activity_df, previous_rolling)
+    aggregates["forecast"] = build_forecast(candidates_df, activity_df)
+    aggregates["paths"] = build_transitions(candidates_df, activity_df)
+    aggregates["survival"] = SurvivalTable(candidates_df, activity_df)
+    aggregates["pipeline_model"] = PipelineModel(candidates_df, activity_df)
+    # Decline-risk scores carry over the previous version's model and unchanged candidates
+    previous_risk = previous.aggregates.get("offer_risk") if previous is not None else None
+    aggregates["offer_risk"] = build_offer_risk(candidates_df, activity_df, previous_risk)
+    aggregates["candidate_index"] = CandidateIndex(candidates_df, activity_df)
+    try:
+        aggregates["partitions"] = write_partitions(candidates_df, activity_df, version, directory or SNAPSHOT_DIR)
+    except write_errors():
+        # Read-only deployments, or ones without a working parquet engine, serve
+        # year-scoped sections from the full aggregates
+        aggregates["partitions"] = None
+    # Every session reads these; nothing may write to them after this point
+    freeze(aggregates)
+
+    return Dataset(
+        candidates_df=candidates_df,
+        activity_df=activity_df,
+        aggregates=aggregates,
+        version=version,
+        loaded_at=datetime.now(),
+        refresh_seconds=time.perf_counter() - started,
+        validators=new_validators,
+    )
+
+
+def save_snapshot(dataset, directory=None):
+    directory = directory or SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    # Write then rename so a crash never leaves a half-written snapshot behind
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"code": _code_fingerprint(), "dataset": dataset}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(directory=None):
+    path = os.path.join(directory or SNAPSHOT_DIR, SNAPSHOT_FILE)
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("code") != _code_fingerprint():
+        return None
+    from recruitment_cache import freeze
+
+    # Unpickled arrays come back writeable
+    freeze(snapshot["dataset"].aggregates)
+    return snapshot["dataset"]
+
+
+def prewarm(directory=None):
+    """Build the dataset and aggregates and persist them for the next server start."""
+    dataset = build_dataset(load_snapshot(directory), directory)
+    save_snapshot(dataset, directory)
+    return dataset
+
+
+class DataRefresher:
+    """Background thread that keeps the current ``Dataset`` fresh."""
+
+    def __init__(self, interval=REFRESH_INTERVAL_SECONDS, snapshot_dir=None):
+        self.interval = interval
+        self.snapshot_dir = snapshot_dir
+        self.last_checked = None
+        self.last_error = None
+        self._dataset = None
+        self._loaded = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="recruitment-data-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def current(self, timeout=None):
+        """Return the live dataset, waiting only if nothing has loaded yet."""
+        if not self._loaded.wait(timeout):
+            raise TimeoutError("Dataset is still loading")
+        if self._dataset is None:
+            # Retry now rather than at the next scheduled wake
+            self.request_refresh()
+            raise RuntimeError(f"Initial data load failed: {self.last_error}")
+        return self._dataset
+
+    def request_refresh(self):
+        self._wake.set()
+
+    def refresh(self):
+        # Only one rebuild at a time; readers keep using the old version
+        with self._lock:
+            try:
+                dataset = build_dataset(self._dataset, self.snapshot_dir)
+            except Exception as e:
+                self.last_error = e
+            else:
+                self.last_error = None
+                if dataset is not self._dataset:
+                    # Single reference assignment, so the swap is atomic for readers
+                    self._dataset = dataset
+                    try:
+                        save_snapshot(dataset, self.snapshot_dir)
+                    except OSError as e:
+                        # The new data is live; only the next cold start misses out
+                        self.last_error = e
+            finally:
+                self.last_checked = datetime.now()
+                self._loaded.set()
+
+    def _run(self):
+        # Serve the prewarmed snapshot immediately, then revalidate behind it
+        snapshot = load_snapshot(self.snapshot_dir)
+        if snapshot is not None:
+            self._dataset = snapshot
+            self._loaded.set()
+        retry = RETRY_SECONDS
+        while True:
+            self.refresh()
+            if self._dataset is None:
+                # Nothing to serve yet, so don't wait a whole interval for the next attempt
+                self._wake.wait(min(retry, self.interval))
+                retry *= 2
+            else:
+                self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["prewarm"]:
+        sys.exit("usage: python recruitment_data.py prewarm")
+    dataset = prewarm()
+    print(f"Prewarmed dataset {dataset.version} ({len(dataset.candidates_df):,} candidates, "
+          f"{len(dataset.activity_df):,} activity rows) in {dataset.refresh_seconds:.1f}s")
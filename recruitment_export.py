@@ -0,0 +1,236 @@
+"""Streaming CSV / Parquet / XLSX export of tables and candidate drill-downs.
+
+Exports are generators of byte chunks fed by generators of DataFrame
+chunks, so memory stays bounded by ``RECRUITMENT_EXPORT_CHUNK_ROWS`` rather
+than by the size of the export:
+
+* CSV writes each chunk as it arrives (header on the first).
+* Parquet writes one row group per chunk through ``pyarrow.parquet``
+  and passes on whatever bytes that row group produced.
+* XLSX uses openpyxl's write-only workbook (rows go straight to temporary
+  files), saves to a temporary file and reads it back in pieces. Sheets
+  roll over at Excel's row limit.
+
+Candidate drill-downs are built chunk by chunk too: each chunk of filtered
+candidate rows gets its stage dates from the ``CandidateIndex`` activity
+slices, never from a merged copy of the whole activity table.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from recruitment_partitions import year_seasonality
+from recruitment_paths import STAGE_ORDER, stage_label
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("RECRUITMENT_EXPORT_CHUNK_ROWS", "50000"))
+
+# Format -> (MIME type, button label)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "CSV"),
+    "parquet": ("application/vnd.apache.parquet", "Parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "Excel"),
+}
+
+# Table name -> aggregates key; seasonality tables also need a year
+EXPORT_TABLES = {
+    "yearly-stage-counts": "yearly_table",
+    "offer-analysis-by-source": "offer_analysis_by_source",
+    "position-analysis": "position_analysis",
+    "stage-bottlenecks": "bottlenecks_by_position",
+    "role-type-durations": "role_type_durations",
+}
+SEASONALITY_TABLES = {
+    "seasonality-monthly-volume": "monthly_volume",
+    "seasonality-monthly-acceptance": "monthly_acceptance",
+    "seasonality-candidate-types": "candidate_type_monthly",
+    "seasonality-top-sources": "top_sources",
+}
+
+# Query parameter -> candidate column for drill-down filters
+DRILLDOWN_FILTERS = {
+    "source": "Application Source",
+    "position": "Position Title",
+    "candidate_type": "Candidate Type",
+    "stage": "Furthest Recruiting Stage Reached",
+}
+
+XLSX_MAX_ROWS = 1_048_576
+FILE_READ_BYTES = 1 << 20
+
+
+def exportable(df):
+    """Move a meaningful index (e.g. ``Stage``) into the columns."""
+    if any(name is not None for name in df.index.names):
+        return df.reset_index()
+    return df.reset_index(drop=True)
+
+
+def export_table(aggregates, name, year=None):
+    if name in EXPORT_TABLES:
+        return exportable(aggregates[EXPORT_TABLES[name]])
+    if name in SEASONALITY_TABLES:
+        if year is None:
+            year = max(aggregates["seasonality_years"])
+        return exportable(year_seasonality(aggregates, year)[SEASONALITY_TABLES[name]])
+    raise KeyError(name)
+
+
+def frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def drilldown_positions(candidates_df, index, filters, years=None):
+    """Candidate row offsets matching every filter (column -> accepted values) and application year."""
+    mask = np.ones(len(candidates_df), dtype=bool)
+    for column, values in filters.items():
+        if values:
+            mask &= candidates_df[column].isin(values).to_numpy()
+    if years:
+        applied_years = index.application_dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        mask &= np.isin(applied_years, [int(year) for year in years]) & ~np.isnat(index.application_dates)
+    return np.flatnonzero(mask)
+
+
+def drilldown_chunks(candidates_df, index, filters, years=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Filtered candidates with stage dates and days-from-application, in chunks."""
+    positions = drilldown_positions(candidates_df, index, filters, years)
+    stage_columns = [stage_label(stage) + " Date" for stage in STAGE_ORDER]
+    # Always at least one (possibly empty) chunk so the export has a header
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        chunk_positions = positions[start:start + chunk_rows]
+        chunk = candidates_df.iloc[chunk_positions].reset_index(drop=True)
+        dates = index.stage_dates(chunk_positions)
+        for i, column in enumerate(stage_columns):
+            chunk[column] = dates[:, i]
+        for i, stage in enumerate(STAGE_ORDER[1:], start=1):
+            chunk[f"Days to {stage_label(stage)}"] = (dates[:, i] - dates[:, 0]) / np.timedelta64(1, 'D')
+        yield chunk
+
+
+class _ChunkSink:
+    """Minimal binary file that hands back whatever was written since the last ``take``."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _stream_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+def _stream_parquet(chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            # Later chunks can infer narrower types (e.g. all-null columns)
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        data = sink.take()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+    yield sink.take()
+
+
+def _cell(value):
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _stream_xlsx(chunks, sheet_name):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet, rows, sheets = None, XLSX_MAX_ROWS, 0
+    for chunk in chunks:
+        header = [str(column) for column in chunk.columns]
+        for row in chunk.itertuples(index=False, name=None):
+            if rows >= XLSX_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(sheet_name if sheets == 1 else f"{sheet_name[:27]} {sheets}")
+                sheet.append(header)
+                rows = 1
+            sheet.append([_cell(value) for value in row])
+            rows += 1
+        if sheet is None:
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(header)
+            rows = 1
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            data = f.read(FILE_READ_BYTES)
+            if not data:
+                break
+            yield data
+
+
+def stream_export(chunks, fmt, sheet_name="Data"):
+    """Byte chunks of ``chunks`` (DataFrames with the same columns) written as ``fmt``."""
+    if fmt == "csv":
+        return _stream_csv(chunks)
+    if fmt == "parquet":
+        return _stream_parquet(chunks)
+    if fmt == "xlsx":
+        return _stream_xlsx(chunks, sheet_name[:31])
+    raise ValueError(f"Unknown export format: {fmt!r}")
+
+
+def export_file(chunks, fmt, sheet_name="Data"):
+    """The export written to an unbuffered temporary file, rewound, for ``st.download_button``.
+
+    Streamlit accepts raw file objects (not ``SpooledTemporaryFile`` or a
+    buffered ``TemporaryFile``) and reads the whole file into memory before
+    sending it; only ``/api/export`` streams to the client.
+    """
+    f = tempfile.TemporaryFile(buffering=0)
+    for data in stream_export(chunks, fmt, sheet_name):
+        # Raw writes may be partial
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+    f.seek(0)
+    return f
@@ -0,0 +1,117 @@
+"""Candidate lookup index over the candidate and activity tables.
+
+Built once per dataset version and pickled with the snapshot. Exact IDs
+resolve through a hash index (``pd.Index.get_loc``); ID prefixes resolve
+through the IDs as sorted strings with two ``np.searchsorted`` calls.
+Activity rows are sorted by (candidate, date, funnel order) once, so each
+candidate's rows are one contiguous slice given by start/stop offsets.
+A lookup never scans either table.
+"""
+import numpy as np
+import pandas as pd
+
+from recruitment_paths import STAGE_ORDER, candidate_sort_order, category_codes, stage_label
+
+
+class CandidateIndex:
+    def __init__(self, candidates_df, activity_df):
+        self.candidates_df = candidates_df
+        self.positions = pd.Index(candidates_df['Candidate ID Number'])
+
+        candidate_ids = candidates_df['Candidate ID Number'].to_numpy()
+        keys = candidate_ids.astype(str)
+        key_order = np.argsort(keys)
+        self.sorted_keys = keys[key_order]
+        self.sorted_ids = candidate_ids[key_order]
+
+        # Activity sorted by (candidate, date, funnel order) once, as plain arrays
+        extra_stages = sorted(set(activity_df['Stage Name'].dropna().unique()) - set(STAGE_ORDER))
+        self.stages = STAGE_ORDER + extra_stages
+        stage_codes = category_codes(activity_df['Stage Name'], self.stages)
+        ids = activity_df['Candidate ID Number'].to_numpy(dtype=np.int64)
+        dates = activity_df['Date When Reached the Stage'].to_numpy()
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        self.activity_order = candidate_sort_order(ids, days, stage_codes)
+        self.activity_stage_codes = stage_codes[self.activity_order]
+        self.activity_dates = dates[self.activity_order]
+        sorted_activity_ids = ids[self.activity_order]
+        self.activity_start = np.searchsorted(sorted_activity_ids, candidate_ids, side='left')
+        self.activity_stop = np.searchsorted(sorted_activity_ids, candidate_ids, side='right')
+        # Application date per candidate row, for year filters
+        self.application_dates = self.stage_dates(np.arange(len(candidate_ids)))[:, 0]
+
+    def search(self, prefix, limit=20):
+        """Candidate IDs whose decimal form starts with ``prefix``, in string order."""
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        lo = np.searchsorted(self.sorted_keys, prefix, side='left')
+        hi = np.searchsorted(self.sorted_keys, prefix + chr(0x10FFFF), side='left')
+        return self.sorted_ids[lo:min(hi, lo + limit)].tolist()
+
+    def count(self, prefix):
+        prefix = prefix.strip()
+        lo = np.searchsorted(self.sorted_keys, prefix, side='left')
+        return int(np.searchsorted(self.sorted_keys, prefix + chr(0x10FFFF), side='left') - lo)
+
+    def stage_dates(self, positions):
+        """Earliest date of each ``STAGE_ORDER`` stage for candidate rows ``positions``.
+
+        Returns a (len(positions), len(STAGE_ORDER)) datetime64 array, NaT where
+        the stage was never reached. Only the activity slices of those rows
+        are touched.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.activity_start[positions]
+        lengths = self.activity_stop[positions] - starts
+        # Flat activity offsets of every requested candidate, and which row each belongs to
+        owner = np.repeat(np.arange(len(positions)), lengths)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        flat = np.repeat(starts, lengths) + within
+
+        codes = self.activity_stage_codes[flat]
+        dates = self.activity_dates[flat].astype('datetime64[ns]').view(np.int64)
+        # NaT is the smallest int64, so it has to be kept out of the minimum
+        known = (codes >= 0) & (codes < len(STAGE_ORDER)) & (dates != np.iinfo(np.int64).min)
+        earliest = np.full((len(positions), len(STAGE_ORDER)), np.iinfo(np.int64).max)
+        np.minimum.at(earliest, (owner[known], codes[known]), dates[known])
+        result = earliest.view('datetime64[ns]')
+        result[earliest == np.iinfo(np.int64).max] = np.datetime64('NaT')
+        return result
+
+    def rows(self, candidate_id):
+        """(candidate row offset, activity row offsets), or None for an unknown ID."""
+        try:
+            position = self.positions.get_loc(candidate_id)
+        except KeyError:
+            return None
+        if not isinstance(position, (int, np.integer)):
+            # Duplicate IDs in the details table; use the first row
+            position = int(np.flatnonzero(self.positions == candidate_id)[0])
+        start, stop = self.activity_start[position], self.activity_stop[position]
+        return position, self.activity_order[start:stop]
+
+    def timeline(self, candidate_id):
+        """Details, per-stage timeline with durations, and outcome for one candidate."""
+        located = self.rows(candidate_id)
+        if located is None:
+            return None
+        position, _ = located
+        details = self.candidates_df.iloc[position]
+        start, stop = self.activity_start[position], self.activity_stop[position]
+        codes = self.activity_stage_codes[start:stop]
+        dates = pd.Series(self.activity_dates[start:stop])
+
+        applied = dates[codes == self.stages.index('New Application Date')].min()
+        labels = np.array([stage_label(stage) for stage in self.stages] + ['Unknown'], dtype=object)
+        timeline = pd.DataFrame({
+            'Stage': labels[codes],
+            'Date': dates,
+            'Days Since Previous': dates.diff().dt.days,
+            'Days Since Application': (dates - applied).dt.days,
+        })
+        return {
+            'details': details,
+            'timeline': timeline,
+            'outcome': details['Furthest Recruiting Stage Reached'],
+        }
@@ -0,0 +1,74 @@
+"""Resident-memory tracking and the per-process RSS ceiling.
+
+``RECRUITMENT_RSS_CEILING_MB`` caps how large one server process may grow
+before new reruns are turned away, so a known number of concurrent sessions
+fits on a box. Zero (the default) disables the ceiling. It is only enforced
+where the current RSS can be read (Linux procfs); elsewhere only the lifetime
+peak is known, which never goes back down, so the ceiling is not applied.
+"""
+import os
+import sys
+import threading
+
+RSS_CEILING_MB = float(os.environ.get("RECRUITMENT_RSS_CEILING_MB", "0"))
+
+
+def procfs_rss_bytes():
+    """Current RSS from procfs, or None where procfs is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def current_rss_bytes():
+    rss = procfs_rss_bytes()
+    if rss is not None:
+        return rss
+    # No procfs (macOS); fall back to the lifetime peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def over_ceiling(ceiling_mb=None):
+    ceiling_mb = RSS_CEILING_MB if ceiling_mb is None else ceiling_mb
+    # A lifetime peak cannot drop after gc, so without procfs every later rerun would be refused
+    rss = procfs_rss_bytes()
+    return bool(ceiling_mb) and rss is not None and rss > ceiling_mb * 1024 * 1024
+
+
+class PeakRssSampler:
+    """Samples process RSS on a background thread between start() and stop()."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.start_rss = current_rss_bytes()
+        self._sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak_rss
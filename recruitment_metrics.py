@@ -0,0 +1,614 @@
+"""Derived aggregates behind each section of the recruitment dashboard.
+
+Everything here is plain pandas with no Streamlit calls, so the same numbers
+can be rebuilt off the request path by the background refresher.
+
+Setting ``RECRUITMENT_LOW_MEMORY=1`` switches ``build_aggregates`` to a
+low-footprint path that joins candidates and activity through precomputed
+row-position arrays instead of materializing merged copies of either table.
+Both paths produce identical aggregates.
+
+``RECRUITMENT_DISTINCT_COUNTS=hll`` builds the funnel and year-wise table
+from HyperLogLog sketches (see ``recruitment_sketch``) instead of exact
+distinct counts, on either path.
+
+``RECRUITMENT_BACKEND=polars`` runs the whole build as multi-threaded Polars
+lazy queries instead (see ``recruitment_polars``), falling back to pandas
+when Polars isn't installed. Both backends produce identical aggregates.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+from recruitment_sketch import DISTINCT_COUNTS, FunnelSketches
+from recruitment_stats import rate_interval
+
+
+OFFER_STAGES = ['Offer Sent', 'Offer Accepted', 'Offer Declined']
+
+MONTH_ORDER = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+STAGE_TRANSITIONS = {
+    "App_to_Phone": "Application → Phone Screen",
+    "Phone_to_Interview": "Phone Screen → Interview",
+    "Interview_to_Offer": "Interview → Offer"
+}
+
+# Define role types
+TECH_ROLES = [
+    'Associate Software Developer', 'Sr. Software Engineer', 'IT Analyst',
+    'UX Designer', 'Associate Product Manager', 'Sr. Product Manager'
+]
+
+NON_TECH_ROLES = [
+    'Finance Manager', 'Financial Analyst', 'Operations Coordinator',
+    'Business Operations Manager', 'Sr. Customer Service Operations Associate',
+    'Operations Generalist', 'Associate Relationship Manager', 'Account Executive'
+]
+
+HYBRID_ROLES = ['Sr. Business Analyst']
+
+LOW_MEMORY = os.environ.get("RECRUITMENT_LOW_MEMORY") == "1"
+BACKEND = os.environ.get("RECRUITMENT_BACKEND", "pandas")
+
+# Candidate columns the low-memory path carries onto the stage pivot
+PIVOT_CANDIDATE_COLUMNS = ["Position Title", "Application Source", "Candidate Type", "Furthest Recruiting Stage Reached"]
+
+# Candidate columns the seasonality section reads
+SEASONALITY_COLUMNS = ["Candidate ID Number", "Application Source", "Candidate Type", "Furthest Recruiting Stage Reached"]
+
+
+# Define Tech vs Non-Tech based on Position Title
+def role_type(title):
+    if title in TECH_ROLES:
+        return "Tech-Roles"
+    elif title in NON_TECH_ROLES:
+        return "Non-Tech-Roles"
+    elif title in HYBRID_ROLES:
+        return "Hybrid-Roles"
+    else:
+        return "Other"
+
+
+def compute_key_metrics(candidates_df):
+    furthest_stage = candidates_df['Furthest Recruiting Stage Reached']
+    offer_sent_count = furthest_stage.isin(OFFER_STAGES).sum()
+    hired_count = (furthest_stage == 'Offer Accepted').sum()
+
+    # Calculate conversion rate from offer sent to offer accepted
+    conversion_rate = (hired_count / offer_sent_count) * 100 if offer_sent_count > 0 else None
+
+    return {
+        "total_candidates": candidates_df['Candidate ID Number'].nunique(),
+        "offer_sent_count": offer_sent_count,
+        "hired_count": hired_count,
+        "offer_declined": (furthest_stage == 'Offer Declined').sum(),
+        "no_response": (furthest_stage == 'Offer Sent').sum(),
+        "conversion_rate": conversion_rate,
+    }
+
+
+def compute_stage_counts(candidates_df, activity_df):
+    stage_counts = (
+        activity_df.groupby("Stage Name")["Candidate ID Number"]
+        .nunique()
+        .sort_values(ascending=False)
+    )
+
+    # Trim "Date" from stage names for better representation and understanding
+    stage_counts.index = stage_counts.index.str.replace(' Date', '', regex=False)
+
+    offer_accepted_count = (candidates_df["Furthest Recruiting Stage Reached"] == "Offer Accepted").sum()
+    stage_counts["Offer Accepted"] = offer_accepted_count
+    return stage_counts
+
+
+def compute_funnel(stage_counts):
+    funnel_df = stage_counts.reset_index()
+    funnel_df.columns = ["Stage", "Candidates"]
+    return funnel_df
+
+
+def compute_application_dates(activity_df):
+    application_dates = activity_df[activity_df['Stage Name'] == 'New Application Date'][['Candidate ID Number', 'Date When Reached the Stage']]
+    return application_dates.rename(columns={'Date When Reached the Stage': 'Application Date'})
+
+
+def compute_yearly_table(candidates_df, activity_df, stage_counts, application_dates):
+    # Merge application dates with activity data
+    activity_with_app_year = activity_df.merge(application_dates, on='Candidate ID Number', how='left')
+
+    # Extract year from application date (not stage date)
+    activity_with_app_year['Application_Year'] = activity_with_app_year['Application Date'].dt.year
+
+    # Get all unique application years and stages
+    all_years = sorted(activity_with_app_year['Application_Year'].dropna().unique())
+    all_stages = stage_counts.index.tolist()
+
+    # Create pivot table with application year as columns and stages as rows
+    yearly_data = []
+
+    for stage in all_stages:
+        if stage == "Offer Accepted":
+            # Handle offer accepted separately because offer_accepted data is not present in activity_df, so we get data from candidates_df
+            row_data = {"Stage": stage}
+            for year in all_years:
+                # Get candidates who applied in this year
+                yearly_candidates = activity_with_app_year[activity_with_app_year['Application_Year'] == year]['Candidate ID Number'].unique()
+                offer_count = candidates_df[
+                    (candidates_df['Candidate ID Number'].isin(yearly_candidates)) &
+                    (candidates_df['Furthest Recruiting Stage Reached'] == "Offer Accepted")
+                ].shape[0]
+                row_data[str(year)] = offer_count
+        else:
+            # Handle regular stages - filter by application year, not stage year
+            stage_with_year = activity_with_app_year[
+                (activity_with_app_year['Stage Name'].str.contains(stage, na=False)) &
+                (activity_with_app_year['Application_Year'].notna())
+            ]
+            stage_year_counts = stage_with_year.groupby('Application_Year')['Candidate ID Number'].nunique()
+            row_data = {"Stage": stage}
+            for year in all_years:
+                row_data[str(year)] = stage_year_counts.get(year, 0)
+
+        yearly_data.append(row_data)
+
+    # Create DataFrame and calculate totals
+    yearly_df = pd.DataFrame(yearly_data)
+    yearly_df = yearly_df.set_index('Stage')
+    return add_yearly_totals(yearly_df), all_years
+
+
+def add_yearly_totals(yearly_df):
+    # Add total column
+    yearly_df['Total'] = yearly_df.sum(axis=1)
+
+    # Add percentage column for the funnel conversion
+    if 'New Application' in yearly_df.index:
+        new_apps_total = yearly_df.loc['New Application', 'Total']
+        yearly_df['Conversion %'] = (yearly_df['Total'] / new_apps_total * 100).round(1)
+        yearly_df['Conversion %'] = yearly_df['Conversion %'].astype(str) + '%'
+    return yearly_df
+
+
+def compute_yearly_table_from_sketches(sketches, stage_counts):
+    # Same table as compute_yearly_table, with estimated instead of exact counts
+    yearly_df = sketches.year_counts().reindex(stage_counts.index, fill_value=0)
+    yearly_df.columns = [str(year) for year in yearly_df.columns]
+    yearly_df.index.name = 'Stage'
+    return add_yearly_totals(yearly_df), sorted(sketches.years)
+
+
+def compute_hire_conversion_by_source(candidates_df):
+    hire_conversion_rate = (
+        candidates_df.groupby("Application Source")["Furthest Recruiting Stage Reached"]
+        .apply(lambda x: (x == "Offer Accepted").mean())
+        .reset_index()
+    )
+    hire_conversion_rate.columns = ["Application Source", "Hired Percent"]
+    hire_conversion_rate['Hired Percent'] = round(hire_conversion_rate['Hired Percent'] * 100, 2)
+
+    # Counts behind the rate, for its confidence interval
+    is_hired = candidates_df["Furthest Recruiting Stage Reached"] == "Offer Accepted"
+    hire_counts = is_hired.groupby(candidates_df["Application Source"]).agg(Hired='sum', Candidates='size')
+    hire_conversion_rate = hire_conversion_rate.merge(hire_counts, on="Application Source")
+    return hire_conversion_rate.sort_values('Hired Percent', ascending=False)
+
+
+def compute_offers(candidates_df):
+    offer_extended_candidates = candidates_df[
+        candidates_df['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)
+    ]['Candidate ID Number'].unique()
+
+    return candidates_df[candidates_df['Candidate ID Number'].isin(offer_extended_candidates)].copy()
+
+
+def compute_offer_analysis_by_source(offers_df):
+    offer_analysis = (
+        offers_df.groupby('Application Source')['Furthest Recruiting Stage Reached']
+        .agg(
+            Offers_Extended='count',
+            Accepted=lambda x: (x == 'Offer Accepted').sum(),
+            Declined=lambda x: (x == 'Offer Declined').sum()
+        )
+        .reset_index()
+    )
+
+    offer_analysis['Acceptance Rate'] = round((offer_analysis['Accepted'] / offer_analysis['Offers_Extended']) * 100, 1)
+    offer_analysis['Declined Rate'] = round((offer_analysis['Declined'] / offer_analysis['Offers_Extended']) * 100, 1)
+    return offer_analysis.sort_values('Acceptance Rate', ascending=False)
+
+
+def compute_stage_pivot(activity_df):
+    pivot = activity_df.pivot(index="Candidate ID Number",
+                              columns="Stage Name",
+                              values="Date When Reached the Stage")
+
+    pivot["time_to_offer"] = (pivot["Offer Sent Date"] - pivot["New Application Date"]).dt.days
+    return pivot
+
+
+def compute_time_to_offer_by_source(candidates_df, stage_pivot):
+    pivot = stage_pivot.merge(candidates_df[["Candidate ID Number", "Application Source", "Furthest Recruiting Stage Reached"]],
+                              on="Candidate ID Number", how="left")
+    return time_to_offer_by_source_from(pivot)
+
+
+def time_to_offer_by_source_from(pivot):
+    pivot_offers = pivot[pivot['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)]
+    time_to_offer_by_source = pivot_offers.groupby("Application Source")["time_to_offer"].mean().reset_index()
+    time_to_offer_by_source['time_to_offer'] = time_to_offer_by_source['time_to_offer'].round(1)
+    return time_to_offer_by_source.sort_values('time_to_offer', ascending=True)
+
+
+def compute_position_pivot(candidates_df, stage_pivot):
+    pivot = stage_pivot.merge(candidates_df[["Candidate ID Number", "Position Title"]], on="Candidate ID Number", how="left")
+
+    # Calculate stage durations
+    pivot["App_to_Phone"] = (pivot["Phone Screen Date"] - pivot["New Application Date"]).dt.days
+    pivot["Phone_to_Interview"] = (pivot["In-House Interview Date"] - pivot["Phone Screen Date"]).dt.days
+    pivot["Interview_to_Offer"] = (pivot["Offer Sent Date"] - pivot["In-House Interview Date"]).dt.days
+    pivot["Role Type"] = pivot["Position Title"].apply(role_type)
+    return pivot
+
+
+def compute_position_analysis(offers_df, position_pivot):
+    # Calculate time to hire by position
+    time_to_hire = position_pivot.groupby("Position Title")["time_to_offer"].mean().reset_index()
+    time_to_hire['time_to_offer'] = time_to_hire['time_to_offer'].round(1)
+
+    # Calculate offer outcomes by position
+    offer_rates = (
+        offers_df.groupby("Position Title")["Furthest Recruiting Stage Reached"]
+        .agg(
+            Total_Offers='count',
+            Accepted=lambda x: (x == "Offer Accepted").sum(),
+            Declined=lambda x: (x == "Offer Declined").sum(),
+            No_Response=lambda x: (x == "Offer Sent").sum()
+        )
+        .reset_index()
+    )
+
+    offer_rates['Acceptance Rate'] = round((offer_rates['Accepted'] / offer_rates['Total_Offers']) * 100, 1)
+    offer_rates['Rejection Rate'] = round((offer_rates['Declined'] / offer_rates['Total_Offers']) * 100, 1)
+    offer_rates['No Response Rate'] = round((offer_rates['No_Response'] / offer_rates['Total_Offers']) * 100, 1)
+    offer_rates = offer_rates[['Position Title', 'Acceptance Rate', 'Rejection Rate', 'No Response Rate', 'Total_Offers',
+                               'Accepted', 'Declined', 'No_Response']]
+
+    # Merge data
+    position_analysis_df = time_to_hire.merge(offer_rates, on="Position Title")
+    return position_analysis_df.sort_values('Position Title')
+
+
+def compute_bottlenecks_by_position(position_pivot):
+    # Calculate average duration per stage transition
+    bottlenecks_by_position = position_pivot.groupby("Position Title")[list(STAGE_TRANSITIONS)].mean().reset_index()
+    bottlenecks_by_position = bottlenecks_by_position.melt(id_vars=["Position Title"],
+                                                          var_name="Stage Transition",
+                                                          value_name="Avg Days")
+
+    # Map stage transitions to readable names
+    bottlenecks_by_position["Stage Transition"] = bottlenecks_by_position["Stage Transition"].map(STAGE_TRANSITIONS)
+
+    # Define the correct order of stages
+    bottlenecks_by_position['Stage Transition'] = pd.Categorical(
+        bottlenecks_by_position['Stage Transition'],
+        categories=list(STAGE_TRANSITIONS.values()),
+        ordered=True
+    )
+
+    # Sort the dataframe by Position Title and Stage Transition
+    return bottlenecks_by_position.sort_values(['Position Title', 'Stage Transition'])
+
+
+def compute_candidate_type_responses(candidates_df, position_pivot):
+    # Create a pivot for candidate type analysis
+    pivot_ce = position_pivot.merge(candidates_df[["Candidate ID Number", "Candidate Type", "Furthest Recruiting Stage Reached"]],
+                                    on="Candidate ID Number", how="left")
+    return candidate_type_responses_from(pivot_ce)
+
+
+def candidate_type_responses_from(pivot_ce):
+    # Filter for candidates who received offers
+    pivot_ce_offers = pivot_ce[pivot_ce['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)]
+
+    # Calculate response counts
+    response_counts = pivot_ce_offers.groupby(["Candidate Type", "Furthest Recruiting Stage Reached"]).size().unstack(fill_value=0)
+
+    # Define the expected columns and handle missing ones
+    for col in OFFER_STAGES:
+        if col not in response_counts.columns:
+            response_counts[col] = 0
+
+    # Rename columns for clarity
+    response_counts = response_counts.rename(columns={
+        'Offer Accepted': 'Accepted',
+        'Offer Declined': 'Declined',
+        'Offer Sent': 'No Response'
+    })
+
+    # Calculate totals and percentages
+    response_counts['Total'] = response_counts[['Accepted', 'Declined', 'No Response']].sum(axis=1)
+    return response_counts.reset_index()
+
+
+def compute_role_type_durations(position_pivot):
+    # Average duration per stage by role type
+    stage_durations = position_pivot.groupby("Role Type")[list(STAGE_TRANSITIONS)].mean().reset_index()
+    return stage_durations.set_index("Role Type")
+
+
+def compute_candidates_with_dates(candidates_df, application_dates):
+    # Merge application dates with candidate data
+    candidates_with_dates = candidates_df.merge(application_dates, on='Candidate ID Number', how='left')
+
+    # Filter out candidates without application dates
+    candidates_with_dates = candidates_with_dates.dropna(subset=['Application Date'])
+
+    # Extract year and month from application date
+    candidates_with_dates['Application_Year'] = candidates_with_dates['Application Date'].dt.year
+    candidates_with_dates['Application_Month'] = candidates_with_dates['Application Date'].dt.month
+    candidates_with_dates['Application_Month_Name'] = candidates_with_dates['Application Date'].dt.strftime('%B')
+    return candidates_with_dates
+
+
+def compute_seasonality(candidates_with_dates, year):
+    year_df = candidates_with_dates[candidates_with_dates['Application_Year'] == year]
+    return seasonality_from(year_df)
+
+
+def seasonality_from(year_df):
+    if year_df.empty:
+        return None
+
+    monthly_volume = (
+        year_df.groupby(['Application_Month', 'Application_Month_Name'])
+        .size()
+        .reset_index(name='Application_Count')
+        .sort_values('Application_Month')
+    )
+
+    monthly_acceptance = (
+        year_df.groupby(['Application_Month', 'Application_Month_Name'])
+        ['Furthest Recruiting Stage Reached']
+        .apply(lambda x: (x == "Offer Accepted").mean() * 100)
+        .reset_index(name='Acceptance_Rate')
+        .sort_values('Application_Month')
+    )
+    is_accepted = year_df['Furthest Recruiting Stage Reached'] == "Offer Accepted"
+    acceptance_counts = (
+        is_accepted.groupby([year_df['Application_Month'], year_df['Application_Month_Name']])
+        .agg(Accepted='sum', Applications='size')
+        .reset_index()
+    )
+    monthly_acceptance = monthly_acceptance.merge(acceptance_counts, on=['Application_Month', 'Application_Month_Name'])
+
+    candidate_type_monthly = (
+        year_df.groupby(['Application_Month_Name', 'Candidate Type'])
+        .size()
+        .reset_index(name='Count')
+    )
+
+    top_sources_analysis = year_df.groupby('Application Source').agg({
+        'Candidate ID Number': 'count',
+        'Furthest Recruiting Stage Reached': [
+            lambda x: (x == "Offer Accepted").mean() * 100,  # Offer acceptance rate
+            lambda x: (x.isin(OFFER_STAGES).mean() * 100)      # Offer sent rate
+        ]
+    }).round(1)
+
+    # Flatten the multi-level column names
+    top_sources_analysis.columns = ['Application_Count', 'Offer_Acceptance_Rate', 'Offer_Sent_Rate']
+
+    # Get top 5 sources by application count
+    top_sources_analysis = top_sources_analysis.nlargest(5, 'Application_Count')
+
+    return {
+        "monthly_volume": monthly_volume,
+        "monthly_acceptance": monthly_acceptance,
+        "candidate_type_monthly": candidate_type_monthly,
+        "top_sources": top_sources_analysis,
+    }
+
+
+def add_confidence_intervals(aggregates):
+    """Add ``<rate> Low`` / ``<rate> High`` percent columns to every rate table."""
+    # (frame, rate name, successes column, totals column)
+    specs = [
+        (aggregates["hire_conversion_by_source"], "Hired Percent", "Hired", "Candidates"),
+        (aggregates["offer_analysis_by_source"], "Acceptance Rate", "Accepted", "Offers_Extended"),
+        (aggregates["offer_analysis_by_source"], "Declined Rate", "Declined", "Offers_Extended"),
+        (aggregates["position_analysis"], "Acceptance Rate", "Accepted", "Total_Offers"),
+        (aggregates["position_analysis"], "Rejection Rate", "Declined", "Total_Offers"),
+        (aggregates["position_analysis"], "No Response Rate", "No_Response", "Total_Offers"),
+        (aggregates["candidate_type_responses"], "Accepted", "Accepted", "Total"),
+        (aggregates["candidate_type_responses"], "Declined", "Declined", "Total"),
+        (aggregates["candidate_type_responses"], "No Response", "No Response", "Total"),
+    ]
+    for seasonality in aggregates["seasonality"].values():
+        if seasonality is not None:
+            specs.append((seasonality["monthly_acceptance"], "Acceptance_Rate", "Accepted", "Applications"))
+
+    # One batched call across every group of every table
+    successes = np.concatenate([frame[successes_col].to_numpy() for frame, _, successes_col, _ in specs])
+    totals = np.concatenate([frame[totals_col].to_numpy() for frame, _, _, totals_col in specs])
+    lower, upper = rate_interval(successes, totals)
+
+    offset = 0
+    for frame, name, _, _ in specs:
+        stop = offset + len(frame)
+        frame[f"{name} Low"] = np.round(lower[offset:stop] * 100, 1)
+        frame[f"{name} High"] = np.round(upper[offset:stop] * 100, 1)
+        offset = stop
+    return aggregates
+
+
+# ---- Low-memory path: position-based joins instead of merges ----
+
+def supports_position_joins(candidates_df, activity_df):
+    # Position lookups assume one candidate row and one application per ID,
+    # which is exactly when they agree with the merges they replace
+    application_ids = activity_df.loc[activity_df['Stage Name'] == 'New Application Date', 'Candidate ID Number']
+    return candidates_df['Candidate ID Number'].is_unique and application_ids.is_unique
+
+
+def compute_application_date_lookups(candidates_df, activity_df):
+    """Application date aligned to activity rows and to candidate rows."""
+    is_application = (activity_df['Stage Name'] == 'New Application Date').to_numpy()
+    application_index = pd.Index(activity_df['Candidate ID Number'].to_numpy()[is_application])
+    application_dates = activity_df['Date When Reached the Stage'].to_numpy()[is_application]
+
+    # Row offsets into application_dates; -1 (no application) becomes NaT
+    activity_positions = application_index.get_indexer(activity_df['Candidate ID Number'])
+    candidate_positions = application_index.get_indexer(candidates_df['Candidate ID Number'])
+    activity_app_dates = pd.DatetimeIndex(take(application_dates, activity_positions, allow_fill=True))
+    candidate_app_dates = pd.Series(take(application_dates, candidate_positions, allow_fill=True),
+                                    index=candidates_df.index)
+    return activity_app_dates, candidate_app_dates
+
+
+def compute_yearly_table_by_position(candidates_df, activity_df, stage_counts, activity_app_dates, candidate_app_dates):
+    activity_years = pd.Series(activity_app_dates.year, index=activity_df.index)
+    candidate_years = candidate_app_dates.dt.year
+    candidate_ids = activity_df['Candidate ID Number']
+
+    all_years = sorted(activity_years.dropna().unique())
+    accepted = candidates_df['Furthest Recruiting Stage Reached'] == "Offer Accepted"
+    accepted_by_year = candidate_years[accepted].value_counts()
+
+    yearly_data = []
+    for stage in stage_counts.index.tolist():
+        row_data = {"Stage": stage}
+        if stage == "Offer Accepted":
+            for year in all_years:
+                row_data[str(year)] = accepted_by_year.get(year, 0)
+        else:
+            in_stage = activity_df['Stage Name'].str.contains(stage, na=False) & activity_years.notna()
+            stage_year_counts = candidate_ids[in_stage].groupby(activity_years[in_stage]).nunique()
+            for year in all_years:
+                row_data[str(year)] = stage_year_counts.get(year, 0)
+        yearly_data.append(row_data)
+
+    yearly_df = pd.DataFrame(yearly_data).set_index('Stage')
+    return add_yearly_totals(yearly_df), all_years
+
+
+def compute_position_pivot_by_position(candidates_df, stage_pivot):
+    # Look candidate attributes up by row offset and add them to the pivot in place
+    positions = pd.Index(candidates_df['Candidate ID Number']).get_indexer(stage_pivot.index)
+    stage_pivot.columns.name = None
+    for column in PIVOT_CANDIDATE_COLUMNS:
+        stage_pivot[column] = take(candidates_df[column].to_numpy(), positions, allow_fill=True)
+
+    stage_pivot["App_to_Phone"] = (stage_pivot["Phone Screen Date"] - stage_pivot["New Application Date"]).dt.days
+    stage_pivot["Phone_to_Interview"] = (stage_pivot["In-House Interview Date"] - stage_pivot["Phone Screen Date"]).dt.days
+    stage_pivot["Interview_to_Offer"] = (stage_pivot["Offer Sent Date"] - stage_pivot["In-House Interview Date"]).dt.days
+    stage_pivot["Role Type"] = stage_pivot["Position Title"].apply(role_type)
+    return stage_pivot
+
+
+def compute_seasonality_by_position(candidates_df, candidate_app_dates):
+    has_date = candidate_app_dates.notna()
+    years = candidate_app_dates[has_date].dt.year
+    seasonality_years = sorted(years.unique())
+
+    seasonality = {}
+    for year in seasonality_years:
+        # Only this year's rows of the few columns the section reads
+        rows = years.index[years == year]
+        dates = candidate_app_dates[rows]
+        year_df = candidates_df.loc[rows, SEASONALITY_COLUMNS].assign(
+            Application_Month=dates.dt.month,
+            Application_Month_Name=dates.dt.strftime('%B'),
+        )
+        seasonality[year] = seasonality_from(year_df)
+    return seasonality_years, seasonality
+
+
+def build_aggregates(candidates_df, activity_df, low_memory=None, distinct_counts=None, backend=None):
+    """Compute every section's aggregates for one dataset version."""
+    if low_memory is None:
+        low_memory = LOW_MEMORY
+    if distinct_counts is None:
+        distinct_counts = DISTINCT_COUNTS
+    if backend is None:
+        backend = BACKEND
+    if backend == "polars":
+        import recruitment_polars
+        if recruitment_polars.available():
+            return recruitment_polars.build_aggregates_polars(candidates_df, activity_df, distinct_counts)
+    if low_memory and supports_position_joins(candidates_df, activity_df):
+        return build_aggregates_low_memory(candidates_df, activity_df, distinct_counts)
+
+    application_dates = compute_application_dates(activity_df)
+    if distinct_counts == "hll":
+        sketches = FunnelSketches(candidates_df, activity_df)
+        stage_counts = sketches.stage_counts()
+        yearly_df, all_years = compute_yearly_table_from_sketches(sketches, stage_counts)
+    else:
+        sketches = None
+        stage_counts = compute_stage_counts(candidates_df, activity_df)
+        yearly_df, all_years = compute_yearly_table(candidates_df, activity_df, stage_counts, application_dates)
+    offers_df = compute_offers(candidates_df)
+    stage_pivot = compute_stage_pivot(activity_df)
+    position_pivot = compute_position_pivot(candidates_df, stage_pivot)
+    candidates_with_dates = compute_candidates_with_dates(candidates_df, application_dates)
+    seasonality_years = sorted(candidates_with_dates['Application_Year'].dropna().unique())
+
+    return add_confidence_intervals({
+        "key_metrics": compute_key_metrics(candidates_df),
+        "funnel": compute_funnel(stage_counts),
+        "yearly_table": yearly_df,
+        "all_years": all_years,
+        "distinct_sketches": sketches,
+        "hire_conversion_by_source": compute_hire_conversion_by_source(candidates_df),
+        "offer_analysis_by_source": compute_offer_analysis_by_source(offers_df),
+        "time_to_offer_by_source": compute_time_to_offer_by_source(candidates_df, stage_pivot),
+        "position_analysis": compute_position_analysis(offers_df, position_pivot),
+        "bottlenecks_by_position": compute_bottlenecks_by_position(position_pivot),
+        "candidate_type_responses": compute_candidate_type_responses(candidates_df, position_pivot),
+        "role_type_durations": compute_role_type_durations(position_pivot),
+        "seasonality_years": seasonality_years,
+        "seasonality": {year: compute_seasonality(candidates_with_dates, year) for year in seasonality_years},
+    })
+
+
+def build_aggregates_low_memory(candidates_df, activity_df, distinct_counts=DISTINCT_COUNTS):
+    activity_app_dates, candidate_app_dates = compute_application_date_lookups(candidates_df, activity_df)
+    if distinct_counts == "hll":
+        sketches = FunnelSketches(candidates_df, activity_df)
+        stage_counts = sketches.stage_counts()
+        yearly_df, all_years = compute_yearly_table_from_sketches(sketches, stage_counts)
+    else:
+        sketches = None
+        stage_counts = compute_stage_counts(candidates_df, activity_df)
+        yearly_df, all_years = compute_yearly_table_by_position(
+            candidates_df, activity_df, stage_counts, activity_app_dates, candidate_app_dates
+        )
+    # Only the columns the offer sections group on, not a full copy of candidates_df
+    has_offer = candidates_df['Furthest Recruiting Stage Reached'].str.contains('Offer', na=False)
+    offers_df = candidates_df.loc[has_offer, ["Application Source", "Position Title", "Furthest Recruiting Stage Reached"]]
+    position_pivot = compute_position_pivot_by_position(candidates_df, compute_stage_pivot(activity_df))
+    seasonality_years, seasonality = compute_seasonality_by_position(candidates_df, candidate_app_dates)
+
+    return add_confidence_intervals({
+        "key_metrics": compute_key_metrics(candidates_df),
+        "funnel": compute_funnel(stage_counts),
+        "yearly_table": yearly_df,
+        "all_years": all_years,
+        "distinct_sketches": sketches,
+        "hire_conversion_by_source": compute_hire_conversion_by_source(candidates_df),
+        "offer_analysis_by_source": compute_offer_analysis_by_source(offers_df),
+        "time_to_offer_by_source": time_to_offer_by_source_from(position_pivot),
+        "position_analysis": compute_position_analysis(offers_df, position_pivot),
+        "bottlenecks_by_position": compute_bottlenecks_by_position(position_pivot),
+        "candidate_type_responses": candidate_type_responses_from(position_pivot),
+        "role_type_durations": compute_role_type_durations(position_pivot),
+        "seasonality_years": seasonality_years,
+        "seasonality": seasonality,
+    })
@@ -0,0 +1,308 @@
+"""Year-partitioned copy of the dataset with partition pruning.
+
+Next to the pickled snapshot, every build writes the candidate and activity
+rows partitioned by application year (the candidate's earliest application
+date), and by month within years that have more than
+``RECRUITMENT_PARTITION_MONTH_ROWS`` activity rows::
+
+    partitions/
+        manifest.json
+        year=2021/<content hash>/candidates.parquet, activity.parquet
+        year=2022/month=09/<content hash>/...
+        year=unknown/<content hash>/...      (no application date)
+        aggregates/<hash>.pkl                (aggregates of sealed years)
+
+The manifest lists each partition's row counts, application and activity
+date ranges and content hash. Year-scoped sections (the year comparison and
+seasonality) ask ``PartitionStore`` for one year and only that year's
+partition files are read.
+
+Partition directories are named by content hash, so an unchanged partition
+is never rewritten. Every year before the latest application year is
+sealed: its rows no longer change, so its aggregates are keyed by content
+hash and cached for the life of the process and on disk across restarts,
+whatever the dataset version.
+
+Partitions no manifest references any more are deleted only once they have
+been unreferenced for ``RECRUITMENT_PARTITION_GRACE_HOURS`` (default 24), so
+sessions and other processes still reading an older version keep their
+files. A partition that has gone anyway is read from the in-memory
+aggregates instead.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from recruitment_cache import SharedCache
+
+PARTITION_MONTH_ROWS = int(os.environ.get("RECRUITMENT_PARTITION_MONTH_ROWS", "500000"))
+PARTITIONS_DIR = "partitions"
+MANIFEST_FILE = "manifest.json"
+PARTITION_GRACE_HOURS = float(os.environ.get("RECRUITMENT_PARTITION_GRACE_HOURS", "24"))
+
+# Aggregates of sealed partitions, keyed by content hash; never evicted
+_sealed = SharedCache(max_entries=sys.maxsize)
+
+
+def _content_hash(*frames):
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _date(value):
+    return None if pd.isna(value) else pd.Timestamp(value).isoformat()
+
+
+def partition_keys(candidates_df, activity_df):
+    """(year, month) of every candidate row and activity row; year -1 without an application."""
+    is_application = activity_df['Stage Name'] == 'New Application Date'
+    applied = (activity_df.loc[is_application, 'Date When Reached the Stage']
+               .groupby(activity_df.loc[is_application, 'Candidate ID Number']).min())
+
+    def keys(ids):
+        dates = applied.reindex(ids).to_numpy()
+        known = ~np.isnat(dates)
+        years = np.where(known, dates.astype('datetime64[Y]').astype(np.int64) + 1970, -1)
+        months = np.where(known, dates.astype('datetime64[M]').astype(np.int64) % 12 + 1, 0)
+        return years, months
+
+    return keys(candidates_df['Candidate ID Number']), keys(activity_df['Candidate ID Number'])
+
+
+def write_errors():
+    """Errors that mean partitions can't be written here: read-only disk, missing or broken parquet engine."""
+    errors = (OSError, ImportError)
+    try:
+        import pyarrow
+    except ImportError:
+        return errors
+    return errors + (pyarrow.ArrowException,)
+
+
+def write_partitions(candidates_df, activity_df, version, directory):
+    """Write the partitioned layout and manifest under ``directory``; returns a ``PartitionStore``."""
+    from recruitment_data import _code_fingerprint
+
+    root = os.path.join(directory, PARTITIONS_DIR)
+    (candidate_years, candidate_months), (activity_years, activity_months) = partition_keys(candidates_df, activity_df)
+    latest_year = candidate_years.max(initial=-1)
+
+    partitions = []
+    for year in np.unique(candidate_years):
+        in_year = candidate_years == year
+        activity_in_year = activity_years == year
+        if year >= 0 and np.count_nonzero(activity_in_year) > PARTITION_MONTH_ROWS:
+            splits = [(int(month), in_year & (candidate_months == month), activity_in_year & (activity_months == month))
+                      for month in np.unique(candidate_months[in_year])]
+        else:
+            splits = [(None, in_year, activity_in_year)]
+
+        for month, candidate_rows, activity_rows in splits:
+            candidates = candidates_df[candidate_rows]
+            activity = activity_df[activity_rows]
+            content_hash = _content_hash(candidates, activity)
+            label = f"year={year}" if year >= 0 else "year=unknown"
+            if month is not None:
+                label = os.path.join(label, f"month={month:02d}")
+            path = os.path.join(label, content_hash)
+            target = os.path.join(root, path)
+            if not os.path.isdir(target):
+                # Written aside and renamed, so a partition directory is always complete
+                tmp = f"{target}.{os.getpid()}.tmp"
+                os.makedirs(tmp, exist_ok=True)
+                candidates.to_parquet(os.path.join(tmp, "candidates.parquet"), index=False)
+                activity.to_parquet(os.path.join(tmp, "activity.parquet"), index=False)
+                os.replace(tmp, target)
+
+            application_dates = activity.loc[activity['Stage Name'] == 'New Application Date',
+                                             'Date When Reached the Stage']
+            partitions.append({
+                "year": int(year) if year >= 0 else None,
+                "month": month,
+                "path": path,
+                "hash": content_hash,
+                "candidates": int(len(candidates)),
+                "activity_rows": int(len(activity)),
+                "first_application": _date(application_dates.min()),
+                "last_application": _date(application_dates.max()),
+                "first_activity": _date(activity['Date When Reached the Stage'].min()),
+                "last_activity": _date(activity['Date When Reached the Stage'].max()),
+                "sealed": bool(0 <= year < latest_year),
+            })
+
+    manifest = {"version": version, "code": _code_fingerprint(), "partitions": partitions}
+    manifest_path = os.path.join(root, MANIFEST_FILE)
+    previous = _read_manifest(manifest_path)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    # Sessions may still be reading the previous version, so only older partitions go
+    _remove_unreferenced(root, manifest, previous)
+    return PartitionStore(root, manifest)
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_unreferenced(root, manifest, previous, grace_hours=None):
+    grace_hours = PARTITION_GRACE_HOURS if grace_hours is None else grace_hours
+    keep = {entry["path"] for entry in manifest["partitions"]}
+    if previous is not None:
+        keep |= {entry["path"] for entry in previous["partitions"]}
+    # A referenced partition's mtime is when a manifest last listed it, so it ages only once unreferenced
+    for path in keep:
+        try:
+            os.utime(os.path.join(root, path))
+        except OSError:
+            pass
+    expired = time.time() - grace_hours * 3600
+    for year_dir in glob.glob(os.path.join(root, "year=*")):
+        for parent in [year_dir] + glob.glob(os.path.join(year_dir, "month=*")):
+            for name in os.listdir(parent):
+                path = os.path.join(parent, name)
+                if name.startswith("month=") or os.path.relpath(path, root) in keep:
+                    continue
+                try:
+                    if os.path.getmtime(path) < expired:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    pass
+
+
+class PartitionStore:
+    """Pruned reads and per-year aggregates over one version's partitions."""
+
+    def __init__(self, root, manifest):
+        self.root = root
+        self.manifest = manifest
+        self._open = SharedCache()
+
+    def __getstate__(self):
+        # Pickled with the snapshot; caches and locks are rebuilt on load
+        return {"root": self.root, "manifest": self.manifest}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"], state["manifest"])
+
+    @property
+    def years(self):
+        return sorted({entry["year"] for entry in self.manifest["partitions"] if entry["year"] is not None})
+
+    def partitions(self, years=None, start=None, end=None):
+        """Manifest entries for ``years`` whose application dates overlap [start, end]."""
+        selected = []
+        for entry in self.manifest["partitions"]:
+            if years is not None and entry["year"] not in years:
+                continue
+            if start is not None and (entry["last_application"] is None
+                                      or pd.Timestamp(entry["last_application"]) < pd.Timestamp(start)):
+                continue
+            if end is not None and (entry["first_application"] is None
+                                    or pd.Timestamp(entry["first_application"]) > pd.Timestamp(end)):
+                continue
+            selected.append(entry)
+        return selected
+
+    def read(self, years=None, start=None, end=None):
+        """(candidates_df, activity_df) of the pruned partitions only."""
+        entries = self.partitions(years, start, end)
+        if not entries:
+            raise KeyError(f"No partitions for years {years}")
+        candidates = [pd.read_parquet(os.path.join(self.root, entry["path"], "candidates.parquet")) for entry in entries]
+        activity = [pd.read_parquet(os.path.join(self.root, entry["path"], "activity.parquet")) for entry in entries]
+        return pd.concat(candidates, ignore_index=True), pd.concat(activity, ignore_index=True)
+
+    def year_aggregates(self, year):
+        """Stage counts and seasonality sections of one application year."""
+        entries = self.partitions([year])
+        if not entries:
+            return None
+        if all(entry["sealed"] for entry in entries):
+            key = hashlib.sha1("".join(entry["hash"] for entry in entries).encode()).hexdigest()[:16]
+            return _sealed.get(("year", key), lambda: self._load_or_build(year, key))
+        return self._open.get(("year", year), lambda: _build_year_aggregates(*self.read([year]), year))
+
+    def _load_or_build(self, year, key):
+        from recruitment_data import _code_fingerprint
+
+        path = os.path.join(self.root, "aggregates", f"{key}.pkl")
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.load(f)
+            if stored["code"] == _code_fingerprint():
+                return stored["aggregates"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, ImportError):
+            pass
+        aggregates = _build_year_aggregates(*self.read([year]), year)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"code": _code_fingerprint(), "aggregates": aggregates}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        return aggregates
+
+
+def _build_year_aggregates(candidates_df, activity_df, year):
+    from recruitment_metrics import (compute_application_dates, compute_candidates_with_dates, compute_seasonality,
+                                     compute_stage_counts)
+
+    candidates_with_dates = compute_candidates_with_dates(candidates_df, compute_application_dates(activity_df))
+    # Acceptance intervals are taken from the full build in year_seasonality, not drawn again here
+    return {
+        "stage_counts": compute_stage_counts(candidates_df, activity_df),
+        "seasonality": compute_seasonality(candidates_with_dates, year),
+    }
+
+
+def year_stage_counts(aggregates, year):
+    """Distinct candidates per stage for ``year``, from its partitions when they were written."""
+    store = aggregates.get("partitions")
+    if store is None:
+        return aggregates["yearly_table"][str(year)]
+    try:
+        sections = store.year_aggregates(int(year))
+    except OSError:
+        # Partition files removed under us; the full aggregates have the same counts
+        return aggregates["yearly_table"][str(year)]
+    return None if sections is None else sections["stage_counts"]
+
+
+def year_seasonality(aggregates, year):
+    """Seasonality sections for ``year``, from its partitions when they were written."""
+    store = aggregates.get("partitions")
+    if store is None:
+        return aggregates["seasonality"].get(year)
+    try:
+        sections = store.year_aggregates(int(year))
+    except OSError:
+        return aggregates["seasonality"].get(year)
+    full = aggregates["seasonality"].get(year)
+    if sections is None or sections["seasonality"] is None or full is None:
+        return None if sections is None else sections["seasonality"]
+    # The full build draws every group's interval in one batch; reuse its columns so both paths agree
+    seasonality = sections["seasonality"]
+    intervals = full["monthly_acceptance"][["Application_Month", "Acceptance_Rate Low", "Acceptance_Rate High"]]
+    monthly = seasonality["monthly_acceptance"].merge(intervals, on="Application_Month", how="left")
+    return {**seasonality, "monthly_acceptance": monthly}
@@ -0,0 +1,118 @@
+"""Stage-to-stage path analysis for the recruitment funnel.
+
+Activity is sorted once by (candidate, date, stage order); every adjacent
+pair of rows belonging to the same candidate is one hop, found with a
+shifted comparison over the whole array instead of a per-candidate loop.
+Each candidate's last stage also hops to an outcome taken from
+``Furthest Recruiting Stage Reached``. Hops are aggregated into transition
+count and mean-duration matrices with ``np.bincount``, which scales to tens
+of millions of activity rows.
+"""
+import numpy as np
+import pandas as pd
+
+STAGE_ORDER = ["New Application Date", "Phone Screen Date", "In-House Interview Date", "Offer Sent Date"]
+
+OUTCOMES = {
+    "Offer Accepted": "Hired",
+    "Offer Declined": "Declined",
+    "Offer Sent": "No Response",
+}
+NOT_PROGRESSED = "Not Progressed"
+
+
+def stage_label(stage_name):
+    return stage_name.replace(' Date', '')
+
+
+def category_codes(values, categories):
+    """Integer code of every value in ``categories`` (-1 when missing)."""
+    # Encode the distinct values once, then look codes up by level
+    inverse, levels = pd.factorize(values)
+    lookup = np.append(pd.Index(categories).get_indexer(levels), -1)
+    return lookup[inverse]
+
+
+def candidate_sort_order(ids, days, stage_codes):
+    # Pack (candidate, day, stage) into one int64 key when it fits; one argsort
+    # over that key is several times faster than a three-key lexsort
+    id_offset, day_offset = ids - ids.min(), days - days.min()
+    stage_span = int(stage_codes.max()) + 2
+    day_span = int(day_offset.max()) + 1
+    if (int(id_offset.max()) + 1) * day_span * stage_span < np.iinfo(np.int64).max:
+        return np.argsort((id_offset * day_span + day_offset) * stage_span + stage_codes + 1)
+    return np.lexsort((stage_codes, days, ids))
+
+
+def stage_hops(candidates_df, activity_df):
+    """Arrays of (from node, to node, days) for every hop, plus the node labels."""
+    # Known stages first in funnel order, anything unexpected after them
+    extra_stages = sorted(set(activity_df['Stage Name'].dropna().unique()) - set(STAGE_ORDER))
+    stages = STAGE_ORDER + extra_stages
+    outcomes = list(OUTCOMES.values()) + [NOT_PROGRESSED]
+    nodes = [stage_label(stage) for stage in stages] + outcomes
+
+    stage_codes = category_codes(activity_df['Stage Name'], stages)
+    ids = activity_df['Candidate ID Number'].to_numpy(dtype=np.int64)
+    days = activity_df['Date When Reached the Stage'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    # One sort for the whole table; stage order breaks same-day ties
+    order = candidate_sort_order(ids, days, stage_codes)
+    ids, stage_codes, days = ids[order], stage_codes[order], days[order]
+
+    same_candidate = ids[1:] == ids[:-1]
+    hop_from = stage_codes[:-1][same_candidate]
+    hop_to = stage_codes[1:][same_candidate]
+    hop_days = (days[1:] - days[:-1])[same_candidate].astype(float)
+
+    # Each candidate's last stage hops to their outcome; outcome codes are
+    # worked out per candidate row, then picked up by position
+    furthest = candidates_df['Furthest Recruiting Stage Reached']
+    outcome_codes = category_codes(furthest.map(OUTCOMES), outcomes)
+    outcome_codes = np.append(np.where(outcome_codes < 0, outcomes.index(NOT_PROGRESSED), outcome_codes),
+                              outcomes.index(NOT_PROGRESSED))
+    is_last = np.append(~same_candidate, True)
+    last_ids = ids[is_last]
+    # Candidates missing from the details table land on the trailing NOT_PROGRESSED slot
+    positions = pd.Index(candidates_df['Candidate ID Number']).get_indexer(last_ids)
+
+    return (
+        np.concatenate([hop_from, stage_codes[is_last]]),
+        np.concatenate([hop_to, len(stages) + outcome_codes[positions]]),
+        np.concatenate([hop_days, np.full(len(last_ids), np.nan)]),
+        nodes,
+    )
+
+
+def build_transitions(candidates_df, activity_df):
+    hop_from, hop_to, hop_days, nodes = stage_hops(candidates_df, activity_df)
+    size = len(nodes)
+    # Rows with a stage outside the known list get code -1; drop them
+    valid = (hop_from >= 0) & (hop_to >= 0)
+    flat = hop_from[valid] * size + hop_to[valid]
+    timed = valid & ~np.isnan(hop_days)
+
+    counts = np.bincount(flat, minlength=size * size).reshape(size, size)
+    timed_flat = hop_from[timed] * size + hop_to[timed]
+    timed_counts = np.bincount(timed_flat, minlength=size * size).reshape(size, size)
+    day_sums = np.bincount(timed_flat, weights=hop_days[timed], minlength=size * size).reshape(size, size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_days = np.where(timed_counts > 0, day_sums / timed_counts, np.nan)
+
+    counts_df = pd.DataFrame(counts, index=nodes, columns=nodes)
+    mean_days_df = pd.DataFrame(np.round(mean_days, 1), index=nodes, columns=nodes)
+    # Keep only nodes that take part in some hop
+    used = (counts.sum(axis=0) + counts.sum(axis=1)) > 0
+    counts_df = counts_df.loc[used, used]
+    mean_days_df = mean_days_df.loc[used, used]
+
+    links = counts_df.stack().rename("Candidates").reset_index()
+    links.columns = ["From", "To", "Candidates"]
+    links = links[links["Candidates"] > 0]
+    links["Avg Days"] = [mean_days_df.loc[row.From, row.To] for row in links.itertuples()]
+
+    return {
+        "counts": counts_df,
+        "mean_days": mean_days_df,
+        "links": links.reset_index(drop=True),
+    }
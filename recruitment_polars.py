@@ -0,0 +1,298 @@
+"""Polars backend for the aggregates (``RECRUITMENT_BACKEND=polars``).
+
+Every row-level step of ``build_aggregates`` (the stage pivot, the joins,
+the distinct counts, the per-group rates and means) is written as a Polars
+lazy query. All plans of a phase go to ``pl.collect_all`` together, which
+runs them on Polars' thread pool (``POLARS_MAX_THREADS``, all cores by
+default) and, with common-subplan elimination, computes what they share
+once: the application-date lookup feeds both the year-wise table and
+seasonality, and the stage pivot feeds the time-to-offer, position,
+bottleneck, candidate-type and role-type sections.
+
+The year-wise table needs the funnel's stage list first, so it runs as a
+second, smaller phase. What comes back is a few rows per group; it is
+finished (rates, rounding, sort order, column names) in pandas so both
+backends return identical aggregates.
+
+The Excel files are still read with pandas, since the rest of the dataset
+(candidate index, paths, survival) works on pandas frames. Without Polars
+installed, ``build_aggregates`` stays on the pandas path.
+"""
+import pandas as pd
+
+from recruitment_metrics import (HYBRID_ROLES, MONTH_ORDER, NON_TECH_ROLES, OFFER_STAGES, STAGE_TRANSITIONS,
+                                 TECH_ROLES, add_confidence_intervals, add_yearly_totals, compute_funnel,
+                                 compute_yearly_table_from_sketches)
+from recruitment_paths import STAGE_ORDER
+from recruitment_sketch import FunnelSketches
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+ID = 'Candidate ID Number'
+STAGE = 'Stage Name'
+DATE = 'Date When Reached the Stage'
+FURTHEST = 'Furthest Recruiting Stage Reached'
+SOURCE = 'Application Source'
+POSITION = 'Position Title'
+CANDIDATE_TYPE = 'Candidate Type'
+
+
+def available():
+    return pl is not None
+
+
+def _role_type(column):
+    return (pl.when(column.is_in(TECH_ROLES)).then(pl.lit("Tech-Roles"))
+            .when(column.is_in(NON_TECH_ROLES)).then(pl.lit("Non-Tech-Roles"))
+            .when(column.is_in(HYBRID_ROLES)).then(pl.lit("Hybrid-Roles"))
+            .otherwise(pl.lit("Other")))
+
+
+def _days(later, earlier):
+    return (pl.col(later) - pl.col(earlier)).dt.total_days()
+
+
+def _is(stage):
+    # Missing outcomes count as "not this outcome", as the pandas comparisons do
+    return (pl.col(FURTHEST) == stage).fill_null(False)
+
+
+def query_plans(candidates, activity):
+    """Lazy plans for every section but the year-wise table, plus the shared application-year join."""
+    is_offer = pl.col(FURTHEST).str.contains("Offer", literal=True).fill_null(False)
+    offer_sent = pl.col(FURTHEST).is_in(OFFER_STAGES).fill_null(False)
+
+    applications = (activity.filter(pl.col(STAGE) == "New Application Date")
+                    .select(ID, pl.col(DATE).alias("Application Date")))
+
+    # Pivots aren't lazy, so the stage pivot is a conditional first() per stage
+    stage_pivot = (
+        activity.group_by(ID)
+        .agg([pl.col(DATE).filter(pl.col(STAGE) == stage).first().alias(stage) for stage in STAGE_ORDER])
+        .with_columns(
+            time_to_offer=_days("Offer Sent Date", "New Application Date"),
+            App_to_Phone=_days("Phone Screen Date", "New Application Date"),
+            Phone_to_Interview=_days("In-House Interview Date", "Phone Screen Date"),
+            Interview_to_Offer=_days("Offer Sent Date", "In-House Interview Date"),
+        )
+    )
+    position_pivot = (stage_pivot.join(candidates.select(ID, POSITION), on=ID, how="left")
+                      .with_columns(_role_type(pl.col(POSITION)).alias("Role Type")))
+    offers = candidates.join(candidates.filter(is_offer).select(ID).unique(), on=ID, how="semi")
+    candidates_with_dates = (
+        candidates.join(applications, on=ID, how="left")
+        .filter(pl.col("Application Date").is_not_null())
+        .with_columns(Application_Year=pl.col("Application Date").dt.year(),
+                      Application_Month=pl.col("Application Date").dt.month().cast(pl.Int32))
+    )
+    activity_years = (activity.join(applications, on=ID, how="left")
+                      .with_columns(Application_Year=pl.col("Application Date").dt.year()))
+    durations = [pl.col(column).mean() for column in STAGE_TRANSITIONS]
+
+    plans = {
+        "key_metrics": candidates.select(
+            total_candidates=pl.col(ID).n_unique(),
+            offer_sent_count=offer_sent.sum(),
+            hired_count=_is("Offer Accepted").sum(),
+            offer_declined=_is("Offer Declined").sum(),
+            no_response=_is("Offer Sent").sum(),
+        ),
+        "stage_counts": (activity.filter(pl.col(STAGE).is_not_null())
+                         .group_by(STAGE).agg(pl.col(ID).drop_nulls().n_unique().alias("count"))),
+        "all_years": activity_years.select(pl.col("Application_Year").drop_nulls().unique().sort()),
+        "hire_by_source": (candidates.filter(pl.col(SOURCE).is_not_null()).group_by(SOURCE)
+                           .agg(Hired=_is("Offer Accepted").sum(), Candidates=pl.len())),
+        "offer_by_source": (offers.filter(pl.col(SOURCE).is_not_null()).group_by(SOURCE)
+                            .agg(Offers_Extended=pl.col(FURTHEST).count(),
+                                 Accepted=_is("Offer Accepted").sum(), Declined=_is("Offer Declined").sum())),
+        "time_to_offer_by_source": (
+            stage_pivot.join(candidates.select(ID, SOURCE, FURTHEST), on=ID, how="left")
+            .filter(is_offer & pl.col(SOURCE).is_not_null())
+            .group_by(SOURCE).agg(pl.col("time_to_offer").mean())
+        ),
+        "time_to_hire": (position_pivot.filter(pl.col(POSITION).is_not_null())
+                         .group_by(POSITION).agg(pl.col("time_to_offer").mean())),
+        "offer_by_position": (offers.filter(pl.col(POSITION).is_not_null()).group_by(POSITION)
+                              .agg(Total_Offers=pl.col(FURTHEST).count(), Accepted=_is("Offer Accepted").sum(),
+                                   Declined=_is("Offer Declined").sum(), No_Response=_is("Offer Sent").sum())),
+        "durations_by_position": (position_pivot.filter(pl.col(POSITION).is_not_null())
+                                  .group_by(POSITION).agg(durations)),
+        "durations_by_role_type": position_pivot.group_by("Role Type").agg(durations),
+        "candidate_type_responses": (
+            position_pivot.join(candidates.select(ID, CANDIDATE_TYPE, FURTHEST), on=ID, how="left")
+            .filter(is_offer & pl.col(CANDIDATE_TYPE).is_not_null())
+            .group_by(CANDIDATE_TYPE, FURTHEST).agg(pl.len().alias("count"))
+        ),
+        "seasonality_months": (candidates_with_dates.group_by("Application_Year", "Application_Month")
+                               .agg(Application_Count=pl.len(), Accepted=_is("Offer Accepted").sum())),
+        "seasonality_types": (candidates_with_dates.filter(pl.col(CANDIDATE_TYPE).is_not_null())
+                              .group_by("Application_Year", "Application_Month", CANDIDATE_TYPE)
+                              .agg(Count=pl.len())),
+        "seasonality_sources": (candidates_with_dates.filter(pl.col(SOURCE).is_not_null())
+                                .group_by("Application_Year", SOURCE)
+                                .agg(Application_Count=pl.col(ID).count(),
+                                     Offer_Acceptance_Rate=_is("Offer Accepted").mean() * 100,
+                                     Offer_Sent_Rate=offer_sent.mean() * 100)),
+    }
+    return plans, activity_years
+
+
+def yearly_plans(candidates, activity_years, stages):
+    """Distinct candidates per application year for each funnel stage."""
+    with_year = activity_years.filter(pl.col("Application_Year").is_not_null())
+    plans = {}
+    for stage in stages:
+        if stage == "Offer Accepted":
+            # Accepted candidate rows among each year's applicants, as compute_yearly_table counts them
+            plans[stage] = (with_year.select(ID, "Application_Year").unique()
+                            .join(candidates.filter(_is("Offer Accepted")).select(ID), on=ID, how="inner")
+                            .group_by("Application_Year").agg(pl.len().alias("count")))
+        else:
+            plans[stage] = (with_year.filter(pl.col(STAGE).str.contains(stage, literal=True))
+                            .group_by("Application_Year").agg(pl.col(ID).drop_nulls().n_unique().alias("count")))
+    return plans
+
+
+def _to_pandas(frame):
+    # Polars counts are unsigned and its strings come back as objects; match the pandas path's dtypes
+    df = frame.to_pandas()
+    for column in df.columns:
+        if df[column].dtype.kind == "u":
+            df[column] = df[column].astype("int64")
+        elif df[column].dtype == object:
+            df[column] = df[column].astype("str")
+    return df
+
+
+def _collect(plans):
+    frames = pl.collect_all(list(plans.values()))
+    return {name: _to_pandas(frame) for name, frame in zip(plans, frames)}
+
+
+def _month_names(months):
+    return months.map(lambda month: MONTH_ORDER[month - 1])
+
+
+def _seasonality(months, types, sources):
+    # One year's sections, shaped exactly like seasonality_from's
+    months = months.sort_values("Application_Month").reset_index(drop=True)
+    months["Application_Month_Name"] = _month_names(months["Application_Month"])
+    monthly_volume = months[["Application_Month", "Application_Month_Name", "Application_Count"]]
+    monthly_acceptance = months.assign(
+        Acceptance_Rate=months["Accepted"] / months["Application_Count"] * 100,
+        Applications=months["Application_Count"],
+    )[["Application_Month", "Application_Month_Name", "Acceptance_Rate", "Accepted", "Applications"]]
+
+    types = types.assign(Application_Month_Name=_month_names(types["Application_Month"]))
+    candidate_type_monthly = (types.groupby(["Application_Month_Name", CANDIDATE_TYPE])["Count"].sum()
+                              .reset_index())
+
+    top_sources = (sources.set_index(SOURCE).sort_index()
+                   [["Application_Count", "Offer_Acceptance_Rate", "Offer_Sent_Rate"]].round(1))
+    return {
+        "monthly_volume": monthly_volume,
+        "monthly_acceptance": monthly_acceptance,
+        "candidate_type_monthly": candidate_type_monthly,
+        "top_sources": top_sources.nlargest(5, 'Application_Count'),
+    }
+
+
+def _offer_rates(df, total, rates):
+    for name, column in rates.items():
+        df[name] = round(df[column] / df[total] * 100, 1)
+    return df
+
+
+def build_aggregates_polars(candidates_df, activity_df, distinct_counts):
+    candidates = pl.from_pandas(candidates_df).lazy()
+    activity = pl.from_pandas(activity_df).lazy()
+    plans, activity_years = query_plans(candidates, activity)
+    results = _collect(plans)
+
+    key_metrics = {name: int(value) for name, value in results["key_metrics"].iloc[0].items()}
+    key_metrics["conversion_rate"] = (key_metrics["hired_count"] / key_metrics["offer_sent_count"] * 100
+                                      if key_metrics["offer_sent_count"] > 0 else None)
+
+    if distinct_counts == "hll":
+        sketches = FunnelSketches(candidates_df, activity_df)
+        stage_counts = sketches.stage_counts()
+        yearly_df, all_years = compute_yearly_table_from_sketches(sketches, stage_counts)
+    else:
+        sketches = None
+        stage_counts = (results["stage_counts"].sort_values(STAGE).set_index(STAGE)["count"]
+                        .sort_values(ascending=False))
+        stage_counts.index = stage_counts.index.str.replace(' Date', '', regex=False)
+        stage_counts["Offer Accepted"] = key_metrics["hired_count"]
+        all_years = [int(year) for year in results["all_years"]["Application_Year"]]
+        by_stage = _collect(yearly_plans(candidates, activity_years, stage_counts.index.tolist()))
+        yearly_df = pd.DataFrame(
+            {stage: by_stage[stage].set_index("Application_Year")["count"].reindex(all_years, fill_value=0)
+             for stage in stage_counts.index}
+        ).T.astype("int64")
+        yearly_df.columns = [str(year) for year in all_years]
+        yearly_df.index.name = "Stage"
+        yearly_df = add_yearly_totals(yearly_df)
+
+    # Group-by output comes unordered; sorted by key it lines up with pandas' groupby
+    hire = results["hire_by_source"].sort_values(SOURCE, ignore_index=True)
+    hire.insert(1, "Hired Percent", round(hire["Hired"] / hire["Candidates"] * 100, 2))
+    hire = hire.sort_values("Hired Percent", ascending=False)
+
+    offer_by_source = _offer_rates(results["offer_by_source"].sort_values(SOURCE, ignore_index=True), "Offers_Extended",
+                                   {"Acceptance Rate": "Accepted", "Declined Rate": "Declined"})
+
+    time_to_offer = results["time_to_offer_by_source"].sort_values(SOURCE, ignore_index=True)
+    time_to_offer["time_to_offer"] = time_to_offer["time_to_offer"].round(1)
+
+    time_to_hire = results["time_to_hire"].sort_values(POSITION, ignore_index=True)
+    time_to_hire["time_to_offer"] = time_to_hire["time_to_offer"].round(1)
+    offer_rates = _offer_rates(results["offer_by_position"], "Total_Offers",
+                               {"Acceptance Rate": "Accepted", "Rejection Rate": "Declined",
+                                "No Response Rate": "No_Response"})
+    offer_rates = offer_rates[['Position Title', 'Acceptance Rate', 'Rejection Rate', 'No Response Rate',
+                               'Total_Offers', 'Accepted', 'Declined', 'No_Response']]
+    position_analysis = time_to_hire.merge(offer_rates, on=POSITION).sort_values(POSITION)
+
+    bottlenecks = (results["durations_by_position"].sort_values(POSITION, ignore_index=True)
+                   .melt(id_vars=[POSITION], var_name="Stage Transition", value_name="Avg Days"))
+    bottlenecks["Stage Transition"] = pd.Categorical(bottlenecks["Stage Transition"].map(STAGE_TRANSITIONS),
+                                                     categories=list(STAGE_TRANSITIONS.values()), ordered=True)
+    bottlenecks = bottlenecks.sort_values([POSITION, "Stage Transition"])
+
+    responses = (results["candidate_type_responses"]
+                 .pivot_table(index=CANDIDATE_TYPE, columns=FURTHEST, values="count", aggfunc="sum", fill_value=0))
+    for column in OFFER_STAGES:
+        if column not in responses.columns:
+            responses[column] = 0
+    responses = responses.rename(columns={'Offer Accepted': 'Accepted', 'Offer Declined': 'Declined',
+                                          'Offer Sent': 'No Response'})
+    responses['Total'] = responses[['Accepted', 'Declined', 'No Response']].sum(axis=1)
+
+    months, types, sources = (results["seasonality_months"], results["seasonality_types"],
+                              results["seasonality_sources"])
+    seasonality_years = sorted(int(year) for year in months["Application_Year"].unique())
+    seasonality = {
+        year: _seasonality(months[months["Application_Year"] == year], types[types["Application_Year"] == year],
+                           sources[sources["Application_Year"] == year])
+        for year in seasonality_years
+    }
+
+    return add_confidence_intervals({
+        "key_metrics": key_metrics,
+        "funnel": compute_funnel(stage_counts),
+        "yearly_table": yearly_df,
+        "all_years": all_years,
+        "distinct_sketches": sketches,
+        "hire_conversion_by_source": hire,
+        "offer_analysis_by_source": offer_by_source.sort_values('Acceptance Rate', ascending=False),
+        "time_to_offer_by_source": time_to_offer.sort_values('time_to_offer', ascending=True),
+        "position_analysis": position_analysis,
+        "bottlenecks_by_position": bottlenecks,
+        "candidate_type_responses": responses.reset_index(),
+        "role_type_durations": results["durations_by_role_type"].sort_values("Role Type").set_index("Role Type"),
+        "seasonality_years": seasonality_years,
+        "seasonality": seasonality,
+    })
@@ -0,0 +1,196 @@
+"""Offer-decline risk for the candidates still in the pipeline.
+
+``FeatureStore`` turns the candidate timeline into compact arrays, one row
+per candidate: the three stage gaps in days (float32), the source,
+position and candidate type as int16 codes, and the application month. It
+also keeps the last stage each candidate reached and its date, so the days
+spent waiting at that stage can be filled in at any cut-off.
+
+``OfferRiskModel`` fits a logistic regression (``fit_logistic``) of
+"declined" on every historical offer with a known outcome. Categories are
+one-hot columns and the month is encoded as a point on a circle. Pending
+offers and candidates whose last activity is within ``OPEN_WINDOW_DAYS`` of
+the data cut-off are open. Open candidates who have reached the in-house
+interview through every stage are scored, as if the offer went out at the
+cut-off, so the gap they are waiting in counts up to that day. Earlier
+candidates, and ones that skipped a stage, would have gaps missing that
+every training offer has observed, so they are listed unscored.
+
+A candidate's score splits into a static part, fixed by its own completed
+stages and attributes, and the waiting gap times one coefficient. Static
+parts are cached with the model. ``update`` reuses the previous version's
+model and static parts when the training offers are unchanged, and only
+recomputes rows whose features changed. Only the waiting term, one
+vectorized multiply, is redone for everyone.
+"""
+import numpy as np
+import pandas as pd
+
+from recruitment_paths import STAGE_ORDER, stage_label
+from recruitment_stats import fit_logistic, logistic
+
+# Candidates with activity this recently (or a pending offer) are treated as open
+OPEN_WINDOW_DAYS = 60
+# Scored from the interview on, once every gap but the one being waited in has been observed
+SCORED_FROM_STAGE = STAGE_ORDER.index("In-House Interview Date")
+
+GAPS = [f"{stage_label(earlier)} → {stage_label(later)}" for earlier, later in zip(STAGE_ORDER, STAGE_ORDER[1:])]
+CATEGORIES = ["Application Source", "Position Title", "Candidate Type"]
+OUTCOMES = {"Offer Accepted": 0, "Offer Declined": 1}
+
+
+class FeatureStore:
+    def __init__(self, candidates_df, activity_df):
+        dates = activity_df.pivot_table(index="Candidate ID Number", columns="Stage Name",
+                                        values="Date When Reached the Stage", aggfunc="min")
+        dates = dates.reindex(columns=STAGE_ORDER)
+        dates = dates[dates[STAGE_ORDER[0]].notna()]
+        candidates = candidates_df.drop_duplicates("Candidate ID Number").set_index("Candidate ID Number")
+        candidates = candidates.reindex(dates.index)
+
+        self.ids = dates.index.to_numpy(dtype=np.int64)
+        self.cutoff = activity_df["Date When Reached the Stage"].max().normalize()
+        stage_days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64).astype(float)
+        stage_days[dates.isna().to_numpy()] = np.nan
+
+        # Gaps between reached stages; skipped or unreached stages count as 0 days, backwards gaps as same-day
+        gaps = np.diff(stage_days, axis=1)
+        self.gaps = np.nan_to_num(np.clip(gaps, 0, None)).astype(np.float32)
+        self.reached = dates.notna().to_numpy()
+        self.last_stage = (len(STAGE_ORDER) - 1 - np.argmax(self.reached[:, ::-1], axis=1)).astype(np.int8)
+        self.last_date = np.nanmax(stage_days, axis=1).astype(np.int64).astype("datetime64[D]")
+
+        self.levels = {}
+        self.codes = np.empty((len(self.ids), len(CATEGORIES)), dtype=np.int16)
+        for i, name in enumerate(CATEGORIES):
+            codes, self.levels[name] = pd.factorize(candidates[name], sort=True)
+            self.codes[:, i] = codes
+        self.month = dates[STAGE_ORDER[0]].dt.month.to_numpy(dtype=np.int8)
+
+        furthest = candidates["Furthest Recruiting Stage Reached"]
+        self.outcome = furthest.map(OUTCOMES).fillna(-1).to_numpy(dtype=np.int8)
+        recent = self.last_date >= np.datetime64(self.cutoff, "D") - np.timedelta64(OPEN_WINDOW_DAYS, "D")
+        self.open = (self.outcome < 0) & (recent | (furthest == "Offer Sent").to_numpy())
+        # Every stage up to the last one reached, so all gaps before the waiting one are observed
+        unbroken = np.cumprod(self.reached, axis=1).sum(axis=1) - 1 == self.last_stage
+        self.scored = self.open & unbroken & (self.last_stage >= SCORED_FROM_STAGE)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def waiting_days(self):
+        """Days each candidate has waited at its last stage as of the cut-off."""
+        return (np.datetime64(self.cutoff, "D") - self.last_date).astype(np.float32)
+
+    def design(self, rows=None):
+        """Model columns for ``rows``: stage gaps, one-hot categories, month on a circle."""
+        rows = np.arange(len(self)) if rows is None else rows
+        columns = [self.gaps[rows]]
+        for i, name in enumerate(CATEGORIES):
+            columns.append(self.codes[rows, i][:, None] == np.arange(len(self.levels[name]))[None, :])
+        angle = 2 * np.pi * (self.month[rows] - 1) / 12
+        columns.append(np.column_stack([np.sin(angle), np.cos(angle)]))
+        return np.hstack(columns).astype(float)
+
+    def training_rows(self):
+        return np.flatnonzero(self.outcome >= 0)
+
+    def same_rows(self, other):
+        """For every row, the matching row of ``other`` when the candidate's features are unchanged, else -1."""
+        matches = pd.Index(other.ids).get_indexer(self.ids)
+        found = matches >= 0
+        same = np.zeros(len(self), dtype=bool)
+        if self.levels_match(other):
+            previous = matches[found]
+            same[found] = ((self.gaps[found] == other.gaps[previous]).all(axis=1)
+                           & (self.codes[found] == other.codes[previous]).all(axis=1)
+                           & (self.month[found] == other.month[previous])
+                           & (self.last_stage[found] == other.last_stage[previous])
+                           & (self.last_date[found] == other.last_date[previous])
+                           & (self.outcome[found] == other.outcome[previous]))
+        return np.where(same, matches, -1)
+
+    def levels_match(self, other):
+        return all(self.levels[name].equals(other.levels[name]) for name in CATEGORIES)
+
+
+class OfferRiskModel:
+    def __init__(self, store, weights=None, static=None, stale=None):
+        self.store = store
+        training = store.training_rows()
+        self.trained_on = len(training)
+        self.declines = int(store.outcome[training].sum())
+        if weights is None:
+            weights = fit_logistic(store.design(training), store.outcome[training])
+        self.weights = weights
+
+        stale = np.ones(len(store), dtype=bool) if stale is None else stale
+        if static is None:
+            static = np.empty(len(store))
+        # Static logit: the gap a candidate is still waiting in is stored as 0, so it adds nothing here
+        rows = np.flatnonzero(stale)
+        if len(rows):
+            static[rows] = weights[0] + store.design(rows) @ weights[1:]
+        self.static = static
+        self.rescored = len(rows)
+        self.scores = self._score()
+
+    def _score(self):
+        # Each scored candidate's waiting gap counts up to the cut-off; pending offers have nothing left to wait on
+        rows = np.flatnonzero(self.store.scored)
+        stage = self.store.last_stage[rows].astype(np.int64)
+        waiting = stage < len(GAPS)
+        terms = np.zeros(len(rows))
+        terms[waiting] = self.weights[1 + stage[waiting]] * self.store.waiting_days()[rows[waiting]]
+        scores = np.full(len(self.store), np.nan, dtype=np.float32)
+        scores[rows] = logistic(self.static[rows] + terms)
+        return scores
+
+    def update(self, store):
+        """Model and scores for a new ``FeatureStore``, reusing this version's work where the inputs match."""
+        matches = store.same_rows(self.store)
+        training = store.training_rows()
+        unchanged_training = (len(training) == self.trained_on and (matches[training] >= 0).all()
+                              and store.levels_match(self.store))
+        if not unchanged_training:
+            return OfferRiskModel(store)
+        static = np.empty(len(store))
+        kept = matches >= 0
+        static[kept] = self.static[matches[kept]]
+        return OfferRiskModel(store, weights=self.weights, static=static, stale=~kept)
+
+    def open_candidates(self, candidates_df):
+        """Open candidates by decline risk, highest first; those before the interview have no score."""
+        rows = np.flatnonzero(self.store.open)
+        stage = self.store.last_stage[rows]
+        frame = pd.DataFrame({
+            "Candidate ID Number": self.store.ids[rows],
+            "Current Stage": np.array([stage_label(name) for name in STAGE_ORDER])[stage],
+            "Days at Stage": self.store.waiting_days()[rows].astype(np.int64),
+            "Decline Risk %": (self.scores[rows].astype(float) * 100).round(1),
+        })
+        details = candidates_df.drop_duplicates("Candidate ID Number")[["Candidate ID Number"] + CATEGORIES]
+        frame = frame.merge(details, on="Candidate ID Number", how="left")
+        columns = ["Candidate ID Number"] + CATEGORIES + ["Current Stage", "Days at Stage", "Decline Risk %"]
+        return frame[columns].sort_values("Decline Risk %", ascending=False, na_position="last", ignore_index=True)
+
+    def drivers(self, top=8):
+        """Coefficients with the largest effect on decline odds, as odds ratios."""
+        names = list(GAPS)
+        for name in CATEGORIES:
+            names += [f"{name}: {level}" for level in self.store.levels[name]]
+        names += ["Month (sine)", "Month (cosine)"]
+        design = self.store.design(self.store.training_rows())
+        # Per standard deviation of the feature, so days and one-hot columns are comparable
+        effect = self.weights[1:] * design.std(axis=0)
+        frame = pd.DataFrame({"Feature": names, "Odds Ratio per SD": np.exp(effect)})
+        order = np.argsort(-np.abs(effect))[:top]
+        return frame.iloc[order].round(2).reset_index(drop=True)
+
+
+def build_offer_risk(candidates_df, activity_df, previous=None):
+    """Offer-decline model and open-candidate scores; ``previous`` is updated incrementally."""
+    store = FeatureStore(candidates_df, activity_df)
+    if previous is not None:
+        return previous.update(store)
+    return OfferRiskModel(store)
@@ -0,0 +1,268 @@
+"""Monte Carlo simulation of hiring-pipeline capacity.
+
+``PipelineModel`` is fitted once per dataset version from the candidate
+timelines, per segment (every role type and every position title):
+
+* Pass-through: the share of candidates reaching each stage who reached the
+  next one. Small segments are shrunk toward the pooled rate with
+  ``PRIOR_CANDIDATES`` pseudo-candidates.
+* Durations: the observed gaps (in days) between consecutive stages, kept
+  as one sorted array per segment and transition and sampled directly, so
+  skew and long tails carry over. Segments with fewer than
+  ``MIN_DURATIONS`` observed gaps use the pooled gaps.
+* Offer outcome: a logistic regression of acceptance on time-to-offer and
+  candidate type, fitted on every historical offer.
+
+A simulated cohort is ``cohort_size`` applicants drawn from the historical
+applicants of the selected segment. Each applicant moves through the stages
+with the segment's probabilities and sampled gaps. Every cohort of a chunk
+is one set of flat NumPy arrays, so tens of thousands of cohorts take
+seconds. Scenarios change the gaps:
+
+* ``interview_capacity`` multiplies the interview slots. The part of the
+  Phone Screen -> Interview gap beyond the segment's 5th-percentile gap is
+  treated as waiting for a slot, so doubling capacity halves it.
+* ``interview_to_offer_cut`` takes days off every Interview -> Offer gap,
+  never below zero.
+
+Cohorts run in chunks of ``SIMULATION_CHUNK_COHORTS``, each with its own
+random stream spawned from one seed. Results therefore don't depend on
+``RECRUITMENT_SIMULATION_WORKERS``, which spreads the chunks over a process
+pool (0, the default, runs in-process). A baseline and a scenario with the
+same seed make the same draws, so their difference is the scenario's
+effect, not noise.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from recruitment_metrics import role_type
+from recruitment_paths import STAGE_ORDER, stage_label
+from recruitment_stats import fit_logistic, logistic
+
+SIMULATION_WORKERS = int(os.environ.get("RECRUITMENT_SIMULATION_WORKERS", "0"))
+SIMULATION_CHUNK_COHORTS = 2000
+PRIOR_CANDIDATES = 20
+MIN_DURATIONS = 5
+# Days kept in the time-to-offer histogram; longer offers land in the last bin
+MAX_DAYS = 365
+
+DIMENSIONS = ["Role Type", "Position Title"]
+ALL_CANDIDATES = "All candidates"
+FUNNEL_STAGES = ["Applications"] + [stage_label(stage) for stage in STAGE_ORDER[1:]] + ["Offer Accepted"]
+
+
+class PipelineModel:
+    def __init__(self, candidates_df, activity_df):
+        dates = activity_df.pivot_table(index="Candidate ID Number", columns="Stage Name",
+                                        values="Date When Reached the Stage", aggfunc="min")
+        candidates = candidates_df.drop_duplicates("Candidate ID Number").set_index("Candidate ID Number")
+        dates = dates.reindex(columns=STAGE_ORDER)
+        dates = dates[dates[STAGE_ORDER[0]].notna()]
+        candidates = candidates.reindex(dates.index)
+
+        # Stage gaps in days (NaN where either date is missing); a few run backwards, counted as same-day
+        gaps = np.column_stack([
+            (dates[later] - dates[earlier]).dt.days.to_numpy(dtype=float, na_value=np.nan)
+            for earlier, later in zip(STAGE_ORDER, STAGE_ORDER[1:])
+        ])
+        gaps = np.clip(gaps, 0, None)
+        reached = dates.notna().to_numpy()
+        furthest = candidates["Furthest Recruiting Stage Reached"]
+        accepted = (furthest == "Offer Accepted").to_numpy()
+        experienced = (candidates["Candidate Type"] == "Experienced").to_numpy()
+
+        # Offer outcome model on every historical offer; no response counts as not accepted
+        offered = reached[:, -1]
+        time_to_offer = (dates[STAGE_ORDER[-1]] - dates[STAGE_ORDER[0]]).dt.days.to_numpy(dtype=float, na_value=0)
+        self.acceptance = fit_logistic(np.column_stack([time_to_offer[offered], experienced[offered]]),
+                                       accepted[offered])
+
+        self.applied = dates[STAGE_ORDER[0]].to_numpy()
+        self.experienced = experienced
+        self.groups = {None: [ALL_CANDIDATES]}
+        self.codes = {None: np.zeros(len(dates), dtype=np.int64)}
+        labels = {"Role Type": candidates["Position Title"].map(role_type),
+                  "Position Title": candidates["Position Title"]}
+        for dimension, values in labels.items():
+            self.groups[dimension] = sorted(values.dropna().unique())
+            self.codes[dimension] = pd.Index(self.groups[dimension]).get_indexer(values)
+
+        self.fits = {dimension: self._fit(codes, len(self.groups[dimension]), reached, gaps)
+                     for dimension, codes in self.codes.items()}
+
+    @staticmethod
+    def _fit(codes, segments, reached, gaps):
+        transitions = reached.shape[1] - 1
+        pass_rates = np.empty((segments, transitions))
+        values, offsets, counts = [], np.empty((transitions, segments), dtype=np.int64), np.empty((transitions, segments), dtype=np.int64)
+        floors = np.empty(segments)
+        start = 0
+        for k in range(transitions):
+            at_stage = reached[:, k]
+            moved_on = at_stage & reached[:, k + 1]
+            pooled_rate = moved_on.sum() / max(at_stage.sum(), 1)
+            stage_totals = np.bincount(codes[at_stage & (codes >= 0)], minlength=segments)
+            stage_passed = np.bincount(codes[moved_on & (codes >= 0)], minlength=segments)
+            pass_rates[:, k] = (stage_passed + PRIOR_CANDIDATES * pooled_rate) / (stage_totals + PRIOR_CANDIDATES)
+
+            observed = moved_on & ~np.isnan(gaps[:, k])
+            pooled_gaps = np.sort(gaps[observed, k])
+            for segment in range(segments):
+                segment_gaps = np.sort(gaps[observed & (codes == segment), k])
+                if len(segment_gaps) < MIN_DURATIONS:
+                    segment_gaps = pooled_gaps
+                if len(segment_gaps) == 0:
+                    segment_gaps = np.zeros(1)
+                values.append(segment_gaps)
+                offsets[k, segment] = start
+                counts[k, segment] = len(segment_gaps)
+                start += len(segment_gaps)
+                if k == 1:
+                    floors[segment] = np.percentile(segment_gaps, 5)
+        return {"pass_rates": pass_rates, "gaps": np.concatenate(values), "offsets": offsets, "counts": counts,
+                "interview_floor": floors}
+
+    def applicants(self, dimension=None, segment=None):
+        """Row offsets of the historical applicants a cohort is drawn from."""
+        codes = self.codes[dimension]
+        if segment is None or dimension is None:
+            return np.flatnonzero(codes >= 0)
+        return np.flatnonzero(codes == self.groups[dimension].index(segment))
+
+    def monthly_applications(self, dimension=None, segment=None):
+        """Average applications per month of history for the selection."""
+        rows = self.applicants(dimension, segment)
+        months = self.applied[rows].astype("datetime64[M]")
+        span = (months.max() - months.min()).astype(int) + 1 if len(rows) else 1
+        return len(rows) / span
+
+    def simulate(self, dimension=None, segment=None, cohorts=20000, cohort_size=None, interview_capacity=1.0,
+                 interview_to_offer_cut=0, seed=0, workers=SIMULATION_WORKERS):
+        """Projected per-cohort funnel counts, acceptance and time-to-offer distribution."""
+        started = time.perf_counter()
+        rows = self.applicants(dimension, segment)
+        if cohort_size is None:
+            cohort_size = max(int(round(self.monthly_applications(dimension, segment))), 1)
+        fit = self.fits[dimension]
+        shared = {
+            "segments": self.codes[dimension][rows],
+            "experienced": self.experienced[rows],
+            "cohort_size": cohort_size,
+            "interview_capacity": interview_capacity,
+            "interview_to_offer_cut": interview_to_offer_cut,
+            "acceptance": self.acceptance,
+            **fit,
+        }
+
+        # Fixed chunking and one stream per chunk keep results independent of the worker count
+        chunk_sizes = [min(SIMULATION_CHUNK_COHORTS, cohorts - start)
+                       for start in range(0, cohorts, SIMULATION_CHUNK_COHORTS)]
+        streams = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+        tasks = [(shared, size, stream) for size, stream in zip(chunk_sizes, streams)]
+        if workers and workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = list(pool.map(_simulate_worker, tasks))
+        else:
+            chunks = [_simulate_chunk(*task) for task in tasks]
+
+        counts = np.vstack([chunk[0] for chunk in chunks])
+        histogram = np.sum([chunk[1] for chunk in chunks], axis=0)
+        return summarize(counts, histogram, cohort_size, time.perf_counter() - started)
+
+
+def _simulate_worker(task):
+    return _simulate_chunk(*task)
+
+
+def _sample_gaps(fit, k, segments, rng):
+    offsets = fit["offsets"][k][segments]
+    picks = (rng.random(len(segments)) * fit["counts"][k][segments]).astype(np.int64)
+    return fit["gaps"][offsets + picks]
+
+
+def _simulate_chunk(fit, cohorts, seed):
+    """Funnel counts per cohort (cohorts x stages) and the time-to-offer histogram of one chunk."""
+    rng = np.random.default_rng(seed)
+    size = cohorts * fit["cohort_size"]
+    drawn = rng.integers(0, len(fit["segments"]), size=size)
+    segments = fit["segments"][drawn]
+
+    alive = np.ones(size, dtype=bool)
+    reached = [alive]
+    days = np.zeros(size)
+    for k in range(fit["pass_rates"].shape[1]):
+        alive = alive & (rng.random(size) < fit["pass_rates"][segments, k])
+        gaps = _sample_gaps(fit, k, segments, rng)
+        if k == 1:
+            # Waiting beyond the shortest gaps scales with interview slots
+            floor = fit["interview_floor"][segments]
+            gaps = floor + np.maximum(gaps - floor, 0) / fit["interview_capacity"]
+        elif k == 2:
+            gaps = np.maximum(gaps - fit["interview_to_offer_cut"], 0)
+        days += gaps
+        reached.append(alive)
+
+    offered = alive
+    intercept, slope_days, slope_experienced = fit["acceptance"]
+    accept_probability = logistic(intercept + slope_days * days + slope_experienced * fit["experienced"][drawn])
+    accepted = offered & (rng.random(size) < accept_probability)
+    reached.append(accepted)
+
+    counts = np.column_stack([stage.reshape(cohorts, -1).sum(axis=1) for stage in reached])
+    histogram = np.bincount(np.minimum(days[offered], MAX_DAYS).astype(np.int64), minlength=MAX_DAYS + 1)
+    return counts, histogram
+
+
+def _percentile_days(histogram, q):
+    cumulative = np.cumsum(histogram)
+    if cumulative[-1] == 0:
+        return np.nan
+    return float(np.searchsorted(cumulative, q / 100 * cumulative[-1]))
+
+
+def summarize(counts, histogram, cohort_size, seconds):
+    funnel = pd.DataFrame({
+        "Stage": FUNNEL_STAGES,
+        "Mean per Cohort": counts.mean(axis=0).round(2),
+        "Low": np.percentile(counts, 5, axis=0),
+        "High": np.percentile(counts, 95, axis=0),
+    })
+    offers, accepted = counts[:, -2], counts[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cohort_acceptance = accepted[offers > 0] / offers[offers > 0] * 100
+    total_offers = histogram.sum()
+    return {
+        "funnel": funnel,
+        "acceptance_rate": accepted.sum() / offers.sum() * 100 if offers.sum() else np.nan,
+        "acceptance_low": np.percentile(cohort_acceptance, 5) if len(cohort_acceptance) else np.nan,
+        "acceptance_high": np.percentile(cohort_acceptance, 95) if len(cohort_acceptance) else np.nan,
+        "time_to_offer": {
+            "Median": _percentile_days(histogram, 50),
+            "P10": _percentile_days(histogram, 10),
+            "P90": _percentile_days(histogram, 90),
+            "Mean": float(np.arange(len(histogram)) @ histogram / total_offers) if total_offers else np.nan,
+        },
+        "time_to_offer_share": pd.DataFrame({
+            "Days": np.arange(len(histogram)),
+            "Share %": histogram / max(total_offers, 1) * 100,
+        }),
+        "cohorts": len(counts),
+        "cohort_size": cohort_size,
+        "seconds": seconds,
+    }
+
+
+def compare(baseline, scenario):
+    """Baseline vs scenario, one row per funnel stage and headline measure."""
+    rows = [(f"{stage} per cohort", base, new) for stage, base, new in
+            zip(FUNNEL_STAGES, baseline["funnel"]["Mean per Cohort"], scenario["funnel"]["Mean per Cohort"])]
+    rows.append(("Offer acceptance %", baseline["acceptance_rate"], scenario["acceptance_rate"]))
+    for name in ["Median", "P90", "Mean"]:
+        rows.append((f"{name} days to offer", baseline["time_to_offer"][name], scenario["time_to_offer"][name]))
+    table = pd.DataFrame(rows, columns=["Measure", "Baseline", "Scenario"])
+    table["Change"] = table["Scenario"] - table["Baseline"]
+    return table.round(2)
@@ -0,0 +1,134 @@
+"""Confidence intervals for the conversion and acceptance rates.
+
+Every rate on the dashboard is ``successes / total`` for some group. Rather
+than resampling each group's candidates one at a time, the bootstrap draws
+``Binomial(total, rate)`` for all groups at once as a ``(resamples, groups)``
+matrix, which is the same distribution as resampling the group's outcomes
+with replacement but costs nothing per candidate. Large resample counts can
+be split across a process pool with independent random streams.
+
+A percentile bootstrap collapses to a single point when a group has no
+successes (or nothing but successes), which is exactly the "0% from a handful
+of offers" case, so those groups get the Wilson score interval instead.
+``RECRUITMENT_CI_METHOD=wilson`` uses Wilson for every group.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CI_METHOD = os.environ.get("RECRUITMENT_CI_METHOD", "bootstrap")
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = int(os.environ.get("RECRUITMENT_BOOTSTRAP_RESAMPLES", "2000"))
+# 0 keeps the bootstrap in-process; more workers only pay off for very large resample counts
+BOOTSTRAP_WORKERS = int(os.environ.get("RECRUITMENT_BOOTSTRAP_WORKERS", "0"))
+
+
+def _bootstrap_draws(successes, totals, resamples, seed):
+    # One (resamples, groups) matrix of resampled rates
+    rng = np.random.default_rng(seed)
+    safe_totals = np.maximum(totals, 1)
+    return rng.binomial(totals, successes / safe_totals, size=(resamples, len(totals))) / safe_totals
+
+
+def _bootstrap_worker(args):
+    return _bootstrap_draws(*args)
+
+
+def bootstrap_interval(successes, totals, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES,
+                       workers=BOOTSTRAP_WORKERS, seed=0):
+    """Percentile bootstrap interval for every group's rate, as fractions."""
+    successes = np.asarray(successes, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    alpha = (1 - confidence) / 2
+
+    if workers and workers > 1:
+        # Independent streams per worker so the chunks don't repeat each other
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        chunks = [len(part) for part in np.array_split(np.arange(resamples), workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            draws = np.vstack(list(pool.map(
+                _bootstrap_worker,
+                [(successes, totals, chunk, child) for chunk, child in zip(chunks, seeds)]
+            )))
+    else:
+        draws = _bootstrap_draws(successes, totals, resamples, seed)
+
+    lower, upper = np.quantile(draws, (alpha, 1 - alpha), axis=0)
+
+    # Degenerate groups have no spread to resample
+    degenerate = (successes == 0) | (successes == totals)
+    if degenerate.any():
+        wilson_lower, wilson_upper = wilson_interval(successes[degenerate], totals[degenerate], confidence)
+        lower[degenerate] = wilson_lower
+        upper[degenerate] = wilson_upper
+
+    empty = totals == 0
+    lower[empty] = np.nan
+    upper[empty] = np.nan
+    return lower, upper
+
+
+def wilson_interval(successes, totals, confidence=CONFIDENCE):
+    """Wilson score interval for every group's rate, as fractions."""
+    from statistics import NormalDist
+
+    successes = np.asarray(successes, dtype=float)
+    totals = np.asarray(totals, dtype=float)
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = successes / totals
+        denominator = 1 + z ** 2 / totals
+        centre = (rates + z ** 2 / (2 * totals)) / denominator
+        half_width = z * np.sqrt(rates * (1 - rates) / totals + z ** 2 / (4 * totals ** 2)) / denominator
+    return np.clip(centre - half_width, 0, 1), np.clip(centre + half_width, 0, 1)
+
+
+def rate_interval(successes, totals, method=None, confidence=CONFIDENCE):
+    method = method or CI_METHOD
+    if method == "wilson":
+        return wilson_interval(successes, totals, confidence)
+    if method == "bootstrap":
+        return bootstrap_interval(successes, totals, confidence)
+    raise ValueError(f"Unknown confidence interval method: {method!r}")
+
+
+def describe_method(method=None):
+    method = method or CI_METHOD
+    if method == "wilson":
+        return f"{CONFIDENCE:.0%} Wilson score intervals"
+    return f"{CONFIDENCE:.0%} bootstrap intervals ({BOOTSTRAP_RESAMPLES:,} resamples)"
+
+
+def fit_logistic(features, outcomes, l2=1.0, iterations=50, tolerance=1e-8):
+    """L2-penalized logistic regression by Newton's method.
+
+    Features are standardized for the fit so one penalty suits every column;
+    the returned coefficients (intercept first) apply to the raw features.
+    """
+    features = np.asarray(features, dtype=float).reshape(len(outcomes), -1)
+    outcomes = np.asarray(outcomes, dtype=float)
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    design = np.column_stack([np.ones(len(outcomes)), (features - mean) / scale])
+    # The intercept isn't penalized
+    penalty = np.full(design.shape[1], float(l2))
+    penalty[0] = 0.0
+
+    weights = np.zeros(design.shape[1])
+    for _ in range(iterations):
+        predicted = logistic(design @ weights)
+        gradient = design.T @ (predicted - outcomes) + penalty * weights
+        hessian = (design * (predicted * (1 - predicted))[:, None]).T @ design + np.diag(penalty)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(weights)), gradient)
+        weights -= step
+        if np.abs(step).max() < tolerance:
+            break
+
+    slopes = weights[1:] / scale
+    return np.concatenate([[weights[0] - slopes @ mean], slopes])
+
+
+def logistic(values):
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -500, 500)))
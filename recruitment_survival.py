@@ -0,0 +1,132 @@
+"""Kaplan-Meier curves for time from application to each later stage.
+
+Averages of time-to-offer only see candidates who already got an offer.
+Here every applicant counts: a candidate who reached the stage is an event
+on the day they reached it, and everyone else is censored at the data
+cut-off (the latest date in the activity table), since the data records no
+rejections and any of them could still move on. Recent applicants therefore
+contribute only the days they have actually been observed.
+
+``SurvivalTable`` keeps one integer duration and one event flag per
+candidate and stage, plus integer group codes per dimension. A curve for
+any stage x dimension is then two ``np.bincount`` calls over
+``group * days + duration`` and a cumulative product along the day axis,
+for every group at once, so changing filters recomputes in milliseconds.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from recruitment_metrics import role_type
+from recruitment_stats import CONFIDENCE
+
+EVENTS = {
+    "Phone Screen": "Phone Screen Date",
+    "In-House Interview": "In-House Interview Date",
+    "Offer": "Offer Sent Date",
+}
+
+DIMENSIONS = ["Application Source", "Position Title", "Role Type", "Candidate Type"]
+
+ALL_CANDIDATES = "All candidates"
+
+
+class SurvivalTable:
+    def __init__(self, candidates_df, activity_df):
+        dates = activity_df.pivot_table(index="Candidate ID Number", columns="Stage Name",
+                                        values="Date When Reached the Stage", aggfunc="min")
+        candidates = candidates_df.set_index("Candidate ID Number")
+        candidates = candidates.loc[candidates.index.intersection(dates.index)]
+        applied = dates["New Application Date"].reindex(candidates.index)
+        candidates = candidates[applied.notna()]
+        applied = applied[applied.notna()]
+
+        self.cutoff = activity_df["Date When Reached the Stage"].max()
+        censored_days = (self.cutoff - applied).dt.days.to_numpy()
+
+        self.durations = {}
+        self.observed = {}
+        for event, stage in EVENTS.items():
+            reached = dates[stage].reindex(candidates.index) if stage in dates else pd.Series(pd.NaT, index=candidates.index)
+            event_days = (reached - applied).dt.days.to_numpy(dtype=float, na_value=np.nan)
+            observed = ~np.isnan(event_days)
+            # A few stages are dated before the application; count them as same-day
+            self.durations[event] = np.where(observed, np.clip(event_days, 0, None), censored_days).astype(np.int64)
+            self.observed[event] = observed
+
+        self.groups = {None: [ALL_CANDIDATES]}
+        self.codes = {None: np.zeros(len(candidates), dtype=np.int64)}
+        labels = {dimension: candidates[dimension] for dimension in DIMENSIONS if dimension in candidates}
+        labels["Role Type"] = candidates["Position Title"].map(role_type)
+        for dimension, values in labels.items():
+            self.groups[dimension] = sorted(values.dropna().unique())
+            self.codes[dimension] = pd.Index(self.groups[dimension]).get_indexer(values)
+
+    def curves(self, event, dimension=None, groups=None, max_days=None):
+        """Long-format frame of survival (share not yet reached) per group and day."""
+        durations, observed = self.durations[event], self.observed[event]
+        codes = self.codes[dimension]
+        labels = self.groups[dimension]
+        keep = codes >= 0
+        if groups is not None:
+            keep &= np.isin(codes, pd.Index(labels).get_indexer(groups))
+        durations, observed, codes = durations[keep], observed[keep], codes[keep]
+
+        days = int(durations.max()) + 1 if len(durations) else 1
+        if max_days is not None:
+            # Anyone followed past the horizon leaves the risk set there
+            observed = observed & (durations <= max_days)
+            durations = np.minimum(durations, max_days)
+            days = max_days + 1
+
+        # Event table: events and exits (event or censoring) per group x day
+        flat = codes * days + durations
+        size = len(labels) * days
+        events = np.bincount(flat[observed], minlength=size).reshape(len(labels), days)
+        exits = np.bincount(flat, minlength=size).reshape(len(labels), days)
+        at_risk = exits[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+            survival = np.cumprod(1 - hazard, axis=1)
+            # Greenwood variance, with the log-log transform to keep the band inside [0, 1]
+            greenwood = np.cumsum(np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0), axis=1)
+            z = NormalDist().inv_cdf(1 - (1 - CONFIDENCE) / 2)
+            log_survival = np.log(survival)
+            spread = z * np.sqrt(greenwood) / np.abs(log_survival)
+            lower = np.where(survival < 1, survival ** np.exp(spread), 1.0)
+            upper = np.where(survival < 1, survival ** np.exp(-spread), 1.0)
+        lower = np.where(survival > 0, lower, 0.0)
+        upper = np.where(survival > 0, upper, 0.0)
+
+        present = np.flatnonzero(exits.sum(axis=1) > 0)
+        frame = pd.DataFrame({
+            "Group": np.repeat(np.asarray(labels, dtype=object)[present], days),
+            "Days": np.tile(np.arange(days), len(present)),
+            "At Risk": at_risk[present].ravel(),
+            "Reached %": ((1 - survival[present]) * 100).ravel(),
+            "Reached % Low": ((1 - upper[present]) * 100).ravel(),
+            "Reached % High": ((1 - lower[present]) * 100).ravel(),
+        })
+        return frame
+
+    def summary(self, event, dimension=None, groups=None, horizons=(14, 30, 60)):
+        """Per group: candidates, events, median days and share reached by each horizon."""
+        curves = self.curves(event, dimension, groups)
+        rows = []
+        codes = self.codes[dimension]
+        for group, curve in curves.groupby("Group", sort=False):
+            in_group = codes == self.groups[dimension].index(group)
+            reached = curve["Reached %"].to_numpy()
+            median = np.flatnonzero(reached >= 50)
+            row = {
+                "Group": group,
+                "Candidates": int(in_group.sum()),
+                "Reached": int(self.observed[event][in_group].sum()),
+                "Median Days": int(median[0]) if len(median) else np.nan,
+            }
+            for horizon in horizons:
+                row[f"Within {horizon} Days %"] = round(float(reached[min(horizon, len(reached) - 1)]), 1)
+            rows.append(row)
+        return pd.DataFrame(rows)
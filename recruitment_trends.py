@@ -0,0 +1,225 @@
+"""Rolling-window trends built on prefix sums over a daily grid.
+
+Each ``RollingEngine`` covers one dimension (everything, per source, or per
+position). Candidates are bucketed by application date into a day grid, and
+the engine keeps only cumulative sums along the day axis, so any window sum
+is ``cum[t + 1] - cum[t + 1 - window]``: O(1) per point for any window size
+or step. Time-to-offer is kept as a cumulative histogram (one bucket per
+day of duration), so a window's median is read off the differenced
+histogram without touching individual candidates: the two middle buckets
+are averaged when a window holds an even number of offers. Negative
+durations (an offer dated before the application) count as same-day.
+
+Candidates are assigned to the day they applied (cohort view), matching the
+application-year convention used across the dashboard. Recent windows are
+therefore still maturing: their offers may not have gone out yet.
+
+The histogram grid is groups x days x time-to-offer buckets of int32, so
+it grows with both the history and the longest time-to-offer. Durations
+past ``MAX_TIME_TO_OFFER_DAYS`` share the last bucket. If one-day buckets
+would take more than ``RECRUITMENT_TREND_HISTOGRAM_MB`` (default 256 MB;
+building needs about twice that briefly), buckets are widened to 2, 4, ...
+days until the grid fits. Medians are then read to the bucket midpoint.
+The other prefix sums are a further groups x days x 3 int64.
+
+``update`` diffs per-candidate events against the previous build and only
+re-accumulates the grid from the earliest changed day on, so a refresh that
+only adds recent activity leaves the older prefix sums untouched.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from recruitment_metrics import OFFER_STAGES
+
+COUNTERS = ["applications", "offers", "accepted"]
+
+METRICS = {
+    "applications": "Application volume",
+    "offer_rate": "Offer rate (%)",
+    "acceptance_rate": "Acceptance rate (%)",
+    "median_time_to_offer": "Median time-to-offer (days)",
+}
+
+WINDOWS = {"Weekly": 7, "Monthly": 30, "Quarterly": 91}
+
+ALL_CANDIDATES = "All candidates"
+
+# Longer times to offer are counted in the last histogram bucket
+MAX_TIME_TO_OFFER_DAYS = 365
+HISTOGRAM_LIMIT_MB = float(os.environ.get("RECRUITMENT_TREND_HISTOGRAM_MB", "256"))
+
+
+def histogram_bucket_days(groups, days, max_time_to_offer):
+    """Narrowest time-to-offer bucket (a power of two days) that keeps the histogram grid under the limit."""
+    cells = groups * (days + 1)
+    bucket_days = 1
+    while (cells * (max_time_to_offer // bucket_days + 1) * 4 > HISTOGRAM_LIMIT_MB * 2**20
+           and bucket_days <= max_time_to_offer):
+        bucket_days *= 2
+    return bucket_days
+
+
+def candidate_events(candidates_df, activity_df):
+    """One row per candidate: application day, offer outcome and time-to-offer."""
+    dates = activity_df.pivot_table(index="Candidate ID Number", columns="Stage Name",
+                                    values="Date When Reached the Stage", aggfunc="min")
+    events = candidates_df[["Candidate ID Number", "Application Source", "Position Title",
+                            "Furthest Recruiting Stage Reached"]].set_index("Candidate ID Number")
+    events = events.join(dates[["New Application Date", "Offer Sent Date"]], how="inner")
+    events = events[events["New Application Date"].notna()]
+
+    furthest = events.pop("Furthest Recruiting Stage Reached")
+    events["offers"] = furthest.isin(OFFER_STAGES).astype(np.int32)
+    events["accepted"] = (furthest == "Offer Accepted").astype(np.int32)
+    events["applications"] = np.int32(1)
+    tto = (events["Offer Sent Date"] - events["New Application Date"]).dt.days
+    # Only offers with a recorded send date contribute to time-to-offer
+    events["time_to_offer"] = tto.where(events["offers"].astype(bool)).astype("Int64")
+    events["application_day"] = events["New Application Date"].dt.normalize()
+    return events.drop(columns=["New Application Date", "Offer Sent Date"])
+
+
+class RollingEngine:
+    def __init__(self, events, dimension=None):
+        self.dimension = dimension
+        self.groups = [ALL_CANDIDATES] if dimension is None else sorted(events[dimension].dropna().unique())
+        self.start = events["application_day"].min()
+        self.end = events["application_day"].max()
+        tto = events["time_to_offer"].dropna()
+        self.max_time_to_offer = min(max(int(tto.max()), 0), MAX_TIME_TO_OFFER_DAYS) if len(tto) else 0
+        self.events = events
+
+        days = self.num_days
+        groups = len(self.groups)
+        self.cum = np.zeros((len(COUNTERS), groups, days + 1), dtype=np.int64)
+        self.bucket_days = histogram_bucket_days(groups, days, self.max_time_to_offer)
+        self.hist_cum = np.zeros((groups, days + 1, self.num_buckets), dtype=np.int32)
+        self._accumulate(events, from_day=0)
+
+    @property
+    def num_days(self):
+        return int((self.end - self.start).days) + 1
+
+    @property
+    def num_buckets(self):
+        return self.max_time_to_offer // self.bucket_days + 1
+
+    def dates(self):
+        return pd.date_range(self.start, self.end, freq="D")
+
+    def _group_codes(self, events):
+        if self.dimension is None:
+            return np.zeros(len(events), dtype=np.int64)
+        return pd.Index(self.groups).get_indexer(events[self.dimension])
+
+    def _accumulate(self, events, from_day):
+        # Add events on days >= from_day to the running totals from that day on
+        days = ((events["application_day"] - self.start).dt.days.to_numpy() - from_day).astype(np.int64)
+        codes = self._group_codes(events)
+        keep = codes >= 0
+        span = self.num_days - from_day
+
+        for i, counter in enumerate(COUNTERS):
+            daily = np.zeros((len(self.groups), span), dtype=np.int64)
+            np.add.at(daily, (codes[keep], days[keep]), events[counter].to_numpy()[keep])
+            self.cum[i, :, from_day + 1:] += np.cumsum(daily, axis=1)
+
+        tto = events["time_to_offer"].to_numpy(dtype=float, na_value=np.nan)
+        has_tto = keep & ~np.isnan(tto)
+        buckets = np.clip(tto[has_tto], 0, self.max_time_to_offer).astype(np.int64) // self.bucket_days
+        daily_hist = np.zeros((len(self.groups), span, self.num_buckets), dtype=np.int32)
+        np.add.at(daily_hist, (codes[has_tto], days[has_tto], buckets), 1)
+        self.hist_cum[:, from_day + 1:] += np.cumsum(daily_hist, axis=1, out=daily_hist)
+
+    def update(self, events):
+        """Return an engine for new ``candidate_events``, reusing this one's prefix sums up to the first change."""
+        new_groups = set() if self.dimension is None else set(events[self.dimension].dropna()) - set(self.groups)
+        tto = events["time_to_offer"].dropna()
+        end = max(self.end, events["application_day"].max())
+        if (new_groups or events["application_day"].min() < self.start
+                or (len(tto) and min(tto.max(), MAX_TIME_TO_OFFER_DAYS) > self.max_time_to_offer)
+                or histogram_bucket_days(len(self.groups), int((end - self.start).days) + 1,
+                                         self.max_time_to_offer) != self.bucket_days):
+            # The grid's shape or bucket width changes; rebuilding is simpler than reshaping
+            return RollingEngine(events, self.dimension)
+
+        # Candidates whose events differ from the last build (new, changed or removed)
+        old, new = self.events.align(events, join="outer", axis=0)
+        changed = ~(old.eq(new).fillna(False) | (old.isna() & new.isna())).all(axis=1)
+        removed = self.events.loc[self.events.index.intersection(changed.index[changed])]
+        added = events.loc[events.index.intersection(changed.index[changed])]
+
+        engine = object.__new__(RollingEngine)
+        engine.dimension = self.dimension
+        engine.groups = self.groups
+        engine.start = self.start
+        engine.end = end
+        engine.max_time_to_offer = self.max_time_to_offer
+        engine.bucket_days = self.bucket_days
+        engine.events = events
+
+        # New days extend the grid with the last cumulative values carried forward
+        extra = engine.num_days - self.num_days
+        engine.cum = np.concatenate([self.cum, np.repeat(self.cum[:, :, -1:], extra, axis=2)], axis=2)
+        engine.hist_cum = np.concatenate([self.hist_cum, np.repeat(self.hist_cum[:, -1:], extra, axis=1)], axis=1)
+
+        if len(removed) or len(added):
+            first_day = pd.concat([removed["application_day"], added["application_day"]]).min()
+            from_day = int((first_day - engine.start).days)
+            # Drop everything from the first changed day on, then re-accumulate that suffix
+            engine.cum[:, :, from_day + 1:] = engine.cum[:, :, from_day:from_day + 1]
+            engine.hist_cum[:, from_day + 1:] = engine.hist_cum[:, from_day:from_day + 1]
+            suffix = events[events["application_day"] >= first_day]
+            engine._accumulate(suffix, from_day=from_day)
+        return engine
+
+    def window(self, metric, window_days, step_days=1, groups=None):
+        """Long-format frame of ``metric`` over trailing windows ending every ``step_days``."""
+        ends = np.arange(window_days - 1, self.num_days, step_days)
+        if not len(ends):
+            return pd.DataFrame(columns=["Date", "Group", "Value"])
+        hi, lo = ends + 1, ends + 1 - window_days
+        sums = self.cum[:, :, hi] - self.cum[:, :, lo]
+        applications, offers, accepted = sums
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if metric == "applications":
+                values = applications.astype(float)
+            elif metric == "offer_rate":
+                values = np.where(applications > 0, offers / applications * 100, np.nan)
+            elif metric == "acceptance_rate":
+                values = np.where(offers > 0, accepted / offers * 100, np.nan)
+            elif metric == "median_time_to_offer":
+                hist = self.hist_cum[:, hi] - self.hist_cum[:, lo]
+                cumulative = np.cumsum(hist, axis=2)
+                total = cumulative[:, :, -1:]
+                # Buckets holding the lower and upper middle offers; they're the same one for an odd count
+                lower = np.argmax(cumulative * 2 >= total, axis=2)
+                upper = np.argmax(cumulative * 2 > total, axis=2)
+                median = (lower + upper) / 2 * self.bucket_days + (self.bucket_days - 1) / 2
+                values = np.where(total[:, :, 0] > 0, median, np.nan)
+            else:
+                raise ValueError(f"Unknown rolling metric: {metric!r}")
+
+        dates = self.dates()[ends]
+        frame = pd.DataFrame({
+            "Date": np.tile(dates, len(self.groups)),
+            "Group": np.repeat(self.groups, len(ends)),
+            "Value": values.ravel(),
+        })
+        if groups is not None:
+            frame = frame[frame["Group"].isin(groups)]
+        return frame
+
+
+def build_rolling_engines(candidates_df, activity_df, previous=None):
+    """One engine per dimension; ``previous`` engines are updated incrementally."""
+    events = candidate_events(candidates_df, activity_df)
+    if previous:
+        return {dimension: engine.update(events) for dimension, engine in previous.items()}
+    return {
+        dimension: RollingEngine(events, dimension)
+        for dimension in [None, "Application Source", "Position Title"]
+    }
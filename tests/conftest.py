@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture(scope="session")
+def workbooks():
+    candidates_df = pd.read_excel(os.path.join(REPO_DIR, "CandidateDetails.xlsx"))
+    activity_df = pd.read_excel(os.path.join(REPO_DIR, "RecruitingActivity.xlsx"))
+    return candidates_df, activity_df
+
+
+@pytest.fixture(scope="session")
+def aggregates(workbooks):
+    from recruitment_metrics import build_aggregates
+
+    return build_aggregates(*workbooks)
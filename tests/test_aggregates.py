@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recruitment_metrics import build_aggregates, supports_position_joins
+
+
+def assert_same_aggregates(expected, actual):
+    assert expected.keys() == actual.keys()
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, actual[name], check_dtype=False, check_index_type=False, obj=name)
+        elif name == "seasonality":
+            assert value.keys() == actual[name].keys()
+            for year, sections in value.items():
+                for section, table in sections.items():
+                    pd.testing.assert_frame_equal(table, actual[name][year][section], check_dtype=False,
+                                                  check_index_type=False, obj=f"{name}[{year}].{section}")
+        elif name in ("key_metrics", "all_years", "seasonality_years"):
+            assert value == actual[name], name
+
+
+@pytest.fixture(scope="module")
+def shuffled(workbooks):
+    # Nothing downstream may rely on the workbooks' row order
+    candidates_df, activity_df = workbooks
+    rng = np.random.default_rng(0)
+    return (candidates_df.iloc[rng.permutation(len(candidates_df))].reset_index(drop=True),
+            activity_df.iloc[rng.permutation(len(activity_df))].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("distinct_counts", ["exact", "hll"])
+def test_low_memory_build_matches_the_default(shuffled, distinct_counts):
+    assert supports_position_joins(*shuffled)
+    assert_same_aggregates(
+        build_aggregates(*shuffled, low_memory=False, distinct_counts=distinct_counts, backend="pandas"),
+        build_aggregates(*shuffled, low_memory=True, distinct_counts=distinct_counts, backend="pandas"),
+    )
+
+
+@pytest.mark.parametrize("distinct_counts", ["exact", "hll"])
+def test_polars_build_matches_pandas(shuffled, distinct_counts):
+    pytest.importorskip("polars")
+    assert_same_aggregates(
+        build_aggregates(*shuffled, low_memory=False, distinct_counts=distinct_counts, backend="pandas"),
+        build_aggregates(*shuffled, low_memory=False, distinct_counts=distinct_counts, backend="polars"),
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from recruitment_api import MetricsApi, etag_matches
+from recruitment_data import Dataset
+
+
+class Refresher:
+    def __init__(self, dataset=None, error=None):
+        self.dataset = dataset
+        self.error = error
+
+    def current(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return self.dataset
+
+
+@pytest.fixture(scope="module")
+def api(workbooks, aggregates):
+    candidates_df, activity_df = workbooks
+    dataset = Dataset(candidates_df=candidates_df, activity_df=activity_df, aggregates=aggregates,
+                      version="v1", loaded_at=datetime(2023, 3, 14), refresh_seconds=0.0)
+    return MetricsApi(Refresher(dataset))
+
+
+def get(api, target, method="GET", **headers):
+    return asyncio.run(api.respond(method, target, headers))
+
+
+def test_revalidating_with_the_etag_returns_304(api):
+    status, headers, body = get(api, "/api/funnel?year=2022")
+    assert status == 200 and json.loads(body)
+    etag = headers["ETag"]
+    for header in [etag, f"W/{etag}", f'"other", {etag}', f'"other",W/{etag} ', "*"]:
+        status, headers, body = get(api, "/api/funnel?year=2022", **{"if-none-match": header})
+        assert (status, body) == (304, b""), header
+        assert headers["ETag"] == etag
+
+
+def test_other_etags_get_the_full_response(api):
+    etag = get(api, "/api/funnel?year=2022")[1]["ETag"]
+    for header in [etag[1:-1], f'"x{etag[1:-1]}x"', f'"x{etag}"', f'{etag}x', '"other"', ""]:
+        status, _, body = get(api, "/api/funnel?year=2022", **{"if-none-match": header})
+        assert status == 200 and body, header
+
+
+def test_etag_matches_parses_the_header():
+    assert etag_matches('W/"a", "b"', '"b"')
+    assert not etag_matches('"ab"', '"a"')
+    assert not etag_matches('W/"ab"', '"a"')
+
+
+@pytest.mark.parametrize("method, target, status", [
+    ("GET", "/api/nope", 404),
+    ("GET", "/api/funnel?colour=red", 400),
+    ("GET", "/api/funnel?year=1999", 404),
+    ("POST", "/api/funnel", 405),
+    ("GET", "/api/export/nope?format=csv", 404),
+    ("GET", "/api/export/position-analysis?format=doc", 400),
+])
+def test_client_errors(api, method, target, status):
+    got, headers, body = get(api, target, method=method)
+    assert got == status
+    assert "error" in json.loads(body)
+    assert "ETag" not in headers
+
+
+def test_unavailable_until_the_first_load():
+    api = MetricsApi(Refresher(error=TimeoutError("Dataset is still loading")))
+    status, _, body = get(api, "/api/key-metrics")
+    assert status == 503
+    assert json.loads(body) == {"error": "Dataset is still loading"}
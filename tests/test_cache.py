@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recruitment_cache import SharedCache, freeze, share
+
+
+def test_writes_to_a_shared_frame_leave_the_cached_original_unchanged():
+    cache = SharedCache()
+    original = cache.get(("v1", "table"), lambda: {"table": pd.DataFrame({"a": [1, 2, 3]})})
+    session = share(original)
+    session["table"].loc[0, "a"] = 99
+    session["table"]["b"] = 0
+    session["table"].iloc[1, 0] = -1
+
+    again = share(cache.get(("v1", "table"), lambda: pytest.fail("recomputed")))
+    pd.testing.assert_frame_equal(again["table"], pd.DataFrame({"a": [1, 2, 3]}))
+
+
+def test_frozen_arrays_are_read_only():
+    value = freeze({"counts": np.arange(3), "nested": [np.zeros(2)]})
+    with pytest.raises(ValueError):
+        value["counts"][0] = 1
+    with pytest.raises(ValueError):
+        value["nested"][0][0] = 1
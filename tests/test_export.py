@@ -0,0 +1,41 @@
+import io
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from recruitment_export import EXPORT_FORMATS, drilldown_chunks, export_file, export_table, frame_chunks
+from recruitment_index import CandidateIndex
+
+READERS = {
+    "csv": pd.read_csv,
+    "parquet": pd.read_parquet,
+    "xlsx": pd.read_excel,
+}
+
+
+def download_bytes(f):
+    # What st.download_button does with the value the deferred ``data`` callable returns
+    data, _ = convert_data_to_bytes_and_infer_mime(f, RuntimeError("unsupported download type"))
+    return data
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_table_export_round_trips_through_download_button(aggregates, fmt):
+    table = export_table(aggregates, "position-analysis")
+    data = download_bytes(export_file(frame_chunks(table, chunk_rows=3), fmt, sheet_name="position-analysis"))
+    result = READERS[fmt](io.BytesIO(data))
+    assert list(result.columns) == [str(column) for column in table.columns]
+    assert len(result) == len(table)
+    pd.testing.assert_series_equal(result["Position Title"], table["Position Title"], check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_drilldown_export_round_trips_through_download_button(workbooks, fmt):
+    candidates_df, activity_df = workbooks
+    index = CandidateIndex(candidates_df, activity_df)
+    filters = {"Application Source": ["Website"]}
+    chunks = drilldown_chunks(candidates_df, index, filters, chunk_rows=500)
+    result = READERS[fmt](io.BytesIO(download_bytes(export_file(chunks, fmt))))
+    assert len(result) == (candidates_df["Application Source"] == "Website").sum()
+    assert set(result["Application Source"]) == {"Website"}
@@ -0,0 +1,15 @@
+import recruitment_memory
+from recruitment_memory import current_rss_bytes, over_ceiling
+
+
+def test_ceiling_is_enforced_from_the_current_rss():
+    assert over_ceiling(ceiling_mb=1)
+    assert not over_ceiling(ceiling_mb=0)
+    assert not over_ceiling(ceiling_mb=10 ** 9)
+
+
+def test_ceiling_is_not_enforced_from_a_lifetime_peak(monkeypatch):
+    # Without procfs only the peak is known; it would refuse every rerun once crossed
+    monkeypatch.setattr(recruitment_memory, "procfs_rss_bytes", lambda: None)
+    assert current_rss_bytes() is not None
+    assert not over_ceiling(ceiling_mb=1)
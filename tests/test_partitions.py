@@ -0,0 +1,69 @@
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow
+import pytest
+
+import recruitment_data
+from recruitment_partitions import _remove_unreferenced, year_seasonality, year_stage_counts
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def local_sources(monkeypatch):
+    monkeypatch.setattr(recruitment_data, "CANDIDATES_SOURCE", os.path.join(REPO_DIR, "CandidateDetails.xlsx"))
+    monkeypatch.setattr(recruitment_data, "ACTIVITY_SOURCE", os.path.join(REPO_DIR, "RecruitingActivity.xlsx"))
+
+
+@pytest.mark.parametrize("error", [ImportError("no parquet engine"), pyarrow.ArrowInvalid("broken engine"),
+                                   PermissionError("read-only")])
+def test_build_falls_back_to_full_aggregates_when_partitions_cannot_be_written(
+        monkeypatch, tmp_path, local_sources, error):
+    def to_parquet(self, *args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", to_parquet)
+    dataset = recruitment_data.build_dataset(directory=str(tmp_path))
+    assert dataset.aggregates["partitions"] is None
+    year = max(dataset.aggregates["seasonality_years"])
+    assert year_seasonality(dataset.aggregates, year)
+
+
+@pytest.fixture
+def partitioned(tmp_path, local_sources):
+    return recruitment_data.build_dataset(directory=str(tmp_path)).aggregates
+
+
+def test_seasonality_intervals_match_with_and_without_partitions(partitioned):
+    assert partitioned["partitions"] is not None
+    unpartitioned = {**partitioned, "partitions": None}
+    for year in partitioned["seasonality_years"]:
+        with_partitions = year_seasonality(partitioned, year)["monthly_acceptance"]
+        without = year_seasonality(unpartitioned, year)["monthly_acceptance"]
+        pd.testing.assert_frame_equal(with_partitions.reset_index(drop=True), without.reset_index(drop=True))
+
+
+def test_missing_partition_files_fall_back_to_the_full_aggregates(partitioned):
+    store = partitioned["partitions"]
+    year = store.years[-1]
+    for entry in store.partitions([year]):
+        shutil.rmtree(os.path.join(store.root, entry["path"]))
+    pd.testing.assert_series_equal(year_stage_counts(partitioned, year), partitioned["yearly_table"][str(year)])
+    assert year_seasonality(partitioned, year) is partitioned["seasonality"].get(year)
+
+
+def test_unreferenced_partitions_are_kept_for_the_grace_period(tmp_path):
+    root = tmp_path / "partitions"
+    for name in ["current", "previous", "recent", "expired"]:
+        (root / "year=2021" / name).mkdir(parents=True)
+    old = time.time() - 2 * 3600
+    for name in ["previous", "expired"]:
+        os.utime(root / "year=2021" / name, (old, old))
+
+    manifest = {"partitions": [{"path": os.path.join("year=2021", "current")}]}
+    previous = {"partitions": [{"path": os.path.join("year=2021", "previous")}]}
+    _remove_unreferenced(str(root), manifest, previous, grace_hours=1)
+    assert sorted(os.listdir(root / "year=2021")) == ["current", "previous", "recent"]
@@ -0,0 +1,56 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import recruitment_data
+from recruitment_data import DataRefresher
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_refresher_retries_a_failed_first_load(monkeypatch, tmp_path):
+    attempts = []
+    loaded = SimpleNamespace(version="v1")
+    source_back = threading.Event()
+
+    def build_dataset(previous, directory):
+        attempts.append(previous)
+        if len(attempts) == 1:
+            raise ConnectionError("source unreachable")
+        source_back.wait(5)
+        return loaded
+
+    monkeypatch.setattr(recruitment_data, "build_dataset", build_dataset)
+    monkeypatch.setattr(recruitment_data, "RETRY_SECONDS", 0.05)
+    refresher = DataRefresher(interval=3600, snapshot_dir=str(tmp_path)).start()
+
+    with pytest.raises(RuntimeError, match="source unreachable"):
+        refresher.current(timeout=5)
+    source_back.set()
+    # The retry comes long before the hour-long refresh interval
+    assert wait_for(lambda: refresher._dataset is not None)
+    assert refresher.current() is loaded
+    assert refresher.last_error is None
+
+
+def test_snapshot_save_errors_are_recorded(monkeypatch, tmp_path):
+    loaded = SimpleNamespace(version="v1")
+
+    def save_snapshot(dataset, directory):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(recruitment_data, "build_dataset", lambda previous, directory: loaded)
+    monkeypatch.setattr(recruitment_data, "save_snapshot", save_snapshot)
+    refresher = DataRefresher(interval=3600, snapshot_dir=str(tmp_path))
+    refresher.refresh()
+    assert refresher.current(timeout=0) is loaded
+    assert isinstance(refresher.last_error, PermissionError)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recruitment_paths import STAGE_ORDER
+from recruitment_risk import GAPS, SCORED_FROM_STAGE, build_offer_risk
+from recruitment_stats import logistic
+
+
+@pytest.fixture(scope="module")
+def model(workbooks):
+    return build_offer_risk(*workbooks)
+
+
+def test_scores_only_open_candidates_from_the_interview_on(model):
+    store = model.store
+    assert model.trained_on == np.count_nonzero(store.outcome >= 0)
+    assert np.array_equal(~np.isnan(model.scores), store.scored)
+    assert (store.last_stage[store.scored] >= SCORED_FROM_STAGE).all()
+    assert (store.open & (store.last_stage < SCORED_FROM_STAGE)).any()
+    scores = model.scores[store.scored]
+    assert ((scores > 0) & (scores < 1)).all()
+    assert not (store.open & (store.outcome >= 0)).any()
+
+
+def test_scored_feature_rows_are_like_the_training_offers(model):
+    store = model.store
+    scored = np.flatnonzero(store.scored)
+    stage = store.last_stage[scored].astype(np.int64)
+    # Every stage up to the current one was reached, and none after the gap being waited in is left unobserved
+    assert (stage >= len(GAPS) - 1).all()
+    assert (store.reached[scored] == (np.arange(len(STAGE_ORDER))[None, :] <= stage[:, None])).all()
+
+    # A scored row is a training-style row with the waiting gap counted up to the cut-off
+    features = store.design(scored)
+    waiting = stage < len(GAPS)
+    features[waiting, stage[waiting]] = store.waiting_days()[scored[waiting]]
+    assert (features[:, :len(GAPS)] >= 0).all()
+    np.testing.assert_allclose(model.scores[scored], logistic(model.weights[0] + features @ model.weights[1:]),
+                               rtol=1e-6)
+
+
+def test_open_candidates_are_ranked_by_risk(model, workbooks):
+    candidates_df, _ = workbooks
+    table = model.open_candidates(candidates_df)
+    assert len(table) == model.store.open.sum()
+    risk = table["Decline Risk %"]
+    assert risk.dropna().is_monotonic_decreasing
+    assert risk.notna().sum() == model.store.scored.sum()
+    assert risk.isna().to_numpy()[risk.notna().sum():].all()
+
+
+def test_new_activity_rescores_only_changed_candidates(model, workbooks):
+    candidates_df, activity_df = workbooks
+    store = model.store
+    waiting = np.flatnonzero(store.open & (store.last_stage < len(STAGE_ORDER) - 2))[:3]
+    moved_on = pd.DataFrame({
+        "Candidate ID Number": store.ids[waiting],
+        "Stage Name": np.array(STAGE_ORDER)[store.last_stage[waiting] + 1],
+        "Date When Reached the Stage": store.cutoff,
+    })
+    activity = pd.concat([activity_df, moved_on], ignore_index=True)
+
+    updated = build_offer_risk(candidates_df, activity, model)
+    rebuilt = build_offer_risk(candidates_df, activity)
+    assert updated.weights is model.weights
+    assert updated.rescored == len(waiting)
+    np.testing.assert_allclose(updated.scores, rebuilt.scores, rtol=1e-6, equal_nan=True)
+
+
+def test_changed_outcomes_retrain(model, workbooks):
+    candidates_df, activity_df = workbooks
+    candidates = candidates_df.copy()
+    pending = candidates["Furthest Recruiting Stage Reached"] == "Offer Sent"
+    candidates.loc[pending, "Furthest Recruiting Stage Reached"] = "Offer Declined"
+    updated = build_offer_risk(candidates, activity_df, model)
+    assert updated.weights is not model.weights
+    assert updated.trained_on == model.trained_on + pending.sum()
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recruitment_simulation import FUNNEL_STAGES, PipelineModel
+
+
+@pytest.fixture(scope="module")
+def model(workbooks):
+    return PipelineModel(*workbooks)
+
+
+def test_results_do_not_depend_on_the_worker_count(model):
+    inline = model.simulate(cohorts=3000, seed=7, workers=0)
+    pooled = model.simulate(cohorts=3000, seed=7, workers=2)
+    pd.testing.assert_frame_equal(inline["funnel"], pooled["funnel"])
+    pd.testing.assert_frame_equal(inline["time_to_offer_share"], pooled["time_to_offer_share"])
+
+
+def test_funnel_never_grows_and_matches_history(model, workbooks):
+    candidates_df, _ = workbooks
+    result = model.simulate(cohorts=2000, cohort_size=1000)
+    means = result["funnel"].set_index("Stage")["Mean per Cohort"].reindex(FUNNEL_STAGES)
+    assert (np.diff(means.to_numpy()) <= 0).all()
+    offers = candidates_df["Furthest Recruiting Stage Reached"].str.startswith("Offer").sum()
+    # Historical offers per application, give or take the shrinkage toward pooled rates
+    assert means["Offer Sent"] / 1000 == pytest.approx(offers / len(candidates_df), rel=0.25)
+
+
+def test_scenarios_move_time_to_offer_the_right_way(model):
+    baseline = model.simulate(cohorts=2000)
+    faster = model.simulate(cohorts=2000, interview_capacity=2.0, interview_to_offer_cut=5)
+    slower = model.simulate(cohorts=2000, interview_capacity=0.5)
+    # Common random numbers: the same candidates reach each stage
+    offers = FUNNEL_STAGES.index("Offer Sent") + 1
+    pd.testing.assert_frame_equal(baseline["funnel"].iloc[:offers], faster["funnel"].iloc[:offers])
+    assert faster["time_to_offer"]["Mean"] < baseline["time_to_offer"]["Mean"] < slower["time_to_offer"]["Mean"]
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from recruitment_metrics import compute_stage_counts
+from recruitment_sketch import FunnelSketches, add_to_registers, estimate, register_ranks, relative_error
+
+PRECISION = 12
+
+
+def sketches_of(sizes, seed=0):
+    """One sketch per entry of ``sizes``, each over that many distinct random IDs."""
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(np.iinfo(np.int64).max, size=int(np.sum(sizes)), replace=False)
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+    registers = np.zeros((len(sizes), 1 << PRECISION), dtype=np.uint8)
+    buckets, ranks = register_ranks(ids, PRECISION)
+    add_to_registers(registers, buckets, ranks, groups)
+    return registers
+
+
+def test_empty_sketches_estimate_zero():
+    assert np.array_equal(estimate(np.zeros((2, 3, 1 << PRECISION), dtype=np.uint8)), np.zeros((2, 3)))
+
+
+@pytest.mark.parametrize("size", [1_000, 10_000, 12_000, 50_000])
+def test_error_bound_holds_across_the_range(size):
+    # 10,000 to 12,000 is around 2.5 x registers, where the classic raw estimate is biased
+    sizes = np.full(200, size)
+    errors = estimate(sketches_of(sizes, seed=size)) / sizes - 1
+    assert abs(errors.mean()) < 0.005
+    assert np.mean(np.abs(errors) <= relative_error(PRECISION, 0.95)) >= 0.92
+
+
+def test_funnel_sketches_match_exact_counts(workbooks):
+    candidates_df, activity_df = workbooks
+    exact = compute_stage_counts(candidates_df, activity_df)
+    approximate = FunnelSketches(candidates_df, activity_df, PRECISION).stage_counts()
+    large = exact[exact >= 100]
+    errors = (approximate[large.index] - large).abs() / large
+    assert (errors <= relative_error(PRECISION, 0.95)).all()
@@ -0,0 +1,30 @@
+import ast
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "recruitment_analytics_case_study.py")
+
+
+def modules_before_page_config():
+    """Modules the dashboard imports before ``st.set_page_config``."""
+    modules = []
+    for node in ast.parse(open(APP_PATH).read()).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+        elif "set_page_config" in ast.unparse(node):
+            return modules
+    raise AssertionError("set_page_config not found")
+
+
+def test_header_imports_load_neither_pandas_nor_numpy():
+    modules = modules_before_page_config()
+    assert "recruitment_data" in modules
+    snippet = "\n".join(f"import {module}" for module in modules) + (
+        "\nimport sys\nprint(sorted({'pandas', 'numpy'} & set(sys.modules)))")
+    output = subprocess.run([sys.executable, "-c", snippet], cwd=REPO_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip() == "[]"
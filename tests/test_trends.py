@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import recruitment_trends
+from recruitment_trends import RollingEngine, candidate_events
+
+
+@pytest.fixture(scope="module")
+def events(workbooks):
+    return candidate_events(*workbooks)
+
+
+def exact_median(events, end_day, window_days):
+    in_window = events["application_day"].between(end_day - pd.Timedelta(days=window_days - 1), end_day)
+    return events.loc[in_window, "time_to_offer"].dropna().astype(float)
+
+
+def test_window_median_matches_the_candidates(events):
+    engine = RollingEngine(events)
+    assert engine.bucket_days == 1
+    frame = engine.window("median_time_to_offer", 91, step_days=30).dropna()
+    assert len(frame)
+    for date, value in zip(frame["Date"], frame["Value"]):
+        assert value == np.median(exact_median(events, date, 91))
+
+
+def test_histogram_grid_stays_under_the_limit(monkeypatch, events):
+    full = RollingEngine(events, "Position Title")
+    limit_mb = full.hist_cum.nbytes / 2**20 / 5
+    monkeypatch.setattr(recruitment_trends, "HISTOGRAM_LIMIT_MB", limit_mb)
+    coarse = RollingEngine(events, "Position Title")
+    assert coarse.bucket_days > 1
+    assert coarse.hist_cum.nbytes <= limit_mb * 2**20
+
+    exact = full.window("median_time_to_offer", 91, step_days=7)["Value"].to_numpy()
+    approximate = coarse.window("median_time_to_offer", 91, step_days=7)["Value"].to_numpy()
+    assert np.array_equal(np.isnan(exact), np.isnan(approximate))
+    known = ~np.isnan(exact)
+    assert np.abs(exact[known] - approximate[known]).max() <= coarse.bucket_days / 2
+    # Counts don't depend on the bucket width
+    assert np.array_equal(full.cum, coarse.cum)
+
+
+def test_long_times_to_offer_share_the_last_bucket(events):
+    stretched = events.copy()
+    stretched.loc[stretched["time_to_offer"].notna(), "time_to_offer"] *= 10
+    engine = RollingEngine(stretched)
+    assert engine.max_time_to_offer == recruitment_trends.MAX_TIME_TO_OFFER_DAYS
+    assert engine.hist_cum.shape[2] == recruitment_trends.MAX_TIME_TO_OFFER_DAYS + 1
+
+
+def test_negative_times_to_offer_count_as_same_day(events):
+    backwards = events.copy()
+    offered = backwards.index[backwards["time_to_offer"].notna()]
+    backwards.loc[offered[:10], "time_to_offer"] = -5
+    engine = RollingEngine(backwards)
+    same_day = backwards.copy()
+    same_day.loc[offered[:10], "time_to_offer"] = 0
+    assert np.array_equal(engine.hist_cum, RollingEngine(same_day).hist_cum)
+
+
+def test_update_matches_a_full_build(events):
+    cutoff = events["application_day"].max() - pd.Timedelta(days=60)
+    engine = RollingEngine(events[events["application_day"] <= cutoff], "Application Source")
+    updated = engine.update(events)
+    rebuilt = RollingEngine(events, "Application Source")
+    assert np.array_equal(updated.cum, rebuilt.cum)
+    assert np.array_equal(updated.hist_cum, rebuilt.hist_cum)